@@ -0,0 +1,271 @@
+"""
+End-to-end API benchmark: seeds a dataset, drives the main endpoints and writes
+the results as JSON so runs can be compared between commits.
+
+    python -m benchmarks.api --workspaces 20 --members 25 --projects 200 \\
+        --requests 500 --concurrency 16 --output bench.json [--compare baseline.json]
+
+Dataset: N workspaces x M members x P projects, created with bulk_create.
+
+Scenarios (each run two ways):
+    login            POST /api/login/
+    project-list     GET  /api/projects/
+    project-create   POST /api/projects/
+    membership-list  GET  /api/memberships/
+    invite           POST /api/workspaces/<id>/invite_user/
+
+    client   sequential requests through the Django test client; also records the
+             number of SQL queries per request
+    http     a threaded WSGI server on localhost driven by a pool of keep-alive
+             HTTP clients, for throughput and latency under concurrency
+
+Login throttles are switched off for the run; everything else is stock settings
+on a throwaway test database.
+"""
+import argparse
+import datetime
+import http.client
+import itertools
+import json
+import logging
+import statistics
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from .asgi_vs_wsgi import setup_django, summarize
+
+PASSWORD = 'bench-password'
+
+
+def seed_dataset(workspaces, members, projects):
+    """
+    Bulk-create `workspaces` workspaces, each with `members` members (the first is
+    the owner) and `projects` projects. Returns the dataset description the
+    scenarios run against.
+    """
+    from django.contrib.auth import get_user_model
+    from django.contrib.auth.hashers import make_password
+    from core.counters import reconcile_counts
+    from core.models import Project, Workspace, WorkspaceMembership
+    User = get_user_model()
+
+    # Hashing is deliberately slow; every seeded account shares one hash.
+    password = make_password(PASSWORD)
+    users = User.objects.bulk_create([
+        User(username=f'bench-{w}-{m}', email=f'bench-{w}-{m}@example.com', password=password)
+        for w in range(workspaces) for m in range(members)
+    ])
+    owners = users[::members]
+    spaces = Workspace.objects.bulk_create([
+        Workspace(name=f'Bench {w}', slug=f'bench-{w}', owner=owners[w]) for w in range(workspaces)
+    ])
+    WorkspaceMembership.objects.bulk_create([
+        WorkspaceMembership(
+            user=users[w * members + m],
+            workspace=spaces[w],
+            role=WorkspaceMembership.ROLE_OWNER if m == 0 else WorkspaceMembership.ROLE_MEMBER,
+        )
+        for w in range(workspaces) for m in range(members)
+    ])
+    Project.objects.bulk_create([
+        Project(workspace=spaces[w], name=f'project-{p:05d}', description='benchmark project', created_by=owners[w])
+        for w in range(workspaces) for p in range(projects)
+    ])
+    reconcile_counts([w.pk for w in spaces])
+    return {
+        'owner': owners[0],
+        'workspace': spaces[0],
+        # Members of the other workspaces, invited into the first one.
+        'invitees': [u.email for u in users[members:]] or [owners[0].email],
+    }
+
+
+@contextmanager
+def login_throttles_disabled():
+    from rest_framework.throttling import SimpleRateThrottle
+    rates = SimpleRateThrottle.THROTTLE_RATES
+    saved = {scope: rates.get(scope) for scope in ('login_ip', 'login_email')}
+    rates.update(dict.fromkeys(saved))
+    try:
+        yield
+    finally:
+        rates.update(saved)
+
+
+def build_scenarios(dataset):
+    """(name, method, path, body factory) for every scenario."""
+    workspace = dataset['workspace']
+    invitees = itertools.cycle(dataset['invitees'])
+    counter = itertools.count()
+    return [
+        ('login', 'POST', '/api/login/',
+         lambda: {'email': dataset['owner'].email, 'password': PASSWORD}),
+        ('project-list', 'GET', '/api/projects/', None),
+        ('project-create', 'POST', '/api/projects/',
+         lambda: {'name': f'load-{next(counter)}', 'description': 'created by benchmark'}),
+        ('membership-list', 'GET', '/api/memberships/', None),
+        ('invite', 'POST', f'/api/workspaces/{workspace.pk}/invite_user/',
+         lambda: {'email': next(invitees)}),
+    ]
+
+
+def auth_headers(dataset):
+    from core_auth.tokens import issue_token_pair
+    return {
+        'Authorization': f"Bearer {issue_token_pair(dataset['owner'])['access']}",
+        'X-Workspace-Id': str(dataset['workspace'].pk),
+    }
+
+
+def run_client(scenarios, headers, requests):
+    """Sequential requests through the test client, with per-request query counts."""
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext
+    client = Client(headers=headers)
+    results = []
+    for name, method, path, body in scenarios:
+        latencies, queries = [], []
+        start = time.perf_counter()
+        for _ in range(requests):
+            with CaptureQueriesContext(connection) as ctx:
+                t0 = time.perf_counter()
+                if method == 'GET':
+                    resp = client.get(path)
+                else:
+                    resp = client.post(path, body(), content_type='application/json')
+                latencies.append(time.perf_counter() - t0)
+            assert resp.status_code < 400, (name, resp.status_code, resp.content[:200])
+            queries.append(len(ctx.captured_queries))
+        row = summarize(f'client/{name}', latencies, time.perf_counter() - start)
+        row.update(queries_mean=round(statistics.fmean(queries), 2), queries_max=max(queries))
+        results.append(row)
+    return results
+
+
+class LiveServer:
+    """The project's WSGI app on a threaded server bound to an ephemeral localhost port."""
+
+    def __enter__(self):
+        from django.conf import settings
+        from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler, get_internal_wsgi_application
+        settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, '127.0.0.1']
+
+        class QuietHandler(WSGIRequestHandler):
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadedWSGIServer(('127.0.0.1', 0), QuietHandler, allow_reuse_address=False)
+        self.server.set_app(get_internal_wsgi_application())
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def run_http(scenarios, headers, requests, concurrency, port):
+    """`requests` per scenario spread over `concurrency` keep-alive connections."""
+    local = threading.local()
+    lock = threading.Lock()
+    results = []
+    for name, method, path, body in scenarios:
+        def one(_):
+            conn = getattr(local, 'conn', None)
+            if conn is None:
+                conn = local.conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+            with lock:  # body factories share iterators
+                payload = json.dumps(body()).encode() if body else None
+            request_headers = dict(headers, **({'Content-Type': 'application/json'} if payload else {}))
+            start = time.perf_counter()
+            conn.request(method, path, body=payload, headers=request_headers)
+            resp = conn.getresponse()
+            resp_body = resp.read()
+            elapsed = time.perf_counter() - start
+            assert resp.status < 400, (name, resp.status, resp_body[:200])
+            return elapsed
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as pool:
+            latencies = list(pool.map(one, range(requests)))
+        results.append(summarize(f'http/{name}', latencies, time.perf_counter() - start))
+        local.__dict__.clear()
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline):
+    """Print rps / p95 changes against a previous run."""
+    previous = {row['scenario']: row for row in baseline['results']}
+    print(f"\ncompared with {baseline.get('revision')} ({baseline.get('created_at')}):")
+    for row in results:
+        before = previous.get(row['scenario'])
+        if not before:
+            continue
+        rps = (row['rps'] - before['rps']) / before['rps'] * 100 if before['rps'] else 0.0
+        p95 = (row['p95_ms'] - before['p95_ms']) / before['p95_ms'] * 100 if before['p95_ms'] else 0.0
+        print(f"{row['scenario']:>24}  rps {rps:+7.1f}%  p95 {p95:+7.1f}%")
+
+
+def run(workspaces=5, members=10, projects=50, requests=100, concurrency=8, use_http=True):
+    """Seed and run every scenario; returns the JSON-ready report."""
+    dataset = seed_dataset(workspaces, members, projects)
+    headers = auth_headers(dataset)
+    with login_throttles_disabled():
+        results = run_client(build_scenarios(dataset), headers, requests)
+        if use_http:
+            with LiveServer() as server:
+                results += run_http(build_scenarios(dataset), headers, requests, concurrency, server.port)
+    return {
+        'revision': git_revision(),
+        'created_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'params': {'workspaces': workspaces, 'members': members, 'projects': projects,
+                   'requests': requests, 'concurrency': concurrency},
+        'results': results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workspaces', type=int, default=5)
+    parser.add_argument('--members', type=int, default=10)
+    parser.add_argument('--projects', type=int, default=50)
+    parser.add_argument('--requests', type=int, default=200, help='requests per scenario and mode')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--no-http', action='store_true', help='only run the test-client pass')
+    parser.add_argument('--output', help='write the report to this JSON file')
+    parser.add_argument('--compare', help='a previous JSON report to diff against')
+    args = parser.parse_args(argv)
+
+    setup_django()
+    # Login alone crosses the slow-request threshold; keep the table readable.
+    logging.getLogger('core.instrumentation').setLevel(logging.ERROR)
+    report = run(args.workspaces, args.members, args.projects, args.requests, args.concurrency, use_http=not args.no_http)
+
+    columns = ['scenario', 'requests', 'rps', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'queries_mean']
+    print(' '.join(f'{c:>14}' for c in columns))
+    for row in report['results']:
+        print(' '.join(f"{row.get(c, ''):>14}" for c in columns))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report['results'], json.load(f))
+    return report
+
+
+if __name__ == '__main__':
+    main()
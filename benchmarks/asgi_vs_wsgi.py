@@ -0,0 +1,138 @@
+"""
+Throughput of the same reads under WSGI and ASGI with concurrent clients.
+
+    python -m benchmarks.asgi_vs_wsgi --requests 2000 --concurrency 32 --projects 200
+
+Scenarios:
+    wsgi/drf    sync DRF list through the WSGI handler, one thread per client
+    asgi/drf    sync DRF list through the ASGI handler (thread hop per request)
+    asgi/async  native async list (core.async_views) through the ASGI handler
+
+Runs against a throwaway test database, like the test suite. Clients authenticate
+with a bearer token so no session rows are written during the run.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def setup_django():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backendapps.settings')
+    import django
+    django.setup()
+    from django.conf import settings
+    from django.test.utils import setup_databases, setup_test_environment
+    default = settings.DATABASES['default']
+    if default['ENGINE'] == 'django.db.backends.sqlite3':
+        # A file-backed test DB: the shared in-memory one locks up under concurrent threads.
+        default['TEST']['NAME'] = os.path.join(tempfile.mkdtemp(), 'bench.sqlite3')
+    setup_test_environment()
+    return setup_databases(verbosity=0, interactive=False)
+
+
+def seed(projects):
+    from django.contrib.auth import get_user_model
+    from core.models import Project, Workspace, WorkspaceMembership
+    user = get_user_model().objects.create_user(username='bench', email='bench@example.com', password='bench')
+    workspace = Workspace.objects.create(name='Bench', slug='bench', owner=user)
+    WorkspaceMembership.objects.create(user=user, workspace=workspace, role=WorkspaceMembership.ROLE_OWNER)
+    Project.objects.bulk_create([Project(workspace=workspace, name=f'project-{i:05d}') for i in range(projects)])
+    return user, workspace
+
+
+def summarize(name, latencies, elapsed):
+    latencies = sorted(latencies)
+    pct = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+    return {
+        'scenario': name,
+        'requests': len(latencies),
+        'rps': round(len(latencies) / elapsed, 1),
+        'mean_ms': round(statistics.fmean(latencies) * 1000, 2),
+        'p50_ms': round(pct(0.50), 2),
+        'p95_ms': round(pct(0.95), 2),
+        'p99_ms': round(pct(0.99), 2),
+    }
+
+
+def run_wsgi(url, headers, requests, concurrency):
+    from django.test import Client
+    local = threading.local()
+
+    def one(_):
+        client = getattr(local, 'client', None)
+        if client is None:
+            client = local.client = Client(headers=headers)
+        start = time.perf_counter()
+        resp = client.get(url)
+        assert resp.status_code == 200, resp.content
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        latencies = list(pool.map(one, range(requests)))
+    return latencies, time.perf_counter() - start
+
+
+def run_asgi(url, headers, requests, concurrency):
+    from django.test import AsyncClient
+
+    async def main():
+        # Constructor headers aren't turned into ASGI headers, so pass them per request.
+        clients = [AsyncClient() for _ in range(concurrency)]
+        latencies = []
+
+        async def worker(client, count):
+            for _ in range(count):
+                start = time.perf_counter()
+                resp = await client.get(url, headers=headers)
+                assert resp.status_code == 200, resp.content
+                latencies.append(time.perf_counter() - start)
+
+        per_client = [requests // concurrency + (i < requests % concurrency) for i in range(concurrency)]
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(c, n) for c, n in zip(clients, per_client)))
+        return latencies, time.perf_counter() - start
+
+    return asyncio.run(main())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--projects', type=int, default=200)
+    parser.add_argument('--page-size', type=int, default=50)
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from core_auth.tokens import issue_token_pair
+    user, workspace = seed(args.projects)
+    headers = {
+        'X-Workspace-Id': str(workspace.pk),
+        'Authorization': f"Bearer {issue_token_pair(user)['access']}",
+    }
+    query = f'?page_size={args.page_size}'
+    scenarios = [
+        ('wsgi/drf', run_wsgi, f'/api/projects/{query}'),
+        ('asgi/drf', run_asgi, f'/api/projects/{query}'),
+        ('asgi/async', run_asgi, f'/api/async/projects/{query}'),
+    ]
+    results = []
+    for name, runner, url in scenarios:
+        latencies, elapsed = runner(url, headers, args.requests, args.concurrency)
+        results.append(summarize(name, latencies, elapsed))
+
+    columns = ['scenario', 'requests', 'rps', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms']
+    print(' '.join(f'{c:>11}' for c in columns))
+    for row in results:
+        print(' '.join(f'{row[c]:>11}' for c in columns))
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+Rows/sec of the list serialization paths, with an output parity check.
+
+    python -m benchmarks.serializers --rows 20000 --repeat 5
+
+For each of ProjectSerializer and WorkspaceSerializer it compares:
+    drf          ModelSerializer(many=True) over model instances
+    values       ValuesSerializer (core.fast_serializers) over .values() rows
+and for rendering the resulting list:
+    drf-json     rest_framework JSONRenderer
+    fast-json    core.renderers.FastJSONRenderer (orjson when installed)
+
+Every fast path must produce exactly what the DRF path does; the run aborts otherwise.
+"""
+import argparse
+import time
+
+from .asgi_vs_wsgi import setup_django
+
+
+def seed(rows):
+    from django.contrib.auth import get_user_model
+    from core.models import Project, Workspace
+    user = get_user_model().objects.create_user(username='bench', email='bench@example.com', password='bench')
+    workspaces = Workspace.objects.bulk_create(
+        [Workspace(name=f'Workspace {i}', slug=f'ws-{i}', owner=user) for i in range(rows)]
+    )
+    Project.objects.bulk_create(
+        [Project(workspace=workspaces[0], name=f'project-{i:06d}', description='x' * 40, created_by=user) for i in range(rows)]
+    )
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from rest_framework.renderers import JSONRenderer
+    from core.fast_serializers import ValuesSerializer
+    from core.models import Project, Workspace
+    from core.renderers import FastJSONRenderer, orjson
+    from core.serializers import ProjectSerializer, WorkspaceSerializer
+    seed(args.rows)
+
+    results = []
+    for serializer_class, queryset in ((ProjectSerializer, Project.objects.order_by('id')),
+                                       (WorkspaceSerializer, Workspace.objects.order_by('id'))):
+        fast = ValuesSerializer.for_class(serializer_class)
+        drf_time, expected = best_of(args.repeat, lambda: serializer_class(list(queryset), many=True).data)
+        fast_time, actual = best_of(args.repeat, lambda: fast.serialize(queryset.values(*fast.columns)))
+        assert actual == expected, f'{serializer_class.__name__}: fast path output differs'
+
+        drf_render_time, drf_bytes = best_of(args.repeat, lambda: JSONRenderer().render(expected))
+        fast_render_time, fast_bytes = best_of(args.repeat, lambda: FastJSONRenderer().render(expected))
+        assert fast_bytes == drf_bytes, f'{serializer_class.__name__}: rendered JSON differs'
+
+        name = serializer_class.__name__
+        rows = len(expected)
+        results += [
+            {'case': f'{name}/drf', 'rows_per_sec': round(rows / drf_time)},
+            {'case': f'{name}/values', 'rows_per_sec': round(rows / fast_time)},
+            {'case': f'{name}/drf-json', 'rows_per_sec': round(rows / drf_render_time)},
+            {'case': f'{name}/fast-json', 'rows_per_sec': round(rows / fast_render_time)},
+        ]
+
+    print(f'rows={args.rows} repeat={args.repeat} orjson={"yes" if orjson else "no"} (parity: ok)')
+    for row in results:
+        print(f"{row['case']:>32} {row['rows_per_sec']:>12,} rows/s")
+    return results
+
+
+if __name__ == '__main__':
+    main()
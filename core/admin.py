@@ -1,6 +1,32 @@
 from django.contrib import admin
+from .deletion import soft_delete_memberships, soft_delete_workspace
 from .models import Workspace, WorkspaceMembership, WorkspaceModel, WorkspaceQuerySet
 
-admin.site.register(Workspace)
-admin.site.register(WorkspaceMembership)
 
+class SoftDeleteAdminMixin:
+    """Admin deletes soft-delete like the API does, instead of the ORM's hard cascade."""
+
+    def soft_delete(self, queryset):
+        raise NotImplementedError
+
+    def delete_model(self, request, obj):
+        self.soft_delete(type(obj).objects.filter(pk=obj.pk))
+
+    def delete_queryset(self, request, queryset):
+        self.soft_delete(queryset)
+
+
+@admin.register(Workspace)
+class WorkspaceAdmin(SoftDeleteAdminMixin, admin.ModelAdmin):
+    list_display = ('name', 'slug', 'member_count', 'project_count', 'created_at')
+    search_fields = ('name', 'slug')
+
+    def soft_delete(self, queryset):
+        for workspace in queryset:
+            soft_delete_workspace(workspace)
+
+
+@admin.register(WorkspaceMembership)
+class WorkspaceMembershipAdmin(SoftDeleteAdminMixin, admin.ModelAdmin):
+    def soft_delete(self, queryset):
+        soft_delete_memberships(queryset)
@@ -0,0 +1,154 @@
+"""
+Native async (ASGI) read-only endpoints for projects and workspaces.
+
+DRF views are sync-only, so under ASGI every DRF request is handed to a thread
+through sync_to_async. These views instead stay on the event loop end to end:
+token/session auth, workspace and membership resolution and the ORM all use
+their async APIs. Permissions, serializers and cursor pagination are the same
+classes the DRF viewsets use; the serializers touch no DB for these models and
+the paginators fetch their page through the async ORM.
+"""
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user
+from django.contrib.auth.models import AnonymousUser
+from django.http import JsonResponse
+from django.views import View
+from rest_framework import exceptions
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.request import Request
+
+from core_auth.authentication import SignedTokenAuthentication
+
+from .instrumentation import set_view_label, span
+from .models import Project, Workspace
+from .pagination import ProjectCursorPagination, WorkspaceCursorPagination
+from .permissions import IsWorkspaceMember
+from .serializers import ProjectSerializer, WorkspaceSerializer, requested_expansions
+
+
+async def aauthenticate(request):
+    """Bearer token first (no DB), then the session user."""
+    try:
+        result = await SignedTokenAuthentication().aauthenticate(request)
+    except exceptions.AuthenticationFailed:
+        return None
+    if result is not None:
+        return result[0]
+    try:
+        user = await request.auser()
+    except AttributeError:
+        # Backends without aget_user() (social_core's OAuth backends) need the sync path.
+        user = await sync_to_async(get_user)(request)
+    return user if user.is_authenticated else None
+
+
+class AsyncAPIView(View):
+    """
+    Authentication and the view's DRF permission classes, run on the event loop.
+    Permissions with an `ahas_permission()` are awaited; the rest (IsAuthenticated)
+    touch no DB and are called directly. Subclasses implement `handle()`.
+    """
+    http_method_names = ['get']
+    permission_classes = [IsAuthenticated]
+    serializer_class = None
+
+    def get_permissions(self):
+        return [permission() for permission in self.permission_classes]
+
+    def get_select_related_fields(self):
+        # Lazy relation loads are sync queries, so `?expand=` relations are joined up front.
+        expandable = getattr(self.serializer_class, 'expandable_fields', {})
+        return requested_expansions(self.drf_request, expandable)
+
+    async def aget_planned_queryset(self, request):
+        queryset = await self.aget_queryset(request)
+        select_related = self.get_select_related_fields()
+        return queryset.select_related(*select_related) if select_related else queryset
+
+    def get_serializer_context(self):
+        return {'request': self.drf_request, 'view': self}
+
+    def get_serializer(self, *args, **kwargs):
+        return self.serializer_class(*args, context=self.get_serializer_context(), **kwargs)
+
+    def permission_denied(self, request, permission):
+        if not request.user.is_authenticated:
+            detail = exceptions.NotAuthenticated.default_detail
+        else:
+            detail = getattr(permission, 'message', exceptions.PermissionDenied.default_detail)
+        return JsonResponse({'detail': str(detail)}, status=exceptions.PermissionDenied.status_code)
+
+    async def get(self, request, *args, **kwargs):
+        set_view_label(type(self).__name__)
+        request.user = await aauthenticate(request) or AnonymousUser()
+        # The DRF view of the request that serializers and paginators expect.
+        self.drf_request = Request(request)
+        self.drf_request.user = request.user
+        with span('permissions'):
+            for permission in self.get_permissions():
+                if hasattr(permission, 'ahas_permission'):
+                    allowed = await permission.ahas_permission(request, self)
+                else:
+                    allowed = permission.has_permission(request, self)
+                if not allowed:
+                    return self.permission_denied(request, permission)
+        return await self.handle(request, *args, **kwargs)
+
+
+class AsyncListView(AsyncAPIView):
+    """One page of `aget_queryset()` through the view's pagination class."""
+    pagination_class = WorkspaceCursorPagination
+
+    async def handle(self, request):
+        paginator = self.pagination_class()
+        queryset = await self.aget_planned_queryset(request)
+        page = await paginator.apaginate_queryset(queryset, self.drf_request, view=self)
+        data = self.get_serializer(page, many=True).data
+        return JsonResponse(paginator.get_paginated_response(data).data)
+
+
+class AsyncRetrieveView(AsyncAPIView):
+    """One object from `aget_object()`, or a 404."""
+
+    async def aget_object(self, request, pk):
+        queryset = await self.aget_planned_queryset(request)
+        return await queryset.filter(pk=pk).afirst()
+
+    async def handle(self, request, pk):
+        instance = await self.aget_object(request, pk)
+        if instance is None:
+            model = self.serializer_class.Meta.model
+            return JsonResponse({'detail': f'No {model._meta.object_name} matches the given query.'}, status=404)
+        return JsonResponse(self.get_serializer(instance).data)
+
+
+class AsyncProjectMixin:
+    permission_classes = [IsAuthenticated, IsWorkspaceMember]
+    serializer_class = ProjectSerializer
+
+    async def aget_queryset(self, request):
+        return Project.objects.for_workspace(await request.aworkspace())
+
+
+class AsyncProjectListView(AsyncProjectMixin, AsyncListView):
+    pagination_class = ProjectCursorPagination
+
+
+class AsyncProjectDetailView(AsyncProjectMixin, AsyncRetrieveView):
+    pass
+
+
+class AsyncWorkspaceMixin:
+    serializer_class = WorkspaceSerializer
+
+    async def aget_queryset(self, request):
+        # Always the live row: the resolver's cached Workspace has stale counters.
+        return Workspace.objects.all()
+
+
+class AsyncWorkspaceListView(AsyncWorkspaceMixin, AsyncListView):
+    pass
+
+
+class AsyncWorkspaceDetailView(AsyncWorkspaceMixin, AsyncRetrieveView):
+    pass
@@ -0,0 +1,70 @@
+"""
+Denormalized per-workspace counters: Workspace.member_count (active
+memberships) and Workspace.project_count.
+
+Single-row writes keep them current through the signals in core.signals; bulk
+paths (bulk_create, invites) call adjust_counts() themselves. Every change is a
+single `UPDATE ... SET n = n + delta` with F(), so concurrent writers never
+lose an increment. reconcile_counts() recomputes them from the source tables
+and repairs any drift (run `manage.py reconcile_workspace_counts`).
+"""
+from django.conf import settings
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import Project, Workspace, WorkspaceMembership
+from .versioning import bump_workspace_version, version_bump
+
+COUNTER_RECONCILE_BATCH_SIZE = getattr(settings, 'COUNTER_RECONCILE_BATCH_SIZE', 1000)
+
+
+def adjust_counts(workspace_id, members=0, projects=0):
+    """Add `members` / `projects` (either may be negative) to a workspace's counters."""
+    changes = {}
+    if members:
+        changes['member_count'] = F('member_count') + members
+    if projects:
+        changes['project_count'] = F('project_count') + projects
+    if not changes:
+        return
+    # update() skips post_save, so bump the version (and with it cached responses)
+    # in the same statement. The resolver's cached Workspace is left alone: it is
+    # never serialized, and dropping it on every project write would cost each
+    # request a lookup.
+    Workspace.all_objects.filter(pk=workspace_id).update(version=version_bump(), **changes)
+
+
+def _count(queryset):
+    counted = queryset.filter(workspace=OuterRef('pk')).order_by().values('workspace').annotate(n=Count('pk')).values('n')
+    return Coalesce(Subquery(counted, output_field=IntegerField()), Value(0))
+
+
+def reconcile_counts(workspace_ids=None, batch_size=COUNTER_RECONCILE_BATCH_SIZE):
+    """
+    Recompute the counters for `workspace_ids` (default: every workspace), one
+    batch of workspaces per query, and write back only the rows that drifted.
+    Returns the number of workspaces repaired.
+    """
+    queryset = Workspace.objects.order_by('pk')
+    if workspace_ids is not None:
+        queryset = queryset.filter(pk__in=workspace_ids)
+    queryset = queryset.annotate(
+        actual_members=_count(WorkspaceMembership.objects.filter(is_active=True)),
+        actual_projects=_count(Project.objects.all()),
+    ).only('pk', *Workspace.COUNTER_FIELDS)
+
+    repaired, last_pk = 0, 0
+    while True:
+        batch = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+        if not batch:
+            return repaired
+        last_pk = batch[-1].pk
+        drifted = []
+        for workspace in batch:
+            if (workspace.member_count, workspace.project_count) != (workspace.actual_members, workspace.actual_projects):
+                workspace.member_count, workspace.project_count = workspace.actual_members, workspace.actual_projects
+                drifted.append(workspace)
+        if drifted:
+            Workspace.objects.bulk_update(drifted, Workspace.COUNTER_FIELDS)
+            bump_workspace_version(*[workspace.pk for workspace in drifted])
+            repaired += len(drifted)
@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+REPLICA_ALIAS = 'replica'
+
+
+def replica_configured():
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+class ReplicaRouter:
+    """
+    Reads go to the replica only where a queryset asks for it with
+    `.using(REPLICA_ALIAS)` (see ReplicaReadMixin); everything else, and every
+    write, stays on the primary.
+    """
+
+    def db_for_write(self, model, **hints):
+        # Also stops instances loaded from the replica being saved back to it.
+        return DEFAULT_DB_ALIAS
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, REPLICA_ALIAS}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == REPLICA_ALIAS:
+            return False
+        return None
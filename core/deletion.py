@@ -0,0 +1,158 @@
+"""
+Soft deletion and the background purge.
+
+Deletes from the API only set `deleted_at`; the default managers hide those
+rows, and the hot-path indexes are partial indexes over live rows, so deleted
+rows cost the request path nothing. Deleting a workspace marks the workspace
+row alone: its projects and memberships become unreachable with it, because
+every workspace-scoped request passes a membership check that joins the live
+workspace row (on every worker, whatever its workspace cache holds), and
+nothing cascades inside the request. The admin deletes through these functions
+too. Model.delete() and QuerySet.delete() are left as Django's hard-deleting
+cascade, for purge_deleted() and maintenance code; nothing on the request path
+calls them.
+
+purge_deleted() (`manage.py purge_deleted`) then removes everything deleted
+longer than SOFT_DELETE_RETENTION_DAYS ago in bounded batches, one transaction
+per batch, optionally copying each row to ArchivedRecord first. A deleted
+workspace's own row goes last, once its children are gone, so the final cascade
+has nothing left to do.
+"""
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .counters import adjust_counts
+from .models import ArchivedRecord, Project, Workspace, WorkspaceMembership
+from .resolvers import invalidate_workspace
+from .versioning import bump_member_versions, bump_workspace_version, version_bump
+
+SOFT_DELETE_RETENTION_DAYS = getattr(settings, 'SOFT_DELETE_RETENTION_DAYS', 30)
+PURGE_BATCH_SIZE = getattr(settings, 'PURGE_BATCH_SIZE', 1000)
+
+
+def _mark_deleted(model, rows_by_group):
+    """
+    Set `deleted_at` on the given pks, one UPDATE per group, and return how
+    many rows each group's UPDATE actually changed. Rows another request
+    deleted after they were read are not counted, so racing deletes never
+    take the same row off a counter twice.
+    """
+    now = timezone.now()
+    return {
+        group: model.all_objects.filter(pk__in=pks, deleted_at__isnull=True).update(deleted_at=now)
+        for group, pks in rows_by_group.items()
+    }
+
+
+def soft_delete_projects(queryset):
+    """Mark the live projects in `queryset` deleted; returns how many were."""
+    by_workspace = defaultdict(list)
+    for pk, workspace_id in queryset.live().values_list('pk', 'workspace_id'):
+        by_workspace[workspace_id].append(pk)
+    deleted = _mark_deleted(Project, by_workspace)
+    for workspace_id, count in deleted.items():
+        adjust_counts(workspace_id, projects=-count)
+    return sum(deleted.values())
+
+
+def soft_delete_memberships(queryset):
+    """Mark the live memberships in `queryset` deleted; returns how many were."""
+    groups, user_ids = defaultdict(list), set()
+    for pk, workspace_id, user_id, is_active in queryset.live().values_list('pk', 'workspace_id', 'user_id', 'is_active'):
+        groups[workspace_id, is_active].append(pk)
+        user_ids.add(user_id)
+    deleted = _mark_deleted(WorkspaceMembership, groups)
+    for workspace_id in {workspace_id for workspace_id, _ in deleted}:
+        active = deleted.get((workspace_id, True), 0)
+        if active:
+            adjust_counts(workspace_id, members=-active)
+        else:
+            bump_workspace_version(workspace_id)
+    bump_member_versions(user_ids)
+    return sum(deleted.values())
+
+
+def soft_delete_workspace(workspace):
+    """Mark `workspace` deleted. Its projects and memberships are left for the purge."""
+    user_ids = list(WorkspaceMembership.objects.filter(workspace=workspace).values_list('user_id', flat=True))
+    Workspace.objects.filter(pk=workspace.pk).update(deleted_at=timezone.now(), version=version_bump())
+    invalidate_workspace(workspace)
+    bump_member_versions(user_ids)
+
+
+def _archive(model, ids):
+    label = model._meta.label_lower
+    ArchivedRecord.objects.bulk_create([
+        ArchivedRecord(
+            label=label,
+            object_id=row['id'],
+            workspace_id=row.get('workspace_id'),
+            data=row,
+            deleted_at=row['deleted_at'],
+        )
+        for row in model.all_objects.filter(pk__in=ids).values()
+    ])
+
+
+class _Budget:
+    def __init__(self, max_batches):
+        self.remaining = max_batches
+
+    def take(self):
+        if self.remaining is None:
+            return True
+        if self.remaining <= 0:
+            return False
+        self.remaining -= 1
+        return True
+
+
+def _purge_batches(model, queryset, batch_size, archive, budget, purged):
+    """Hard-delete `queryset` batch by batch; returns False when the budget ran out first."""
+    while True:
+        ids = list(queryset.order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return True
+        if not budget.take():
+            return False
+        with transaction.atomic():
+            # Deleted rows are already out of every counter and cache, which the
+            # post_delete receivers check for; mark a dead workspace's rows as well.
+            model.all_objects.filter(pk__in=ids, deleted_at__isnull=True).update(deleted_at=timezone.now())
+            if archive:
+                _archive(model, ids)
+            model.all_objects.filter(pk__in=ids).delete()
+        purged[model._meta.label_lower] += len(ids)
+
+
+def purge_deleted(older_than=None, batch_size=PURGE_BATCH_SIZE, max_batches=None, archive=False):
+    """
+    Hard-delete (or archive and delete) rows soft-deleted before `older_than`
+    (default: SOFT_DELETE_RETENTION_DAYS ago), at most `batch_size` rows per
+    transaction and `max_batches` transactions per call. Returns a Counter of
+    purged rows per model label.
+    """
+    if older_than is None:
+        older_than = timezone.now() - timedelta(days=SOFT_DELETE_RETENTION_DAYS)
+    budget, purged = _Budget(max_batches), Counter()
+    for model in (Project, WorkspaceMembership):
+        if not _purge_batches(model, model.all_objects.filter(deleted_at__lt=older_than),
+                              batch_size, archive, budget, purged):
+            return purged
+    for workspace_id in Workspace.all_objects.filter(deleted_at__lt=older_than).values_list('pk', flat=True):
+        for model in (Project, WorkspaceMembership):
+            if not _purge_batches(model, model.all_objects.filter(workspace_id=workspace_id),
+                                  batch_size, archive, budget, purged):
+                return purged
+        if not budget.take():
+            return purged
+        with transaction.atomic():
+            if archive:
+                _archive(Workspace, [workspace_id])
+            Workspace.all_objects.filter(pk=workspace_id).delete()
+        purged[Workspace._meta.label_lower] += 1
+    return purged
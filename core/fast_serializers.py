@@ -0,0 +1,101 @@
+"""
+Read-only fast path for list endpoints.
+
+A ValuesSerializer is compiled once from an ordinary ModelSerializer: each
+field becomes an accessor (output name, `.values()` column, converter). Rows
+then come from `.values()` and are turned into dicts by a tight loop instead of
+DRF's per-instance field binding and `to_representation` dispatch. Only fields
+whose DRF representation differs from the raw column value (dates, decimals,
+uuids ...) keep a converter, and that converter is the DRF field's own
+`to_representation`, so the output matches the ModelSerializer exactly. The
+exception is ISO datetimes, whose timezone is looked up once per call rather
+than once per value.
+"""
+import threading
+
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import ISO_8601, fields as drf_fields, relations, serializers
+from rest_framework.settings import api_settings
+
+# DRF fields whose representation of a non-null column value is the value itself.
+PASSTHROUGH_FIELDS = (
+    drf_fields.BooleanField,
+    drf_fields.CharField,
+    drf_fields.IntegerField,
+    drf_fields.FloatField,
+)
+
+
+def _bind_datetime(field):
+    """DateTimeField.to_representation with the field's timezone resolved up front."""
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+    if output_format is None or output_format.lower() != ISO_8601 or field_timezone is None:
+        return field.to_representation
+
+    def to_representation(value):
+        if value.utcoffset() is None:
+            return field.to_representation(value)
+        value = value.astimezone(field_timezone).isoformat()
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+    return to_representation
+
+
+class ValuesSerializer:
+    _compiled = {}
+    _lock = threading.Lock()
+
+    def __init__(self, serializer_class, fields=None):
+        self.serializer_class = serializer_class
+        self.accessors = [
+            accessor for accessor in self._compile(serializer_class())
+            if fields is None or accessor[0] in fields
+        ]
+        self.columns = [column for _, column, _ in self.accessors]
+
+    @classmethod
+    def for_class(cls, serializer_class, fields=None):
+        """Compiled serializer for `serializer_class`, optionally limited to the output names in `fields`."""
+        key = (serializer_class, tuple(fields) if fields is not None else None)
+        compiled = cls._compiled.get(key)
+        if compiled is None:
+            with cls._lock:
+                compiled = cls._compiled.setdefault(key, cls(serializer_class, fields))
+        return compiled
+
+    @staticmethod
+    def _compile(serializer):
+        model = serializer.Meta.model
+        accessors = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if isinstance(field, (serializers.BaseSerializer, drf_fields.SerializerMethodField)) or '.' in field.source:
+                raise ImproperlyConfigured(
+                    f'{type(serializer).__name__}.{name} needs the full serializer; it has no single column.'
+                )
+            if isinstance(field, relations.PrimaryKeyRelatedField):
+                column, converter = model._meta.get_field(field.source).attname, None
+            elif isinstance(field, PASSTHROUGH_FIELDS):
+                column, converter = field.source, None
+            elif isinstance(field, drf_fields.DateTimeField):
+                column, converter = field.source, (lambda field=field: _bind_datetime(field))
+            else:
+                column, converter = field.source, (lambda field=field: field.to_representation)
+            accessors.append((name, column, converter))
+        return accessors
+
+    def bind(self):
+        """Resolve converters for the current request (active timezone etc.)."""
+        return [(name, column, bind() if bind is not None else None) for name, column, bind in self.accessors]
+
+    def to_representation(self, row, accessors=None):
+        return {
+            name: converter(row[column]) if converter is not None and row[column] is not None else row[column]
+            for name, column, converter in accessors or self.bind()
+        }
+
+    def serialize(self, rows):
+        accessors = self.bind()
+        to_representation = self.to_representation
+        return [to_representation(row, accessors) for row in rows]
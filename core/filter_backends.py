@@ -3,7 +3,7 @@ from rest_framework.filters import BaseFilterBackend
 class WorkspaceFilterBackend(BaseFilterBackend):
     def filter_queryset(self, request, queryset, view):
         workspace = getattr(request, 'workspace', None)
-        if workspace is None:
+        if not workspace:
             return queryset.none()
         if hasattr(queryset, 'for_workspace'):
             return queryset.for_workspace(workspace)
@@ -0,0 +1,295 @@
+"""
+Per-request performance instrumentation.
+
+InstrumentationMiddleware opens a RequestStats for every request and, when it
+finishes, folds wall time, ORM query count/time, serializer time, permission
+and workspace-resolution time and response size into per-view histograms.
+Queries are counted by a database execute wrapper installed on every
+connection, which finds the current request through a ContextVar (so async
+views, whose ORM calls run in worker threads, are covered too).
+
+`metrics.snapshot()` is served by core.views.MetricsView; requests slower than
+SLOW_REQUEST_MS are logged with their slowest SQL.
+"""
+import logging
+import math
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from rest_framework import serializers
+
+logger = logging.getLogger('core.instrumentation')
+
+INSTRUMENTATION_ENABLED = getattr(settings, 'INSTRUMENTATION_ENABLED', True)
+SLOW_REQUEST_MS = getattr(settings, 'SLOW_REQUEST_MS', 500)
+# Slowest statements included in a slow-request log line.
+SLOW_REQUEST_LOG_QUERIES = getattr(settings, 'SLOW_REQUEST_LOG_QUERIES', 10)
+# Statements kept per request for that log; counts and totals are never capped.
+MAX_CAPTURED_QUERIES = 200
+
+PERCENTILES = (0.5, 0.9, 0.95, 0.99)
+
+_current = ContextVar('request_stats', default=None)
+
+
+class Histogram:
+    """
+    Log-linear histogram: every power of two is split into `precision` buckets,
+    so percentiles are within ~1/precision of the true value in constant memory.
+    """
+
+    def __init__(self, precision=8):
+        self.precision = precision
+        self.buckets = defaultdict(int)
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def _index(self, value):
+        return math.floor(math.log2(value) * self.precision) if value > 0 else -math.inf
+
+    def _upper(self, index):
+        return 0.0 if index == -math.inf else 2 ** ((index + 1) / self.precision)
+
+    def record(self, value):
+        self.buckets[self._index(value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def percentile(self, p):
+        if not self.count:
+            return 0.0
+        rank = p * self.count
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(self._upper(index), self.max)
+        return self.max
+
+    def summary(self):
+        summary = {'count': self.count, 'sum': round(self.total, 3)}
+        if self.count:
+            summary.update(
+                mean=round(self.total / self.count, 3),
+                min=round(self.min, 3),
+                max=round(self.max, 3),
+                **{f'p{round(p * 100)}': round(self.percentile(p), 3) for p in PERCENTILES},
+            )
+        return summary
+
+
+class MetricsRegistry:
+    """Histograms keyed by (view label, metric name), shared by every thread."""
+
+    def __init__(self):
+        self._histograms = defaultdict(Histogram)
+        self._lock = threading.Lock()
+
+    def record(self, view, values):
+        with self._lock:
+            for name, value in values.items():
+                if value is not None:
+                    self._histograms[(view, name)].record(value)
+
+    def snapshot(self):
+        with self._lock:
+            snapshot = defaultdict(dict)
+            for (view, name), histogram in sorted(self._histograms.items()):
+                snapshot[view][name] = histogram.summary()
+        return dict(snapshot)
+
+    def clear(self):
+        with self._lock:
+            self._histograms.clear()
+
+
+metrics = MetricsRegistry()
+
+
+class RequestStats:
+    def __init__(self, request):
+        self.started = time.perf_counter()
+        self.view = None
+        self.query_count = 0
+        self.query_time = 0.0
+        self.queries = []
+        self.spans = defaultdict(float)
+        self.request = request
+
+    def record_query(self, sql, duration):
+        self.query_count += 1
+        self.query_time += duration
+        if len(self.queries) < MAX_CAPTURED_QUERIES:
+            self.queries.append((duration, sql))
+
+
+def current_stats():
+    return _current.get()
+
+
+@contextmanager
+def span(name):
+    """Add the time spent in the block to the current request's `name` span."""
+    stats = _current.get()
+    if stats is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.spans[name] += time.perf_counter() - start
+
+
+def set_view_label(label):
+    stats = _current.get()
+    if stats is not None:
+        stats.view = label
+
+
+def _query_wrapper(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.record_query(sql, time.perf_counter() - start)
+
+
+def install_query_wrapper(sender=None, connection=None, **kwargs):
+    if _query_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_query_wrapper)
+
+
+def connect_signals():
+    connection_created.connect(install_query_wrapper, dispatch_uid='core.instrumentation.query_wrapper')
+
+
+def _default_label(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    view_class = getattr(match.func, 'cls', None) or getattr(match.func, 'view_class', None)
+    if view_class is None:
+        return match.view_name or match.func.__name__
+    action = (getattr(match.func, 'actions', None) or {}).get(request.method.lower())
+    return f'{view_class.__name__}.{action}' if action else view_class.__name__
+
+
+def _response_size(response):
+    if getattr(response, 'streaming', False):
+        return None
+    return len(response.content)
+
+
+def finish(stats, response):
+    wall = time.perf_counter() - stats.started
+    label = f'{stats.request.method} {stats.view or _default_label(stats.request)}'
+    values = {
+        'wall_ms': wall * 1000,
+        'db_queries': stats.query_count,
+        'db_ms': stats.query_time * 1000,
+        'response_bytes': _response_size(response),
+    }
+    values.update({f'{name}_ms': seconds * 1000 for name, seconds in stats.spans.items()})
+    metrics.record(label, values)
+
+    if wall * 1000 >= SLOW_REQUEST_MS:
+        slowest = sorted(stats.queries, key=lambda q: q[0], reverse=True)[:SLOW_REQUEST_LOG_QUERIES]
+        logger.warning(
+            'Slow request %s %s (%s, status %s): %.1f ms, %d queries in %.1f ms\n%s',
+            stats.request.method, stats.request.path, label, response.status_code,
+            wall * 1000, stats.query_count, stats.query_time * 1000,
+            '\n'.join(f'  {duration * 1000:8.2f} ms  {sql}' for duration, sql in slowest),
+        )
+
+
+class InstrumentationMiddleware:
+    """Put this first in MIDDLEWARE so every other middleware is measured too."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not INSTRUMENTATION_ENABLED:
+            return self.get_response(request)
+        stats = RequestStats(request)
+        token = _current.set(stats)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        finish(stats, response)
+        return response
+
+    async def __acall__(self, request):
+        if not INSTRUMENTATION_ENABLED:
+            return await self.get_response(request)
+        stats = RequestStats(request)
+        token = _current.set(stats)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        finish(stats, response)
+        return response
+
+
+class TimedSerializerMixin:
+    """
+    Serializer mixin: validation (`is_valid()`) and representation (`.data`)
+    count towards the request's 'serializer' span. Nested fields go through
+    to_representation()/run_validation(), so only the outermost serializer is timed.
+    """
+
+    def is_valid(self, *args, **kwargs):
+        with span('serializer'):
+            return super().is_valid(*args, **kwargs)
+
+    @property
+    def data(self):
+        with span('serializer'):
+            return super().data
+
+
+class TimedListSerializer(TimedSerializerMixin, serializers.ListSerializer):
+    """`many=True` counterpart; name it as Meta.list_serializer_class of a timed serializer."""
+
+
+class InstrumentedViewMixin:
+    """
+    DRF view mixin: labels the request with `<View>.<action>` and times
+    permission checks. Serializers time themselves (TimedSerializerMixin).
+    """
+
+    def initial(self, request, *args, **kwargs):
+        action = getattr(self, 'action', None)
+        set_view_label(f'{type(self).__name__}.{action}' if action else type(self).__name__)
+        super().initial(request, *args, **kwargs)
+
+    def check_permissions(self, request):
+        with span('permissions'):
+            super().check_permissions(request)
+
+    def check_object_permissions(self, request, obj):
+        with span('permissions'):
+            super().check_object_permissions(request, obj)
@@ -0,0 +1,24 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.deletion import PURGE_BATCH_SIZE, SOFT_DELETE_RETENTION_DAYS, purge_deleted
+
+
+class Command(BaseCommand):
+    help = "Hard-delete (or archive) soft-deleted workspaces, projects and memberships in bounded batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=float, default=SOFT_DELETE_RETENTION_DAYS,
+                            help="Only purge rows deleted at least this many days ago.")
+        parser.add_argument("--batch-size", type=int, default=PURGE_BATCH_SIZE)
+        parser.add_argument("--max-batches", type=int, default=None, help="Stop after this many batches.")
+        parser.add_argument("--archive", action="store_true", help="Copy rows to ArchivedRecord before deleting them.")
+
+    def handle(self, *args, **options):
+        purged = purge_deleted(
+            older_than=timezone.now() - timedelta(days=options["days"]),
+            batch_size=options["batch_size"], max_batches=options["max_batches"], archive=options["archive"],
+        )
+        self.stdout.write(" ".join(f"{label}={count}" for label, count in sorted(purged.items())) or "nothing to purge")
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from core.counters import COUNTER_RECONCILE_BATCH_SIZE, reconcile_counts
+
+
+class Command(BaseCommand):
+    help = "Recompute workspace member/project counters and repair any that drifted."
+
+    def add_arguments(self, parser):
+        parser.add_argument("workspace_ids", nargs="*", type=int, help="Only these workspaces (default: all).")
+        parser.add_argument("--batch-size", type=int, default=COUNTER_RECONCILE_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        repaired = reconcile_counts(options["workspace_ids"] or None, batch_size=options["batch_size"])
+        self.stdout.write(f"repaired={repaired}")
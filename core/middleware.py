@@ -1,12 +1,44 @@
-from django.utils.deprecation import MiddlewareMixin
-from .models import Workspace
+from functools import partial
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.utils.functional import SimpleLazyObject
+from .instrumentation import span
+from .resolvers import aget_workspace, get_workspace
+
+class WorkspaceMiddleware:
+    """
+    Attaches the workspace named by X-Workspace-Id (id or slug) to the request.
+
+    Runs natively under both WSGI and ASGI. Nothing is looked up here:
+    sync code reads the lazy `request.workspace`, async code awaits
+    `request.aworkspace()`.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        self.process_request(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        self.process_request(request)
+        return await self.get_response(request)
 
-class WorkspaceMiddleware(MiddlewareMixin):
     def process_request(self, request):
-        workspace_id = request.headers.get('X-Workspace-Id') or request.GET.get('workspace_id')
+        with span('workspace_middleware'):
+            self._attach_workspace(request)
+
+    def _attach_workspace(self, request):
+        identifier = request.headers.get('X-Workspace-Id') or request.GET.get('workspace_id')
         request.workspace = None
-        if workspace_id:
-            try:
-                request.workspace = Workspace.objects.get(pk=workspace_id)
-            except Workspace.DoesNotExist:
-                request.workspace = None
+        request.aworkspace = partial(aget_workspace, identifier)
+        if identifier:
+            request.workspace = SimpleLazyObject(lambda: get_workspace(identifier))
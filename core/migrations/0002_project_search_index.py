@@ -0,0 +1,77 @@
+from django.db import migrations
+
+# Full-text index over Project.name (weighted) and Project.description, kept in
+# sync by the database itself so bulk_create/bulk_update/queryset.update() are
+# covered too. See core.search for the matching queries.
+
+SQLITE_FORWARDS = [
+    """
+    CREATE VIRTUAL TABLE core_project_fts USING fts5(
+        name, description,
+        content='core_project', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER core_project_fts_ai AFTER INSERT ON core_project BEGIN
+        INSERT INTO core_project_fts(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER core_project_fts_ad AFTER DELETE ON core_project BEGIN
+        INSERT INTO core_project_fts(core_project_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER core_project_fts_au AFTER UPDATE OF name, description ON core_project BEGIN
+        INSERT INTO core_project_fts(core_project_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO core_project_fts(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END
+    """,
+    "INSERT INTO core_project_fts(core_project_fts) VALUES ('rebuild')",
+]
+
+SQLITE_BACKWARDS = [
+    "DROP TRIGGER IF EXISTS core_project_fts_au",
+    "DROP TRIGGER IF EXISTS core_project_fts_ad",
+    "DROP TRIGGER IF EXISTS core_project_fts_ai",
+    "DROP TABLE IF EXISTS core_project_fts",
+]
+
+POSTGRES_FORWARDS = [
+    """
+    ALTER TABLE core_project ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX core_project_search_gin ON core_project USING GIN (search_vector)",
+]
+
+POSTGRES_BACKWARDS = [
+    "DROP INDEX IF EXISTS core_project_search_gin",
+    "ALTER TABLE core_project DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def _run(statements_by_vendor):
+    def run(apps, schema_editor):
+        for sql in statements_by_vendor.get(schema_editor.connection.vendor, ()):
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            _run({'sqlite': SQLITE_FORWARDS, 'postgresql': POSTGRES_FORWARDS}),
+            _run({'sqlite': SQLITE_BACKWARDS, 'postgresql': POSTGRES_BACKWARDS}),
+        ),
+    ]
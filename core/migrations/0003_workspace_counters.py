@@ -0,0 +1,42 @@
+# Generated by Django 5.2.8 on 2026-10-18 16:15
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def _count(model, **filters):
+    counted = (
+        model.objects.filter(workspace=OuterRef('pk'), **filters)
+        .order_by().values('workspace').annotate(n=Count('pk')).values('n')
+    )
+    return Coalesce(Subquery(counted, output_field=IntegerField()), Value(0))
+
+
+def backfill_counts(apps, schema_editor):
+    Workspace = apps.get_model('core', 'Workspace')
+    Workspace.objects.update(
+        member_count=_count(apps.get_model('core', 'WorkspaceMembership'), is_active=True),
+        project_count=_count(apps.get_model('core', 'Project')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_project_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workspace',
+            name='member_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='workspace',
+            name='project_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,107 @@
+# Generated by Django 5.2.8 on 2026-10-18 16:21
+
+import django.core.serializers.json
+import django.db.models.manager
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_workspace_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('label', models.CharField(max_length=100)),
+                ('object_id', models.BigIntegerField()),
+                ('workspace_id', models.BigIntegerField(null=True)),
+                ('data', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('deleted_at', models.DateTimeField(null=True)),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AlterModelOptions(
+            name='workspace',
+            options={'default_manager_name': 'all_objects'},
+        ),
+        migrations.AlterModelManagers(
+            name='workspace',
+            managers=[
+                ('all_objects', django.db.models.manager.Manager()),
+            ],
+        ),
+        migrations.RemoveIndex(
+            model_name='project',
+            name='core_projec_workspa_310f22_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='workspacemembership',
+            name='core_worksp_workspa_46a682_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='workspacemembership',
+            name='core_worksp_workspa_a9e3d9_idx',
+        ),
+        migrations.AlterUniqueTogether(
+            name='workspacemembership',
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='workspace',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='workspacemembership',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['workspace', 'name'], name='core_project_live_ws_name'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', False)), fields=['deleted_at'], name='core_project_deleted'),
+        ),
+        migrations.AddIndex(
+            model_name='workspace',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', False)), fields=['deleted_at'], name='core_workspace_deleted'),
+        ),
+        migrations.AddIndex(
+            model_name='workspacemembership',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['workspace', 'user'], name='core_membership_live_ws_user'),
+        ),
+        migrations.AddIndex(
+            model_name='workspacemembership',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['workspace', 'role'], name='core_membership_live_ws_role'),
+        ),
+        migrations.AddIndex(
+            model_name='workspacemembership',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', False)), fields=['deleted_at'], name='core_membership_deleted'),
+        ),
+        migrations.AddConstraint(
+            model_name='workspacemembership',
+            constraint=models.UniqueConstraint(condition=models.Q(('deleted_at__isnull', True)), fields=('user', 'workspace'), name='core_membership_live_user_workspace'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedrecord',
+            index=models.Index(fields=['label', 'object_id'], name='core_archiv_label_56f7f3_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedrecord',
+            index=models.Index(fields=['workspace_id'], name='core_archiv_workspa_735ce7_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-18 16:38
+
+import core.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_soft_delete'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workspace',
+            name='version',
+            field=models.PositiveBigIntegerField(default=core.models.initial_version, editable=False),
+        ),
+    ]
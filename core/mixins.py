@@ -0,0 +1,317 @@
+import hashlib
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from .db_router import REPLICA_ALIAS, replica_configured
+from .fast_serializers import ValuesSerializer
+from .instrumentation import span
+from .response_cache import response_cache
+from .serializers import requested_expansions, requested_fieldset, sparse_field_names
+from .streaming import csv_response, ndjson_response
+from .versioning import get_workspace_version
+
+EXPORT_CHUNK_SIZE = getattr(settings, 'EXPORT_CHUNK_SIZE', 2000)
+
+
+class StreamingExportMixin:
+    """
+    Adds a GET `export/` action that streams every row of the filtered queryset as
+    NDJSON (default) or CSV (`?export_format=csv`) without materializing it.
+
+    Rows come straight from `.values()` over a chunked server-side iterator, so memory
+    stays flat however large the workspace is.
+    """
+    export_fields = ()
+    # Extra computed columns, e.g. {'user_email': F('user__email')}
+    export_annotations = {}
+    export_filename = 'export'
+
+    def get_export_fieldnames(self):
+        return list(self.export_fields) + list(self.export_annotations)
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        export_format = request.query_params.get('export_format', 'ndjson')
+        if export_format not in ('ndjson', 'csv'):
+            return Response({'detail': 'export_format must be "ndjson" or "csv"'}, status=status.HTTP_400_BAD_REQUEST)
+        queryset = self.filter_queryset(self.get_queryset()).order_by('pk')
+        rows = queryset.values(*self.export_fields, **self.export_annotations).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        if export_format == 'csv':
+            return csv_response(rows, self.get_export_fieldnames(), f'{self.export_filename}.csv')
+        return ndjson_response(rows)
+
+
+def pagination_columns(pagination_class):
+    """Columns a cursor paginator orders by (and so must find on every row)."""
+    ordering = getattr(pagination_class, 'ordering', None) or ()
+    if isinstance(ordering, str):
+        ordering = (ordering,)
+    return [name.lstrip('-') for name in ordering]
+
+
+class QueryPlanMixin:
+    """
+    Viewsets declare the joins their serializers need instead of leaving them to
+    lazy attribute access (one query per row). Fields expanded with `?expand=`
+    are joined as well.
+    """
+    select_related_fields = ()
+    prefetch_related_fields = ()
+    # Actions whose querysets load only the columns a `?fields=`/`?omit=` selection needs.
+    sparse_fieldset_actions = ('list', 'search')
+
+    def get_select_related_fields(self):
+        expandable = getattr(self.get_serializer_class(), 'expandable_fields', {})
+        return list(self.select_related_fields) + requested_expansions(self.request, expandable)
+
+    def get_only_fields(self, select_related):
+        """Arguments for `.only()` under a sparse fieldset, or None to load every column."""
+        if self.action not in self.sparse_fieldset_actions or requested_fieldset(self.request) == (None, None):
+            return None
+        model = self.queryset.model
+        only = {model._meta.pk.name, *select_related, *pagination_columns(self.pagination_class)}
+        for field in self.get_serializer().fields.values():
+            if field.source == '*':
+                return None
+            path = field.source.replace('.', '__')
+            try:
+                model._meta.get_field(path.split('__')[0])
+            except FieldDoesNotExist:
+                return None  # a property or method may read any column
+            only.add(path)
+        return sorted(only)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        select_related = self.get_select_related_fields()
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if self.prefetch_related_fields:
+            queryset = queryset.prefetch_related(*self.prefetch_related_fields)
+        only = self.get_only_fields(select_related)
+        if only:
+            queryset = queryset.only(*only)
+        return queryset
+
+
+class ReplicaReadMixin:
+    """
+    Serve the listed (read-only) viewset actions' querysets from the read replica.
+    Only that queryset moves: authentication, permission and workspace lookups
+    stay on the primary.
+    """
+    replica_actions = ('list', 'retrieve')
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in self.replica_actions and replica_configured():
+            queryset = queryset.using(REPLICA_ALIAS)
+        return queryset
+
+
+def _etag_matches(header, etag, weak=True):
+    """RFC 9110 comparison of `etag` against an If-Match / If-None-Match header."""
+    if not header:
+        return False
+    candidates = parse_etags(header)
+    if '*' in candidates:
+        return True
+    if weak:
+        candidates = [c[2:] if c.startswith('W/') else c for c in candidates]
+    return etag in candidates
+
+
+class ConditionalListMixin:
+    """
+    Strong ETags for workspace-scoped lists, derived from the workspace change
+    version (core.versioning) rather than the response body. A matching
+    If-None-Match is answered with 304 before the list query runs.
+    """
+
+    def get_list_etag(self, request):
+        workspace = request.workspace
+        if not workspace:
+            return None
+        # Read the version before querying: a write racing the query can only make
+        # the ETag older than the body, which costs the client one extra 200.
+        version = get_workspace_version(workspace.pk, request)
+        renderer = getattr(request, 'accepted_renderer', None)
+        raw = f'{workspace.pk}:{version}:{request.get_full_path()}:{getattr(renderer, "format", "")}'
+        return quote_etag(hashlib.sha1(raw.encode()).hexdigest())
+
+    def list(self, request, *args, **kwargs):
+        etag = self.get_list_etag(request)
+        if etag and _etag_matches(request.headers.get('If-None-Match'), etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+        response = super().list(request, *args, **kwargs)
+        if etag and response.status_code == status.HTTP_200_OK:
+            response['ETag'] = etag
+        return response
+
+
+class ConditionalObjectMixin:
+    """
+    Per-object ETags on retrieve/update, and If-Match for optimistic concurrency:
+    an update whose If-Match no longer matches the stored row gets 412.
+    """
+
+    def get_object_etag(self, obj):
+        values = [(f.attname, getattr(obj, f.attname)) for f in obj._meta.concrete_fields]
+        return quote_etag(hashlib.sha1(repr(values).encode()).hexdigest())
+
+    def get_object(self):
+        # update() checks the precondition and then lets DRF load the object again.
+        if getattr(self, '_conditional_object', None) is None:
+            self._conditional_object = super().get_object()
+        return self._conditional_object
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if getattr(self, '_lock_for_update', False):
+            queryset = queryset.select_for_update(of=('self',))
+        return queryset
+
+    def retrieve(self, request, *args, **kwargs):
+        etag = self.get_object_etag(self.get_object())
+        if _etag_matches(request.headers.get('If-None-Match'), etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+        response = super().retrieve(request, *args, **kwargs)
+        response['ETag'] = etag
+        return response
+
+    def update(self, request, *args, **kwargs):
+        if_match = request.headers.get('If-Match')
+        if not if_match:
+            response = super().update(request, *args, **kwargs)
+        else:
+            with transaction.atomic():
+                # Hold the row until the write lands so two clients can't both pass the check.
+                self._lock_for_update = True
+                obj = self.get_object()
+                if not _etag_matches(if_match, self.get_object_etag(obj), weak=False):
+                    return Response(
+                        {'detail': 'The resource has changed since it was fetched.'},
+                        status=status.HTTP_412_PRECONDITION_FAILED,
+                        headers={'ETag': self.get_object_etag(obj)},
+                    )
+                response = super().update(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            response['ETag'] = self.get_object_etag(self.get_object())
+        return response
+
+
+class CachedResponseMixin:
+    """
+    Serve the listed actions from a cache of rendered bodies keyed by
+    (workspace, workspace version, path + query, renderer, serializer), so
+    identical reads from any member skip both the ORM and serialization.
+    Views whose data isn't workspace-scoped override get_response_cache_scope().
+    Permission checks still run on every request. Only the formats listed are
+    cached; the browsable API renders per-user chrome.
+    """
+    response_cache_actions = ('list',)
+    response_cache_formats = ('json',)
+
+    def get_response_cache_workspace_id(self, request):
+        workspace = request.workspace
+        return workspace.pk if workspace else None
+
+    def get_response_cache_scope(self, request):
+        """(scope, version) a cached body belongs to and is valid for, or None to skip the cache."""
+        workspace_id = self.get_response_cache_workspace_id(request)
+        if workspace_id is None:
+            return None
+        version = get_workspace_version(workspace_id, request)
+        if version is None:
+            return None
+        return workspace_id, version
+
+    def get_response_cache_key(self, request):
+        if self.action not in self.response_cache_actions:
+            return None
+        renderer_format = getattr(getattr(request, 'accepted_renderer', None), 'format', None)
+        if renderer_format not in self.response_cache_formats:
+            return None
+        scope = self.get_response_cache_scope(request)
+        if scope is None:
+            return None
+        serializer_class = self.get_serializer_class()
+        return response_cache.make_key(
+            *scope,
+            request.get_full_path(),
+            renderer_format,
+            f'{serializer_class.__module__}.{serializer_class.__qualname__}',
+        )
+
+    def _cached(self, handler, request, *args, **kwargs):
+        key = self.get_response_cache_key(request)
+        if key is None:
+            return handler(request, *args, **kwargs)
+        entry = response_cache.get(key)
+        if entry is not None:
+            content, content_type = entry
+            response = HttpResponse(content, content_type=content_type)
+            response['X-Cache'] = 'HIT'
+            return response
+        self._response_cache_key = key
+        return handler(request, *args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        return self._cached(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._cached(super().retrieve, request, *args, **kwargs)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        key = getattr(self, '_response_cache_key', None)
+        if key and isinstance(response, Response) and response.status_code == status.HTTP_200_OK:
+            response.render()
+            response_cache.set(key, response.content, response['Content-Type'])
+            response['X-Cache'] = 'MISS'
+        return response
+
+
+class FastListMixin:
+    """
+    Serve `list` from `.values()` rows through a ValuesSerializer compiled from
+    the view's serializer class. Requests that need the full serializer (any
+    `?expand=`) take the regular path.
+    """
+
+    def use_fast_list(self, request):
+        expandable = getattr(self.get_serializer_class(), 'expandable_fields', {})
+        return not requested_expansions(request, expandable)
+
+    def get_values_serializer(self, serializer_class):
+        """The compiled serializer, narrowed to any `?fields=`/`?omit=` selection."""
+        serializer = ValuesSerializer.for_class(serializer_class)
+        if requested_fieldset(self.request) == (None, None):
+            return serializer
+        names = sparse_field_names(self.request, [name for name, _, _ in serializer.accessors])
+        return ValuesSerializer.for_class(serializer_class, names)
+
+    def get_values_columns(self, serializer, pagination_class):
+        # CursorPagination reads its ordering fields off the rows, selected or not.
+        return list(dict.fromkeys([*serializer.columns, *pagination_columns(pagination_class)]))
+
+    def list(self, request, *args, **kwargs):
+        if not self.use_fast_list(request):
+            return super().list(request, *args, **kwargs)
+        serializer = self.get_values_serializer(self.get_serializer_class())
+        columns = self.get_values_columns(serializer, self.pagination_class)
+        queryset = self.filter_queryset(self.get_queryset()).values(*columns)
+        page = self.paginate_queryset(queryset)
+        rows = page if page is not None else queryset
+        with span('serializer'):
+            data = serializer.serialize(rows)
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
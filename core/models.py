@@ -1,10 +1,37 @@
+import time
+
 from django.db import models
+from django.db.models import Q
 from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
 
+LIVE = Q(deleted_at__isnull=True)
+DELETED = Q(deleted_at__isnull=False)
+
+
+class SoftDeleteQuerySet(models.QuerySet):
+    def live(self):
+        return self.filter(LIVE)
+
+    def deleted(self):
+        return self.filter(DELETED)
+
+class LiveManager(models.Manager):
+    """
+    Default manager of the soft-deletable models: hides rows whose `deleted_at`
+    is set, so every hot-path query carries the predicate of the partial
+    live-row indexes. `all_objects` sees everything (core.deletion purges through it).
+    """
+    def get_queryset(self):
+        return super().get_queryset().filter(LIVE)
+
+def initial_version():
+    # A timestamp rather than 0, so a reused primary key never inherits cached versions.
+    return time.time_ns()
 
 
 class Workspace(models.Model):
@@ -12,13 +39,40 @@ class Workspace(models.Model):
     slug = models.SlugField(max_length=160, unique=True)
     created_at = models.DateTimeField(default=timezone.now)
     owner = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='owned_workspaces')
+    # Maintained by core.counters: active memberships and projects in the workspace.
+    member_count = models.PositiveIntegerField(default=0, editable=False)
+    project_count = models.PositiveIntegerField(default=0, editable=False)
+    # Set by core.deletion.soft_delete_workspace(); the slug stays taken until the purge.
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+    # Change version of everything scoped to the workspace (core.versioning).
+    version = models.PositiveBigIntegerField(default=initial_version, editable=False)
+
+    objects = LiveManager.from_queryset(SoftDeleteQuerySet)()
+    all_objects = SoftDeleteQuerySet.as_manager()
+
+    COUNTER_FIELDS = ('member_count', 'project_count')
 
     class Meta:
-        indexes = [models.Index(fields=['slug']), models.Index(fields=['name'])]
+        # Unique validation must see soft-deleted slugs too.
+        default_manager_name = 'all_objects'
+        indexes = [
+            models.Index(fields=['slug']),
+            models.Index(fields=['name']),
+            models.Index(fields=['deleted_at'], condition=DELETED, name='core_workspace_deleted'),
+        ]
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        # Counters, version and deleted_at only ever change through update(); never write back a stale copy.
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                f.attname for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in (*self.COUNTER_FIELDS, 'version', 'deleted_at')
+            ]
+        super().save(*args, **kwargs)
+
 class WorkspaceMembership(models.Model):
     ROLE_OWNER = 'owner'
     ROLE_ADMIN = 'admin'
@@ -30,23 +84,42 @@ class WorkspaceMembership(models.Model):
     role = models.CharField(max_length=20, choices=ROLE_CHOICES, default=ROLE_MEMBER)
     created_at = models.DateTimeField(default=timezone.now)
     is_active = models.BooleanField(default=True)
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = LiveManager.from_queryset(SoftDeleteQuerySet)()
+    all_objects = SoftDeleteQuerySet.as_manager()
 
     class Meta:
-        unique_together = ('user', 'workspace')
-        indexes = [models.Index(fields=['workspace', 'user']), models.Index(fields=['workspace', 'role'])]
+        # Live rows only: a removed member can be invited again before the purge.
+        constraints = [models.UniqueConstraint(fields=['user', 'workspace'], condition=LIVE, name='core_membership_live_user_workspace')]
+        indexes = [
+            models.Index(fields=['workspace', 'user'], condition=LIVE, name='core_membership_live_ws_user'),
+            models.Index(fields=['workspace', 'role'], condition=LIVE, name='core_membership_live_ws_role'),
+            models.Index(fields=['deleted_at'], condition=DELETED, name='core_membership_deleted'),
+        ]
 
     def __str__(self):
         return f'{self.user_id}@{self.workspace_id}:{self.role}'
 
-class WorkspaceQuerySet(models.QuerySet):
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Lets the counter signals tell an is_active flip from any other save.
+        instance._loaded_is_active = instance.__dict__.get('is_active')
+        return instance
+
+class WorkspaceQuerySet(SoftDeleteQuerySet):
     def for_workspace(self, workspace):
-        if workspace is None:
+        if not workspace:
             return self.none()
         return self.filter(workspace_id=workspace.id)
 
 class WorkspaceModel(models.Model):
     workspace = models.ForeignKey(Workspace, on_delete=models.CASCADE, related_name='+')
-    objects = WorkspaceQuerySet.as_manager()
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = LiveManager.from_queryset(WorkspaceQuerySet)()
+    all_objects = WorkspaceQuerySet.as_manager()
 
     class Meta:
         abstract = True
@@ -58,4 +131,37 @@ class Project(WorkspaceModel):
     created_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
-        indexes = [models.Index(fields=['workspace', 'name'])]
+        indexes = [
+            models.Index(fields=['workspace', 'name'], condition=LIVE, name='core_project_live_ws_name'),
+            models.Index(fields=['deleted_at'], condition=DELETED, name='core_project_deleted'),
+        ]
+
+class MembershipVersion(models.Model):
+    """
+    Change version of one user's workspace memberships, and of the names and
+    slugs of those workspaces (core.versioning). The row is created on the first bump.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='+')
+    version = models.PositiveBigIntegerField(default=initial_version)
+
+    def __str__(self):
+        return f'{self.user_id}:{self.version}'
+
+class ArchivedRecord(models.Model):
+    """
+    Cold copy of a purged row (core.deletion.purge_deleted(archive=True)). Kept
+    in its own table so archived data never weighs on the live tables' indexes.
+    """
+    label = models.CharField(max_length=100)  # e.g. "core.project"
+    object_id = models.BigIntegerField()
+    # Plain ids: the rows they pointed at may be purged as well.
+    workspace_id = models.BigIntegerField(null=True)
+    data = models.JSONField(encoder=DjangoJSONEncoder)
+    deleted_at = models.DateTimeField(null=True)
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [models.Index(fields=['label', 'object_id']), models.Index(fields=['workspace_id'])]
+
+    def __str__(self):
+        return f'{self.label}:{self.object_id}'
@@ -0,0 +1,146 @@
+import json
+
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+def keyset_filter(ordering, position, reverse=False):
+    """
+    Rows strictly after `position` in `ordering` (before it when `reverse`):
+    (a, b) > (x, y)  <=>  a > x OR (a = x AND b > y).
+    """
+    after = Q()
+    for i, order in enumerate(ordering):
+        field = order.lstrip('-')
+        lookup = 'lt' if reverse != order.startswith('-') else 'gt'
+        step = Q(**{f'{field}__{lookup}': position[i]})
+        for prev_order, prev_value in zip(ordering[:i], position[:i]):
+            step &= Q(**{prev_order.lstrip('-'): prev_value})
+        after |= step
+    return after
+
+
+def _reverse_ordering(ordering):
+    return tuple(order[1:] if order.startswith('-') else f'-{order}' for order in ordering)
+
+
+class WorkspaceCursorPagination(CursorPagination):
+    """
+    Keyset pagination with opaque cursors. The leading ordering field matches the
+    (workspace, <field>) index, so every page is an index range scan regardless of depth.
+
+    DRF's CursorPagination keeps only the first ordering field in the cursor plus an
+    offset into the run of rows sharing it. Here the cursor carries the value of every
+    ordering field and each page filters on the whole tuple, so the ordering must be
+    unique (end it with the primary key) and ties on the leading field are never skipped
+    or repeated. Ordering fields must be non-null.
+    """
+    ordering = ('id',)
+    page_size = getattr(settings, 'API_PAGE_SIZE', 50)
+    page_size_query_param = 'page_size'
+    max_page_size = getattr(settings, 'API_MAX_PAGE_SIZE', 500)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self._page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self._set_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """paginate_queryset() for async views: the page is fetched with the async ORM."""
+        queryset = self._page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self._set_page([row async for row in queryset])
+
+    def _page_queryset(self, queryset, request, view):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+        if reverse:
+            queryset = queryset.order_by(*_reverse_ordering(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        if self.cursor is not None and self.cursor.position is not None:
+            position = self._decode_position(self.cursor.position)
+            queryset = queryset.filter(keyset_filter(self.ordering, position, reverse))
+        # One extra row tells us whether another page follows. Positions are unique,
+        # so the offset DRF keeps for ties is always zero.
+        return queryset[:self.page_size + 1]
+
+    def _set_page(self, results):
+        if self.cursor is None:
+            reverse, current_position = False, None
+        else:
+            reverse, current_position = self.cursor.reverse, self.cursor.position
+
+        self.page = results[:self.page_size]
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(results[-1], self.ordering)
+        else:
+            has_following_position, following_position = False, None
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = current_position is not None
+            self.has_previous = has_following_position
+            self.next_position, self.previous_position = current_position, following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = current_position is not None
+            self.next_position, self.previous_position = following_position, current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def _decode_position(self, position):
+        try:
+            values = json.loads(position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return values
+
+    def _get_position_from_instance(self, instance, ordering):
+        if isinstance(instance, dict):
+            values = [instance[order.lstrip('-')] for order in ordering]
+        else:
+            values = [getattr(instance, order.lstrip('-')) for order in ordering]
+        return json.dumps([str(value) for value in values])
+
+
+class ProjectCursorPagination(WorkspaceCursorPagination):
+    # Names aren't unique; the cursor carries (name, id), so projects sharing a
+    # name page in id order without gaps or repeats.
+    ordering = ('name', 'id')
+
+
+class MembershipCursorPagination(WorkspaceCursorPagination):
+    # user is unique within a workspace, so it alone gives a stable order.
+    ordering = ('user_id',)
+
+
+class MyWorkspacesPagination(WorkspaceCursorPagination):
+    # Same (name, id) keyset as projects.
+    ordering = ('name', 'id')
+
+
+class SearchPagination(PageNumberPagination):
+    """
+    Relevance order isn't a unique, monotonic key, so ranked search results are
+    paged by number instead of by cursor.
+    """
+    page_size = getattr(settings, 'API_PAGE_SIZE', 50)
+    page_size_query_param = 'page_size'
+    max_page_size = getattr(settings, 'API_MAX_PAGE_SIZE', 500)
@@ -1,37 +1,24 @@
 from rest_framework import permissions
-from .models import WorkspaceMembership, Workspace
+from .models import WorkspaceMembership
+from .resolvers import aget_membership_role, aget_workspace, get_membership_role, get_view_workspace
 
 class IsWorkspaceMember(permissions.BasePermission):
     def has_permission(self, request, view):
         workspace = getattr(request, 'workspace', None)
-        user = request.user if request.user and request.user.is_authenticated else None
-        if not workspace or not user:
-            return False
-        return WorkspaceMembership.objects.filter(workspace=workspace, user=user, is_active=True).exists()
+        return get_membership_role(request, workspace) is not None
 
-class IsWorkspaceAdminOrOwner(permissions.BasePermission):
-    def has_permission(self, request, view):
-        user = request.user
-        if not user or not user.is_authenticated:
-            return False
-
-        workspace_id = view.kwargs.get("pk") or view.kwargs.get("workspace_id")
-        if not workspace_id:
-            return False
+    async def ahas_permission(self, request, view):
+        workspace = await request.aworkspace()
+        return await aget_membership_role(request, workspace) is not None
 
-        try:
-            workspace = Workspace.objects.get(pk=workspace_id)
-        except Workspace.DoesNotExist:
-            return False
+class IsWorkspaceAdminOrOwner(permissions.BasePermission):
+    allowed_roles = (WorkspaceMembership.ROLE_ADMIN, WorkspaceMembership.ROLE_OWNER)
 
-        membership = (
-            WorkspaceMembership.objects
-            .filter(workspace=workspace, user=user, is_active=True)
-            .values_list("role", flat=True)
-            .first()
-        )
+    def has_permission(self, request, view):
+        workspace = get_view_workspace(request, view)
+        return get_membership_role(request, workspace) in self.allowed_roles
 
-        return membership in (
-            WorkspaceMembership.ROLE_ADMIN,
-            WorkspaceMembership.ROLE_OWNER,
-        )
+    async def ahas_permission(self, request, view):
+        identifier = view.kwargs.get(getattr(view, 'workspace_url_kwarg', 'workspace_id'))
+        workspace = await (aget_workspace(identifier) if identifier else request.aworkspace())
+        return await aget_membership_role(request, workspace) in self.allowed_roles
@@ -0,0 +1,67 @@
+try:
+    import orjson
+except ImportError:  # optional: fall back to DRF's stdlib json renderer
+    orjson = None
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils import encoders
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that encodes with orjson when it is installed. The output is
+    the same compact UTF-8 JSON DRF produces by default; indented responses and
+    installs without orjson go through the stdlib encoder.
+    """
+    _fallback_encoder = encoders.JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context) or not self.compact or self.ensure_ascii:
+            return super().render(data, accepted_media_type, renderer_context)
+        # orjson only calls `default` for types it can't encode (lazy strings, Decimals ...).
+        # Datetimes too, so they get DRF's millisecond/"Z" formatting rather than orjson's.
+        ret = orjson.dumps(data, default=self._fallback_encoder.default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+        # Same as JSONRenderer: keep the output safe to embed in <script>.
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class PrometheusTextRenderer(BaseRenderer):
+    """
+    Renders the MetricsView payload in the Prometheus text exposition format:
+    one summary per request metric, labelled by view, plus response-cache gauges.
+    """
+    media_type = 'text/plain'
+    format = 'prometheus'
+    charset = 'utf-8'
+    prefix = 'backendapps'
+
+    @staticmethod
+    def _label(value):
+        return str(value).replace('\\', '\\\\').replace('"', '\\"')
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if not isinstance(data, dict) or 'requests' not in data:
+            return str(data).encode(self.charset)
+        by_metric = {}
+        for view, histograms in data['requests'].items():
+            for metric, summary in histograms.items():
+                by_metric.setdefault(metric, []).append((view, summary))
+        lines = []
+        for metric in sorted(by_metric):
+            name = f'{self.prefix}_request_{metric}'
+            lines.append(f'# TYPE {name} summary')
+            for view, summary in by_metric[metric]:
+                label = f'view="{self._label(view)}"'
+                for key, value in summary.items():
+                    if key.startswith('p'):
+                        lines.append(f'{name}{{{label},quantile="{int(key[1:]) / 100}"}} {value}')
+                lines.append(f'{name}_sum{{{label}}} {summary["sum"]}')
+                lines.append(f'{name}_count{{{label}}} {summary["count"]}')
+        for key, value in sorted(data.get('response_cache', {}).items()):
+            name = f'{self.prefix}_response_cache_{key}'
+            lines.append(f'# TYPE {name} {"gauge" if key == "bytes" else "counter"}')
+            lines.append(f'{name} {value}')
+        return ('\n'.join(lines) + '\n').encode(self.charset)
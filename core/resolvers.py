@@ -0,0 +1,238 @@
+from copy import copy
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .cache import LRUCache
+from .models import Workspace, WorkspaceMembership
+
+
+WORKSPACE_CACHE_TTL = getattr(settings, 'WORKSPACE_CACHE_TTL', 60)
+WORKSPACE_CACHE_MAXSIZE = getattr(settings, 'WORKSPACE_CACHE_MAXSIZE', 1024)
+
+_workspace_cache = LRUCache(maxsize=WORKSPACE_CACHE_MAXSIZE, ttl=WORKSPACE_CACHE_TTL)
+
+
+def _shared_cache():
+    """Optional cross-process tier, enabled by setting WORKSPACE_CACHE_ALIAS."""
+    alias = getattr(settings, 'WORKSPACE_CACHE_ALIAS', None)
+    return caches[alias] if alias else None
+
+
+def _pk_key(pk):
+    return f'workspace:pk:{pk}'
+
+
+def _slug_key(slug):
+    return f'workspace:slug:{slug}'
+
+
+def _cache_get(key, local=_workspace_cache):
+    value = local.get(key)
+    if value is None:
+        shared = _shared_cache()
+        if shared is not None:
+            value = shared.get(key)
+            if value is not None:
+                local.set(key, value)
+    return value
+
+
+def _cache_set(key, value, local=_workspace_cache):
+    local.set(key, value)
+    shared = _shared_cache()
+    if shared is not None:
+        shared.set(key, value, local.ttl)
+
+
+def _cache_delete(key, local=_workspace_cache):
+    local.delete(key)
+    shared = _shared_cache()
+    if shared is not None:
+        shared.delete(key)
+
+
+def _store(workspace):
+    _cache_set(_pk_key(workspace.pk), workspace)
+    # Slug entries only point at the pk so a rename can never serve a stale row.
+    _cache_set(_slug_key(workspace.slug), workspace.pk)
+
+
+def _get_by_pk(pk):
+    workspace = _cache_get(_pk_key(pk))
+    if workspace is None:
+        workspace = Workspace.objects.filter(pk=pk).first()
+        if workspace is None:
+            return None
+        _store(workspace)
+    # Hand out a copy so callers can't mutate the shared cached instance.
+    return copy(workspace)
+
+
+def _get_by_slug(slug):
+    pk = _cache_get(_slug_key(slug))
+    if pk is not None:
+        workspace = _get_by_pk(pk)
+        if workspace is not None and workspace.slug == slug:
+            return workspace
+    workspace = Workspace.objects.filter(slug=slug).first()
+    if workspace is None:
+        return None
+    _store(workspace)
+    return copy(workspace)
+
+
+def get_workspace(identifier):
+    """
+    Resolve a workspace from a primary key or a slug, going through the cache.
+    Returns None when nothing matches.
+    """
+    if identifier is None:
+        return None
+    identifier = str(identifier).strip()
+    if not identifier:
+        return None
+    if identifier.isdigit():
+        workspace = _get_by_pk(int(identifier))
+        if workspace is not None:
+            return workspace
+    return _get_by_slug(identifier)
+
+
+def invalidate_workspace(workspace):
+    _cache_delete(_pk_key(workspace.pk))
+    _cache_delete(_slug_key(workspace.slug))
+
+
+def clear_caches():
+    """Drop every cached workspace in this process (used by tests)."""
+    _workspace_cache.clear()
+
+
+def _request_memo(request, name):
+    # Memoize on the underlying HttpRequest so DRF and Django views share one memo.
+    request = getattr(request, '_request', request)
+    memo = getattr(request, name, None)
+    if memo is None:
+        memo = {}
+        setattr(request, name, memo)
+    return memo
+
+
+def get_view_workspace(request, view):
+    """
+    Workspace a view operates on: the one named by the view's `workspace_url_kwarg`
+    (default "workspace_id") when present, otherwise the middleware's request.workspace.
+    """
+    kwarg = getattr(view, 'workspace_url_kwarg', 'workspace_id')
+    identifier = view.kwargs.get(kwarg)
+    workspace = getattr(request, 'workspace', None)
+    if not identifier:
+        return workspace
+    if workspace and str(identifier) in (str(workspace.pk), workspace.slug):
+        return workspace
+    memo = _request_memo(request, '_resolved_workspaces')
+    if identifier not in memo:
+        memo[identifier] = get_workspace(identifier)
+    return memo[identifier]
+
+
+def get_membership_role(request, workspace):
+    """
+    Role of request.user in `workspace`, or None without an active membership
+    in a live workspace. Loaded at most once per request. It is deliberately not
+    cached across requests: permission decisions must see a demotion, removal or
+    workspace deletion at once, on every worker, including ones made with
+    QuerySet.update(). The Workspace object itself may come from a cache that
+    has not seen the deletion yet, hence the join.
+    """
+    user = getattr(request, 'user', None)
+    if not workspace or user is None or not user.is_authenticated:
+        return None
+    memo = _request_memo(request, '_workspace_roles')
+    if workspace.pk not in memo:
+        memo[workspace.pk] = (
+            WorkspaceMembership.objects
+            .filter(workspace_id=workspace.pk, user_id=user.pk, is_active=True, workspace__deleted_at__isnull=True)
+            .values_list('role', flat=True)
+            .first()
+        )
+    return memo[workspace.pk]
+
+
+# Async variants for ASGI views: same cache, async ORM and cache calls underneath.
+
+async def _acache_get(key, local=_workspace_cache):
+    value = local.get(key)
+    if value is None:
+        shared = _shared_cache()
+        if shared is not None:
+            value = await shared.aget(key)
+            if value is not None:
+                local.set(key, value)
+    return value
+
+
+async def _acache_set(key, value, local=_workspace_cache):
+    local.set(key, value)
+    shared = _shared_cache()
+    if shared is not None:
+        await shared.aset(key, value, local.ttl)
+
+
+async def _astore(workspace):
+    await _acache_set(_pk_key(workspace.pk), workspace)
+    await _acache_set(_slug_key(workspace.slug), workspace.pk)
+
+
+async def _aget_by_pk(pk):
+    workspace = await _acache_get(_pk_key(pk))
+    if workspace is None:
+        workspace = await Workspace.objects.filter(pk=pk).afirst()
+        if workspace is None:
+            return None
+        await _astore(workspace)
+    return copy(workspace)
+
+
+async def _aget_by_slug(slug):
+    pk = await _acache_get(_slug_key(slug))
+    if pk is not None:
+        workspace = await _aget_by_pk(pk)
+        if workspace is not None and workspace.slug == slug:
+            return workspace
+    workspace = await Workspace.objects.filter(slug=slug).afirst()
+    if workspace is None:
+        return None
+    await _astore(workspace)
+    return copy(workspace)
+
+
+async def aget_workspace(identifier):
+    """Async counterpart of get_workspace()."""
+    if identifier is None:
+        return None
+    identifier = str(identifier).strip()
+    if not identifier:
+        return None
+    if identifier.isdigit():
+        workspace = await _aget_by_pk(int(identifier))
+        if workspace is not None:
+            return workspace
+    return await _aget_by_slug(identifier)
+
+
+async def aget_membership_role(request, workspace):
+    """Async counterpart of get_membership_role(); expects request.user to be resolved."""
+    user = getattr(request, 'user', None)
+    if not workspace or user is None or not user.is_authenticated:
+        return None
+    memo = _request_memo(request, '_workspace_roles')
+    if workspace.pk not in memo:
+        memo[workspace.pk] = await (
+            WorkspaceMembership.objects
+            .filter(workspace_id=workspace.pk, user_id=user.pk, is_active=True, workspace__deleted_at__isnull=True)
+            .values_list('role', flat=True)
+            .afirst()
+        )
+    return memo[workspace.pk]
@@ -0,0 +1,124 @@
+"""
+Cache of rendered read responses, keyed by the workspace change version.
+
+Entries are never invalidated explicitly: any write bumps the workspace version
+(core.versioning), which lives in the database, so every worker computes the
+new key as soon as the write commits and stale entries are simply never read
+again. Every entry also expires RESPONSE_CACHE_TTL seconds after it was stored,
+whichever backend holds it.
+"""
+import hashlib
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+RESPONSE_CACHE_BACKEND = getattr(settings, 'RESPONSE_CACHE_BACKEND', 'local')
+RESPONSE_CACHE_MAX_BYTES = getattr(settings, 'RESPONSE_CACHE_MAX_BYTES', 64 * 1024 * 1024)
+RESPONSE_CACHE_TTL = getattr(settings, 'RESPONSE_CACHE_TTL', 10 * 60)
+
+
+class LocalResponseBackend:
+    """In-process LRU bounded by the total size of the cached bodies; entries expire after `ttl` seconds."""
+
+    def __init__(self, max_bytes=RESPONSE_CACHE_MAX_BYTES, ttl=RESPONSE_CACHE_TTL):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.size = 0
+        self.evictions = 0
+        self._data = OrderedDict()  # key -> (expires_at, (content, content_type))
+        self._lock = threading.Lock()
+
+    def _discard(self, key):
+        _, (content, _) = self._data.pop(key)
+        self.size -= len(content)
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            if item[0] <= time.monotonic():
+                self._discard(key)
+                return None
+            self._data.move_to_end(key)
+            return item[1]
+
+    def set(self, key, entry):
+        content = entry[0]
+        if len(content) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._data:
+                self._discard(key)
+            self._data[key] = (time.monotonic() + self.ttl, entry)
+            self.size += len(content)
+            while self.size > self.max_bytes:
+                self._discard(next(iter(self._data)))
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.size = 0
+
+
+class DjangoCacheResponseBackend:
+    """
+    Any configured Django cache alias (locmem, file-based, memcached, redis);
+    eviction and size limits are the cache's own.
+    """
+
+    def __init__(self, alias, ttl=RESPONSE_CACHE_TTL):
+        self.alias = alias
+        self.ttl = ttl
+
+    def get(self, key):
+        return caches[self.alias].get(key)
+
+    def set(self, key, entry):
+        caches[self.alias].set(key, entry, self.ttl)
+
+    def clear(self):
+        caches[self.alias].clear()
+
+
+class ResponseCache:
+    def __init__(self, backend):
+        self.backend = backend
+        self.counters = Counter()
+
+    @staticmethod
+    def make_key(*parts):
+        raw = ':'.join(str(part) for part in parts)
+        return 'response:' + hashlib.sha1(raw.encode()).hexdigest()
+
+    def get(self, key):
+        entry = self.backend.get(key)
+        self.counters['hits' if entry is not None else 'misses'] += 1
+        return entry
+
+    def set(self, key, content, content_type):
+        self.backend.set(key, (bytes(content), content_type))
+
+    def clear(self):
+        self.backend.clear()
+        self.counters.clear()
+
+    def stats(self):
+        stats = {'hits': self.counters['hits'], 'misses': self.counters['misses']}
+        if isinstance(self.backend, LocalResponseBackend):
+            stats.update(bytes=self.backend.size, evictions=self.backend.evictions)
+        return stats
+
+
+def build_backend(name=RESPONSE_CACHE_BACKEND):
+    """'local' for the in-process LRU, otherwise the name of a CACHES alias."""
+    if name == 'local':
+        return LocalResponseBackend()
+    return DjangoCacheResponseBackend(name)
+
+
+response_cache = ResponseCache(build_backend())
@@ -0,0 +1,73 @@
+"""
+Ranked full-text search over projects.
+
+The index lives in the database (migration 0002_project_search_index):
+  - SQLite: an external-content FTS5 table, `core_project_fts`, maintained by
+    triggers and ranked with bm25().
+  - PostgreSQL: a generated `search_vector` tsvector column with a GIN index,
+    ranked with ts_rank_cd().
+Other backends fall back to an unranked icontains scan.
+
+The index is kept in sync by the database, which also covers bulk writes. On
+SQLite, a migration that makes Django rebuild core_project (table remake) drops
+the triggers, so that migration must recreate them.
+"""
+import re
+
+from django.db import connections
+from django.db.models import Q, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.fields import BooleanField, FloatField
+
+# Matches the text search configuration baked into the PostgreSQL generated column.
+POSTGRES_SEARCH_CONFIG = 'english'
+# bm25() column weights for (name, description).
+SQLITE_BM25_WEIGHTS = (10.0, 1.0)
+
+_TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def search_terms(query):
+    return _TERM_RE.findall(query or '')
+
+
+def _fts5_expression(terms):
+    # Quote every term so user input can never be read as FTS5 syntax; the trailing *
+    # makes each one a prefix match, which suits search-as-you-type.
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def search_projects(queryset, query):
+    """
+    Filter a Project queryset (already workspace-scoped by the caller) to the rows
+    matching `query`, annotated with `search_rank` and ordered best first.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return queryset.none()
+    vendor = connections[queryset.db].vendor
+    if vendor == 'sqlite':
+        expression = _fts5_expression(terms)
+        weights = ', '.join(str(w) for w in SQLITE_BM25_WEIGHTS)
+        matches = RawSQL('SELECT rowid FROM core_project_fts WHERE core_project_fts MATCH %s', [expression])
+        # bm25() is lower-is-better; negate it so every backend sorts on -search_rank.
+        rank = RawSQL(
+            f'SELECT -bm25(core_project_fts, {weights}) FROM core_project_fts '
+            f'WHERE core_project_fts MATCH %s AND core_project_fts.rowid = core_project.id',
+            [expression],
+            output_field=FloatField(),
+        )
+        queryset = queryset.filter(pk__in=matches).annotate(search_rank=rank)
+    elif vendor == 'postgresql':
+        tsquery = f"websearch_to_tsquery('{POSTGRES_SEARCH_CONFIG}', %s)"
+        queryset = queryset.filter(
+            RawSQL(f'core_project.search_vector @@ {tsquery}', [query], output_field=BooleanField()),
+        ).annotate(
+            search_rank=RawSQL(f'ts_rank_cd(core_project.search_vector, {tsquery})', [query], output_field=FloatField()),
+        )
+    else:
+        match = Q()
+        for term in terms:
+            match &= Q(name__icontains=term) | Q(description__icontains=term)
+        queryset = queryset.filter(match).annotate(search_rank=Value(0.0, output_field=FloatField()))
+    return queryset.order_by('-search_rank', 'id')
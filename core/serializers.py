@@ -1,15 +1,95 @@
 from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
 from .models import Workspace, WorkspaceMembership, Project
+from .counters import adjust_counts
+from .instrumentation import TimedListSerializer, TimedSerializerMixin
+from .versioning import bump_workspace_version
+from django.conf import settings
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
 
-class WorkspaceSerializer(serializers.ModelSerializer):
+BULK_WRITE_BATCH_SIZE = getattr(settings, 'BULK_WRITE_BATCH_SIZE', 500)
+
+
+def _query_param(request, name):
+    if request is None:
+        return ''
+    return request.query_params.get(name, '') if hasattr(request, 'query_params') else request.GET.get(name, '')
+
+
+def requested_expansions(request, expandable):
+    """Names from a comma-separated `?expand=` param that are in `expandable`."""
+    raw = _query_param(request, 'expand')
+    return [name for name in raw.split(',') if name in expandable]
+
+
+def requested_fieldset(request):
+    """
+    The `?fields=` and `?omit=` name sets of a read request (either may be None
+    when absent). Writes always get every field.
+    """
+    if request is None or request.method not in SAFE_METHODS:
+        return None, None
+    fields, omit = (_query_param(request, name) for name in ('fields', 'omit'))
+    return (
+        {name for name in fields.split(',') if name} or None,
+        {name for name in omit.split(',') if name} or None,
+    )
+
+
+def sparse_field_names(request, names):
+    """`names` narrowed to the requested sparse fieldset, in their original order."""
+    fields, omit = requested_fieldset(request)
+    return [name for name in names if (fields is None or name in fields) and (omit is None or name not in omit)]
+
+
+class SparseFieldsetMixin:
+    """
+    Partial responses: `?fields=id,name` keeps only the listed fields and
+    `?omit=description` drops fields. Unknown names are ignored. Views push the
+    same selection down to the queryset (QueryPlanMixin, FastListMixin), so the
+    skipped columns aren't fetched either.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        return {name: fields[name] for name in sparse_field_names(self.context.get('request'), fields)}
+
+
+class ExpandableFieldsMixin:
+    """
+    Lets clients swap a foreign key id for a nested object with `?expand=<field>`.
+    Views pick the same names up to select_related() them (see QueryPlanMixin).
+    """
+    expandable_fields = {}
+
+    def get_fields(self):
+        fields = super().get_fields()
+        for name in requested_expansions(self.context.get('request'), self.expandable_fields):
+            fields[name] = self.expandable_fields[name](read_only=True)
+        return fields
+
+
+class UserSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = User
+        fields = ['id', 'email', 'username']
+
+class WorkspaceSerializer(TimedSerializerMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Workspace
-        fields = ['id', 'name', 'slug', 'created_at', 'owner']
+        fields = ['id', 'name', 'slug', 'created_at', 'owner', 'member_count', 'project_count']
+        list_serializer_class = TimedListSerializer
 
-class WorkspaceCreateSerializer(serializers.ModelSerializer):
+class MyWorkspaceSerializer(WorkspaceSerializer):
+    """A workspace as listed for one of its members. Counters are left out: they change on every project write."""
+    role = serializers.CharField(read_only=True)
+
+    class Meta(WorkspaceSerializer.Meta):
+        fields = ['id', 'name', 'slug', 'created_at', 'owner', 'role']
+
+class WorkspaceCreateSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Workspace
         fields = ['name', 'slug']
@@ -20,18 +100,65 @@ class WorkspaceCreateSerializer(serializers.ModelSerializer):
         WorkspaceMembership.objects.create(user=user, workspace=workspace, role=WorkspaceMembership.ROLE_OWNER)
         return workspace
 
-class MembershipSerializer(serializers.ModelSerializer):
+class BulkInviteSerializer(TimedSerializerMixin, serializers.Serializer):
+    emails = serializers.ListField(
+        child=serializers.EmailField(),
+        allow_empty=False,
+        max_length=getattr(settings, 'BULK_INVITE_MAX_EMAILS', 10000),
+    )
+    role = serializers.ChoiceField(
+        choices=[WorkspaceMembership.ROLE_ADMIN, WorkspaceMembership.ROLE_MEMBER],
+        default=WorkspaceMembership.ROLE_MEMBER,
+    )
+
+class MembershipSerializer(TimedSerializerMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     user_email = serializers.EmailField(source='user.email', read_only=True)
     class Meta:
         model = WorkspaceMembership
         fields = ['id', 'user', 'user_email', 'role', 'is_active', 'created_at']
         read_only_fields = ['created_at']
+        list_serializer_class = TimedListSerializer
+
+class ProjectListSerializer(TimedListSerializer):
+    """
+    Bulk create/update for projects: the whole batch is validated in one pass and
+    written with a single bulk_create/bulk_update. For updates the view passes the
+    already workspace-scoped instances and each item carries its `id`.
+    """
+
+    def create(self, validated_data):
+        request = self.context['request']
+        projects = [
+            Project(workspace=request.workspace, created_by=request.user, **attrs)
+            for attrs in validated_data
+        ]
+        projects = Project.objects.bulk_create(projects, batch_size=BULK_WRITE_BATCH_SIZE)
+        # bulk_create skips post_save, so count the projects (and bump the version) ourselves.
+        adjust_counts(request.workspace.pk, projects=len(projects))
+        return projects
+
+    def update(self, instances, validated_data):
+        by_id = {project.pk: project for project in instances}
+        updated, fields = [], set()
+        for item, attrs in zip(self.initial_data, validated_data):
+            project = by_id[int(item['id'])]
+            for attr, value in attrs.items():
+                setattr(project, attr, value)
+            fields.update(attrs)
+            updated.append(project)
+        if fields:
+            Project.objects.bulk_update(updated, sorted(fields), batch_size=BULK_WRITE_BATCH_SIZE)
+            bump_workspace_version(*{project.workspace_id for project in updated})
+        return updated
+
+class ProjectSerializer(TimedSerializerMixin, SparseFieldsetMixin, ExpandableFieldsMixin, serializers.ModelSerializer):
+    expandable_fields = {'created_by': UserSummarySerializer}
 
-class ProjectSerializer(serializers.ModelSerializer):
     class Meta:
         model = Project
         fields = ['id', 'workspace', 'name', 'description', 'created_by', 'created_at']
         read_only_fields = ['workspace', 'created_by', 'created_at']
+        list_serializer_class = ProjectListSerializer
 
     def create(self, validated_data):
         request = self.context['request']
@@ -0,0 +1,84 @@
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .counters import adjust_counts
+from .models import Project, Workspace, WorkspaceMembership
+from .resolvers import invalidate_workspace
+from .versioning import USER_SUMMARY_FIELDS, bump_member_versions, bump_user_workspace_versions, bump_workspace_version
+
+# Projects and memberships reach post_delete with deleted_at set only from the
+# purge (core.deletion): soft deletion already updated counters, versions and caches.
+
+
+@receiver(post_save, sender=Workspace)
+@receiver(post_delete, sender=Workspace)
+def invalidate_cached_workspace(sender, instance, **kwargs):
+    invalidate_workspace(instance)
+
+
+@receiver(post_save, sender=Workspace)
+@receiver(post_delete, sender=Workspace)
+def bump_version_for_workspace(sender, instance, **kwargs):
+    bump_workspace_version(instance.pk)
+
+
+@receiver(post_save, sender=Workspace)
+def bump_member_versions_for_workspace(sender, instance, created, **kwargs):
+    # Members' "my workspaces" listings show the name and slug. Deletes are covered
+    # by the cascaded membership deletes.
+    if not created:
+        bump_member_versions(list(instance.memberships.values_list('user_id', flat=True)))
+
+
+@receiver(post_save, sender=WorkspaceMembership)
+@receiver(post_delete, sender=WorkspaceMembership)
+def bump_member_version_for_membership(sender, instance, **kwargs):
+    if instance.deleted_at is not None:
+        return
+    bump_member_versions([instance.user_id])
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+@receiver(post_save, sender=WorkspaceMembership)
+@receiver(post_delete, sender=WorkspaceMembership)
+def bump_version_for_scoped_row(sender, instance, **kwargs):
+    if instance.deleted_at is not None:
+        return
+    bump_workspace_version(instance.workspace_id)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def bump_versions_for_user(sender, instance, created, update_fields=None, **kwargs):
+    # A new user is in no list yet; saves that only touch other fields (last_login,
+    # a rehashed password) leave the listed email and username as they were.
+    if created or (update_fields is not None and USER_SUMMARY_FIELDS.isdisjoint(update_fields)):
+        return
+    bump_user_workspace_versions([instance.pk])
+
+
+@receiver(post_save, sender=WorkspaceMembership)
+def count_saved_membership(sender, instance, created, **kwargs):
+    was_active = False if created else getattr(instance, '_loaded_is_active', instance.is_active)
+    if instance.is_active != was_active:
+        adjust_counts(instance.workspace_id, members=1 if instance.is_active else -1)
+    instance._loaded_is_active = instance.is_active
+
+
+@receiver(post_delete, sender=WorkspaceMembership)
+def count_deleted_membership(sender, instance, **kwargs):
+    if instance.deleted_at is None and getattr(instance, '_loaded_is_active', instance.is_active):
+        adjust_counts(instance.workspace_id, members=-1)
+
+
+@receiver(post_save, sender=Project)
+def count_saved_project(sender, instance, created, **kwargs):
+    if created:
+        adjust_counts(instance.workspace_id, projects=1)
+
+
+@receiver(post_delete, sender=Project)
+def count_deleted_project(sender, instance, **kwargs):
+    if instance.deleted_at is None:
+        adjust_counts(instance.workspace_id, projects=-1)
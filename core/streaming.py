@@ -0,0 +1,36 @@
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+
+def iter_ndjson(rows):
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder) + '\n'
+
+
+def ndjson_response(rows, status=200):
+    """Stream an iterable of dicts as newline-delimited JSON."""
+    return StreamingHttpResponse(iter_ndjson(rows), status=status, content_type='application/x-ndjson')
+
+
+class _Echo:
+    """File-like object whose write() just hands the line back to csv.writer's caller."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(rows, fieldnames):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(fieldnames)
+    for row in rows:
+        yield writer.writerow([row[name] for name in fieldnames])
+
+
+def csv_response(rows, fieldnames, filename):
+    """Stream an iterable of dicts as CSV with a header row."""
+    response = StreamingHttpResponse(iter_csv(rows, fieldnames), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,31 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .response_cache import response_cache
+
+
+def count_queries(func, *args, **kwargs):
+    with CaptureQueriesContext(connection) as ctx:
+        result = func(*args, **kwargs)
+    return result, ctx.captured_queries
+
+
+def assert_constant_queries(client, url, grow, data=None):
+    """
+    Fail if GET `url` runs more queries after `grow()` has added rows to its result.
+
+    The endpoint is hit once beforehand so per-process caches are warm for both
+    measured requests; the rendered-response cache is emptied so both really run.
+    """
+    client.get(url, data)
+    response_cache.clear()
+    before, small = count_queries(client.get, url, data)
+    grow()
+    response_cache.clear()
+    after, large = count_queries(client.get, url, data)
+    assert before.status_code == after.status_code == 200
+    assert len(large) <= len(small), (
+        f'{url} went from {len(small)} to {len(large)} queries as its result grew:\n'
+        + '\n'.join(q['sql'] for q in large)
+    )
+    return after
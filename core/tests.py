@@ -6,6 +6,16 @@ from core.models import Workspace, WorkspaceMembership, Project
 
 User = get_user_model()
 
+@pytest.fixture(autouse=True)
+def clear_caches():
+    # Rolled-back test rows don't fire invalidation signals, and their pks get reused.
+    from django.core.cache import cache
+    from core.resolvers import clear_caches
+    from core.response_cache import response_cache
+    clear_caches()
+    response_cache.clear()
+    cache.clear()
+
 @pytest.fixture
 def user(db):
     return User.objects.create_user(username='user1', email='user1@example.com', password='pass')
@@ -61,3 +71,668 @@ def test_admin_can_invite(auth_client, workspace, user2):
     print(resp)
     assert resp.status_code in (200, 201)
     assert WorkspaceMembership.objects.filter(user=user2, workspace=workspace).exists()
+
+def test_workspace_resolved_by_slug(auth_client, workspace):
+    auth_client.credentials(HTTP_X_WORKSPACE_ID=workspace.slug)
+    resp = auth_client.post(reverse('project-list'), {'name': 'Proj 2'}, format='json')
+    assert resp.status_code == 201
+    assert Project.objects.get(name='Proj 2').workspace_id == workspace.id
+
+def test_workspace_lookup_is_lazy_and_cached(auth_client, workspace, django_assert_num_queries):
+    from core.resolvers import get_workspace
+    get_workspace(workspace.id)
+    with django_assert_num_queries(0):
+        assert get_workspace(workspace.id).slug == 'acme'
+        assert get_workspace('acme').pk == workspace.pk
+    workspace.slug = 'acme-renamed'
+    workspace.save()
+    assert get_workspace(workspace.id).slug == 'acme-renamed'
+    assert get_workspace('acme') is None
+
+def test_membership_resolved_once_per_request(auth_client, workspace, django_assert_max_num_queries):
+    auth_client.credentials(HTTP_X_WORKSPACE_ID=str(workspace.id))
+    auth_client.get(reverse('project-list'))
+    # Warm caches: session, user, one membership check and the workspace version;
+    # the page itself comes from the response cache.
+    with django_assert_max_num_queries(4):
+        resp = auth_client.get(reverse('project-list'))
+    assert resp.status_code == 200
+
+def test_membership_cache_invalidated_on_change(auth_client, workspace, user):
+    auth_client.credentials(HTTP_X_WORKSPACE_ID=str(workspace.id))
+    assert auth_client.get(reverse('project-list')).status_code == 200
+    WorkspaceMembership.objects.get(user=user, workspace=workspace).delete()
+    assert auth_client.get(reverse('project-list')).status_code == 403
+
+def test_role_change_by_queryset_update_applies_immediately(auth_client, workspace, user, user2):
+    url = reverse('workspace-invite-user', kwargs={'pk': workspace.id})
+    assert auth_client.post(url, {'email': user2.email}, format='json').status_code == 201
+    WorkspaceMembership.objects.filter(user=user, workspace=workspace).update(role=WorkspaceMembership.ROLE_MEMBER)
+    assert auth_client.post(url, {'email': user2.email}, format='json').status_code == 403
+
+def test_member_cannot_invite(api_client, workspace, user2):
+    WorkspaceMembership.objects.create(user=user2, workspace=workspace, role=WorkspaceMembership.ROLE_MEMBER)
+    api_client.login(email='user2@example.com', password='pass')
+    url = reverse('workspace-invite-user', kwargs={'pk': workspace.id})
+    resp = api_client.post(url, {'email': 'user1@example.com'}, format='json')
+    assert resp.status_code == 403
+
+def test_bulk_invite(auth_client, workspace, user, user2):
+    url = reverse('workspace-invite-users', kwargs={'pk': workspace.id})
+    payload = {'emails': [user2.email, user.email, 'ghost@example.com', user2.email]}
+    resp = auth_client.post(url, payload, format='json')
+    assert resp.status_code == 200
+    assert [r['status'] for r in resp.data['results']] == ['invited', 'already_member', 'not_found']
+    assert WorkspaceMembership.objects.filter(user=user2, workspace=workspace).exists()
+
+def test_bulk_invite_streams_large_lists(auth_client, workspace, user2, monkeypatch):
+    import json
+    from core import views
+    monkeypatch.setattr(views, 'BULK_INVITE_STREAM_THRESHOLD', 1)
+    url = reverse('workspace-invite-users', kwargs={'pk': workspace.id})
+    resp = auth_client.post(url, {'emails': [user2.email, 'ghost@example.com']}, format='json')
+    assert resp.streaming
+    # Written before the body is read, not while it streams.
+    assert WorkspaceMembership.objects.filter(user=user2, workspace=workspace).exists()
+    rows = [json.loads(line) for line in b''.join(resp.streaming_content).splitlines()]
+    assert [r['status'] for r in rows] == ['invited', 'not_found']
+
+def test_project_list_cursor_pagination(auth_client, workspace, user):
+    other = Workspace.objects.create(name='Other', slug='other', owner=user)
+    Project.objects.bulk_create(
+        [Project(workspace=workspace, name=f'p{i:02d}') for i in range(5)]
+        + [Project(workspace=other, name='foreign')]
+    )
+    auth_client.credentials(HTTP_X_WORKSPACE_ID=str(workspace.id))
+    resp = auth_client.get(reverse('project-list'), {'page_size': 2})
+    names = [p['name'] for p in resp.data['results']]
+    while resp.data['next']:
+        resp = auth_client.get(resp.data['next'])
+        names += [p['name'] for p in resp.data['results']]
+    assert names == [f'p{i:02d}' for i in range(5)]
+
+def test_project_cursor_pages_through_duplicate_names(auth_client, workspace):
+    Project.objects.bulk_create([Project(workspace=workspace, name=name) for name in 'aabbbbc'])
+    expected = list(Project.objects.filter(workspace=workspace).order_by('name', 'id').values_list('id', flat=True))
+    auth_client.credentials(HTTP_X_WORKSPACE_ID=str(workspace.id))
+    pages = [auth_client.get(reverse('project-list'), {'page_size': 3}).data]
+    while pages[-1]['next']:
+        pages.append(auth_client.get(pages[-1]['next']).data)
+    assert [p['id'] for page in pages for p in page['results']] == expected
+    back = auth_client.get(pages[-1]['previous']).data
+    assert back['results'] == pages[-2]['results']
+
+def test_membership_list_paginated_and_scoped(auth_client, workspace, user2):
+    WorkspaceMembership.objects.create(user=user2, workspace=workspace)
+    auth_client.credentials(HTTP_X_WORKSPACE_ID=str(workspace.id))
+    resp = auth_client.get(reverse('membership-list'), {'page_size': 1})
+    assert resp.status_code == 200
+    assert len(resp.data['results']) == 1 and resp.data['next']
+
+def test_project_export_streams_scoped_rows(auth_client, workspace, user):
+    import csv, io, json
+    other = Workspace.objects.create(name='Other', slug='other', owner=user)
+    Project.objects.create(workspace=workspace, name='mine', created_by=user)
+    Project.objects.create(workspace=other, name='foreign')
+    auth_client.credentials(HTTP_X_WORKSPACE_ID=str(workspace.id))
+    resp = auth_client.get(reverse('project-export'))
+    assert resp.streaming and resp['Content-Type'] == 'application/x-ndjson'
+    rows = [json.loads(line) for line in b''.join(resp.streaming_content).splitlines()]
+    assert [r['name'] for r in rows] == ['mine']
+    resp = auth_client.get(reverse('project-export'), {'export_format': 'csv'})
+    rows = list(csv.DictReader(io.StringIO(b''.join(resp.streaming_content).decode())))
+    assert rows[0]['name'] == 'mine' and rows[0]['created_by'] == str(user.id)
+
+def test_membership_export_includes_email(auth_client, workspace):
+    import json
+    auth_client.credentials(HTTP_X_WORKSPACE_ID=str(workspace.id))
+    resp = auth_client.get(reverse('membership-export'))
+    rows = [json.loads(line) for line in b''.join(resp.streaming_content).splitlines()]
+    assert rows[0]['user_email'] == 'user1@example.com'
+
+def test_membership_list_has_no_n_plus_one(auth_client, workspace):
+    from core.testing import assert_constant_queries
+    auth_client.credentials(HTTP_X_WORKSPACE_ID=str(workspace.id))
+
+    def grow():
+        for i in range(3):
+            member = User.objects.create_user(username=f'm{i}', email=f'm{i}@example.com', password='pass')
+            WorkspaceMembership.objects.create(user=member, workspace=workspace)
+
+    resp = assert_constant_queries(auth_client, reverse('membership-list'), grow)
+    assert {'m0@example.com', 'user1@example.com'} <= {m['user_email'] for m in resp.data['results']}
+
+def test_project_list_expand_created_by(auth_client, workspace, user):
+    from core.testing import assert_constant_queries
+    auth_client.credentials(HTTP_X_WORKSPACE_ID=str(workspace.id))
+    Project.objects.create(workspace=workspace, name='a', created_by=user)
+
+    def grow():
+        for i in range(3):
+            creator = User.objects.create_user(username=f'c{i}', email=f'c{i}@example.com', password='pass')
+            Project.objects.create(workspace=workspace, name=f'b{i}', created_by=creator)
+
+    resp = assert_constant_queries(auth_client, reverse('project-list'), grow, {'expand': 'created_by'})
+    assert resp.data['results'][0]['created_by'] == {'id': user.id, 'email': user.email, 'username': 'user1'}
+
+def test_bulk_project_create_update_delete(auth_client, workspace, user):
+    other = Workspace.objects.create(name='Other', slug='other', owner=user)
+    foreign = Project.objects.create(workspace=other, name='foreign')
+    auth_client.credentials(HTTP_X_WORKSPACE_ID=str(workspace.id))
+    url = reverse('project-bulk')
+
+    resp = auth_client.post(url, [{'name': f'p{i}'} for i in range(3)], format='json')
+    assert resp.status_code == 201
+    ids = [p['id'] for p in resp.data]
+    assert Project.objects.filter(workspace=workspace, created_by=user).count() == 3
+
+    resp = auth_client.patch(url, [{'id': ids[0], 'description': 'updated'}], format='json')
+    assert resp.status_code == 200
+    assert Project.objects.get(pk=ids[0]).description == 'updated'
+
+    resp = auth_client.patch(url, [{'id': foreign.id, 'name': 'hijack'}], format='json')
+    assert resp.status_code == 400
+    assert Project.objects.get(pk=foreign.id).name == 'foreign'
+
+    resp = auth_client.delete(url, {'ids': ids[:2] + [foreign.id]}, format='json')
+    assert resp.data == {'deleted': 2}
+    assert Project.objects.filter(pk=foreign.id).exists()
+
+def test_bulk_project_create_validates_whole_batch(auth_client, workspace):
+    auth_client.credentials(HTTP_X_WORKSPACE_ID=str(workspace.id))
+    resp = auth_client.post(reverse('project-bulk'), [{'name': 'ok'}, {'name': ''}], format='json')
+    assert resp.status_code == 400
+    assert not Project.objects.exists()
+
+def test_replica_router_keeps_writes_on_primary():
+    from core.db_router import ReplicaRouter
+    router = ReplicaRouter()
+    assert router.db_for_write(Project) == 'default'
+    assert router.allow_migrate('replica', 'core') is False
+
+def test_replica_serves_only_the_read_queryset(monkeypatch, rf, user, workspace):
+    from core import mixins
+    from core.views import ProjectViewSet
+    monkeypatch.setattr(mixins, 'replica_configured', lambda: True)
+    request = rf.get('/')
+    request.user, request.workspace = user, workspace
+    for action, db in (('list', 'replica'), ('search', 'replica'), ('update', 'default')):
+        view = ProjectViewSet(action=action, request=request, format_kwarg=None, kwargs={})
+        assert view.get_queryset().db == db
+
+def test_replica_reads_fall_back_to_default(auth_client, workspace):
+    # Without a replica alias (SQLite dev profile) list/retrieve still hit the primary.
+    auth_client.credentials(HTTP_X_WORKSPACE_ID=str(workspace.id))
+    assert auth_client.get(reverse('project-list')).status_code == 200
+    assert auth_client.get(reverse('workspace-detail', kwargs={'pk': workspace.id})).status_code == 200
+
+def _async_get(client, url, **kwargs):
+    from asgiref.sync import async_to_sync
+    return async_to_sync(client.get)(url, **kwargs)
+
+def test_async_project_list_and_detail(user, workspace):
+    from django.test import AsyncClient
+    client = AsyncClient()
+    client.force_login(user)
+    projects = Project.objects.bulk_create([Project(workspace=workspace, name=f'p{i}') for i in range(3)])
+    resp = _async_get(client, reverse('async-project-list'), data={'page_size': 2}, headers={'X-Workspace-Id': workspace.slug})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert [p['name'] for p in body['results']] == ['p0', 'p1']
+    resp = _async_get(client, body['next'], headers={'X-Workspace-Id': workspace.slug})
+    assert [p['name'] for p in resp.json()['results']] == ['p2'] and resp.json()['next'] is None
+    resp = _async_get(client, reverse('async-project-detail', kwargs={'pk': projects[0].pk}),
+                      headers={'X-Workspace-Id': str(workspace.id)})
+    assert resp.json()['name'] == 'p0'
+    resp = _async_get(client, reverse('async-project-detail', kwargs={'pk': 0}), headers={'X-Workspace-Id': str(workspace.id)})
+    assert resp.status_code == 404
+
+def test_async_views_enforce_membership(user2, workspace):
+    from django.test import AsyncClient
+    client = AsyncClient()
+    assert _async_get(client, reverse('async-workspace-list')).status_code == 403
+    client.force_login(user2)
+    resp = _async_get(client, reverse('async-project-list'), headers={'X-Workspace-Id': str(workspace.id)})
+    assert resp.status_code == 403
+    resp = _async_get(client, reverse('async-workspace-detail', kwargs={'pk': workspace.id}))
+    assert resp.json()['slug'] == 'acme'
+    resp = _async_get(client, reverse('async-workspace-list'))
+    assert [w['slug'] for w in resp.json()['results']] == ['acme']
+    assert _async_get(client, reverse('async-project-detail', kwargs={'pk': 0}),
+                      headers={'X-Workspace-Id': str(workspace.id)}).status_code == 403
+
+def test_async_views_accept_bearer_tokens(user, workspace):
+    from django.test import AsyncClient
+    from core_auth.tokens import issue_token_pair
+    client = AsyncClient()
+    Project.objects.create(workspace=workspace, name='p0')
+    headers = {'Authorization': f"Bearer {issue_token_pair(user)['access']}", 'X-Workspace-Id': str(workspace.id)}
+    resp = _async_get(client, reverse('async-project-list'), headers=headers)
+    assert resp.status_code == 200
+    assert [p['name'] for p in resp.json()['results']] == ['p0']
+    assert _async_get(client, reverse('async-workspace-list'), headers=headers).status_code == 200
+    headers['Authorization'] = 'Bearer not-a-token'
+    assert _async_get(client, reverse('async-project-list'), headers=headers).status_code == 403
+
+def test_async_views_join_expanded_relations(user, workspace):
+    from django.test import AsyncClient
+    client = AsyncClient()
+    client.force_login(user)
+    project = Project.objects.create(workspace=workspace, name='p0', created_by=user)
+    headers = {'X-Workspace-Id': str(workspace.id)}
+    resp = _async_get(client, reverse('async-project-list'), data={'expand': 'created_by'}, headers=headers)
+    assert resp.status_code == 200
+    assert resp.json()['results'][0]['created_by']['email'] == user.email
+    resp = _async_get(client, reverse('async-project-detail', kwargs={'pk': project.pk}),
+                      data={'expand': 'created_by'}, headers=headers)
+    assert resp.json()['created_by']['email'] == user.email
+
+def test_async_workspace_detail_reads_the_live_row(user, user2, workspace):
+    from django.test import AsyncClient
+    from django.utils import timezone
+    from core.resolvers import get_workspace
+    client = AsyncClient()
+    client.force_login(user)
+    url = reverse('async-workspace-detail', kwargs={'pk': workspace.id})
+    get_workspace(workspace.id)  # warm this process's workspace cache
+    WorkspaceMembership.objects.create(user=user2, workspace=workspace)
+    assert _async_get(client, url).json()['member_count'] == Workspace.objects.get(pk=workspace.pk).member_count == 2
+    Workspace.objects.filter(pk=workspace.pk).update(deleted_at=timezone.now())
+    assert _async_get(client, url).status_code == 404
+
+def test_project_list_conditional_get(auth_client, workspace, user):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    auth_client.credentials(HTTP_X_WORKSPACE_ID=str(workspace.id))
+    url = reverse('project-list')
+    resp = auth_client.get(url)
+    etag = resp['ETag']
+    with CaptureQueriesContext(connection) as ctx:
+        resp = auth_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert resp.status_code == 304
+    assert not any('core_project' in q['sql'] for q in ctx.captured_queries)
+
+    Project.objects.create(workspace=workspace, name='new', created_by=user)
+    resp = auth_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert resp.status_code == 200 and resp['ETag'] != etag
+
+    etag = resp['ETag']
+    auth_client.post(reverse('project-bulk'), [{'name': 'bulk'}], format='json')
+    assert auth_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+def test_membership_list_etag_follows_user_edits(auth_client, workspace, user):
+    auth_client.credentials(HTTP_X_WORKSPACE_ID=str(workspace.id))
+    url = reverse('membership-list')
+    etag = auth_client.get(url)['ETag']
+    user.last_login = None
+    user.save(update_fields=['last_login'])
+    assert auth_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+    user.email = 'renamed@example.com'
+    user.save()
+    resp = auth_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert resp.status_code == 200
+    assert [m['user_email'] for m in resp.data['results']] == ['renamed@example.com']
+
+def test_project_update_if_match(auth_client, workspace, user):
+    project = Project.objects.create(workspace=workspace, name='p', created_by=user)
+    auth_client.credentials(HTTP_X_WORKSPACE_ID=str(workspace.id))
+    url = reverse('project-detail', kwargs={'pk': project.pk})
+    etag = auth_client.get(url)['ETag']
+    assert auth_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    resp = auth_client.patch(url, {'name': 'first'}, format='json', HTTP_IF_MATCH=etag)
+    assert resp.status_code == 200 and resp['ETag'] != etag
+    resp = auth_client.patch(url, {'name': 'second'}, format='json', HTTP_IF_MATCH=etag)
+    assert resp.status_code == 412
+    project.refresh_from_db()
+    assert project.name == 'first'
+
+def test_workspace_version_is_durable_and_survives_full_saves(workspace, user):
+    from core.versioning import get_workspace_version
+    version = get_workspace_version(workspace.pk)
+    Project.objects.create(workspace=workspace, name='p', created_by=user)
+    bumped = get_workspace_version(workspace.pk)
+    assert bumped > version
+    # A stale in-memory copy must not write its old version back.
+    workspace.name = 'Renamed'
+    workspace.save()
+    assert get_workspace_version(workspace.pk) > bumped
+
+def test_project_list_served_from_response_cache(auth_client, api_client, workspace, user, user2, django_assert_max_num_queries):
+    from core.response_cache import response_cache
+    Project.objects.create(workspace=workspace, name='p', created_by=user)
+    WorkspaceMembership.objects.create(user=user2, workspace=workspace)
+    auth_client.credentials(HTTP_X_WORKSPACE_ID=str(workspace.id))
+    url = reverse('project-list')
+    first = auth_client.get(url)
+    assert first['X-Cache'] == 'MISS'
+
+    other = APIClient()
+    other.force_authenticate(user2)
+    other.credentials(HTTP_X_WORKSPACE_ID=str(workspace.id))
+    other.get(url)
+    with django_assert_max_num_queries(2):  # the membership check and the version still run
+        resp = other.get(url)
+    assert resp['X-Cache'] == 'HIT'
+    assert resp.content == first.content
+    assert response_cache.stats()['hits'] == 2
+
+    Project.objects.create(workspace=workspace, name='q', created_by=user)
+    resp = auth_client.get(url)
+    assert resp['X-Cache'] == 'MISS'
+    assert len(resp.json()['results']) == 2
+
+def test_workspace_retrieve_cached_until_workspace_changes(auth_client, workspace):
+    url = reverse('workspace-detail', kwargs={'pk': workspace.id})
+    assert auth_client.get(url)['X-Cache'] == 'MISS'
+    assert auth_client.get(url)['X-Cache'] == 'HIT'
+    workspace.name = 'Renamed'
+    workspace.save()
+    resp = auth_client.get(url)
+    assert resp['X-Cache'] == 'MISS' and resp.json()['name'] == 'Renamed'
+
+def test_local_response_backend_respects_byte_budget():
+    from core.response_cache import LocalResponseBackend
+    backend = LocalResponseBackend(max_bytes=10)
+    backend.set('a', (b'12345', 'application/json'))
+    backend.set('b', (b'12345', 'application/json'))
+    backend.get('a')
+    backend.set('c', (b'12345', 'application/json'))
+    assert backend.get('b') is None and backend.get('a') is not None
+    assert backend.size == 10 and backend.evictions == 1
+
+def test_local_response_backend_expires_entries(monkeypatch):
+    from core import response_cache
+    now = [1000.0]
+    monkeypatch.setattr(response_cache.time, 'monotonic', lambda: now[0])
+    backend = response_cache.LocalResponseBackend(max_bytes=10, ttl=5)
+    backend.set('a', (b'12345', 'application/json'))
+    now[0] += 4
+    assert backend.get('a') is not None
+    now[0] += 1
+    assert backend.get('a') is None and backend.size == 0
+
+def test_values_serializer_matches_model_serializer(workspace, user):
+    from core.fast_serializers import ValuesSerializer
+    from core.serializers import ProjectSerializer, WorkspaceSerializer
+    Project.objects.create(workspace=workspace, name='p', description='', created_by=user)
+    Project.objects.create(workspace=workspace, name='q', created_by=None)
+    for serializer_class, queryset in ((ProjectSerializer, Project.objects.order_by('id')),
+                                       (WorkspaceSerializer, Workspace.objects.order_by('id'))):
+        fast = ValuesSerializer.for_class(serializer_class)
+        assert fast.serialize(queryset.values(*fast.columns)) == serializer_class(queryset, many=True).data
+
+def test_project_list_fast_path_paginates(auth_client, workspace, user):
+    Project.objects.bulk_create([Project(workspace=workspace, name=f'p{i}', created_by=user) for i in range(3)])
+    auth_client.credentials(HTTP_X_WORKSPACE_ID=str(workspace.id))
+    resp = auth_client.get(reverse('project-list'), {'page_size': 2})
+    assert [p['name'] for p in resp.json()['results']] == ['p0', 'p1']
+    resp = auth_client.get(resp.json()['next'])
+    assert [p['name'] for p in resp.json()['results']] == ['p2']
+    assert resp.json()['results'][0]['created_by'] == user.id
+
+def test_fast_json_renderer_matches_drf():
+    import datetime
+    from decimal import Decimal
+    from rest_framework.renderers import JSONRenderer
+    from core.renderers import FastJSONRenderer
+    data = {'name': 'café  ', 'when': datetime.datetime(2024, 1, 2, 3, 4, 5, 678901, tzinfo=datetime.timezone.utc),
+            'n': [1, 2.5, None, True], 'd': Decimal('1.10')}
+    assert FastJSONRenderer().render(data) == JSONRenderer().render(data)
+
+def test_project_search_ranked_and_scoped(auth_client, workspace, user, user2):
+    other = Workspace.objects.create(name='Other', slug='other', owner=user2)
+    Project.objects.create(workspace=workspace, name='Billing dashboard', description='invoices')
+    Project.objects.create(workspace=workspace, name='Website', description='new billing page for the website')
+    Project.objects.create(workspace=workspace, name='Mobile app', description='')
+    Project.objects.create(workspace=other, name='Billing', description='not yours')
+    auth_client.credentials(HTTP_X_WORKSPACE_ID=str(workspace.id))
+    url = reverse('project-search')
+
+    resp = auth_client.get(url, {'q': 'billing'})
+    assert resp.status_code == 200
+    assert [p['name'] for p in resp.json()['results']] == ['Billing dashboard', 'Website']
+    assert resp.json()['count'] == 2
+
+    # Index follows updates and deletes, and prefixes match.
+    Project.objects.filter(name='Mobile app').update(description='billing on phones')
+    Project.objects.filter(name='Website').delete()
+    resp = auth_client.get(url, {'q': 'bill'})
+    assert [p['name'] for p in resp.json()['results']] == ['Billing dashboard', 'Mobile app']
+
+    assert auth_client.get(url, {'q': '"unbalanced'}).status_code == 200
+    assert auth_client.get(url).status_code == 400
+
+def test_instrumentation_records_per_view_histograms(auth_client, workspace, user):
+    from core.instrumentation import metrics
+    metrics.clear()
+    Project.objects.create(workspace=workspace, name='p', created_by=user)
+    auth_client.credentials(HTTP_X_WORKSPACE_ID=str(workspace.id))
+    auth_client.get(reverse('project-list'), {'expand': 'created_by'})
+    auth_client.get(reverse('async-project-list'), HTTP_X_WORKSPACE_ID=str(workspace.id))
+    snapshot = metrics.snapshot()
+    stats = snapshot['GET ProjectViewSet.list']
+    assert stats['wall_ms']['count'] == 1
+    assert stats['db_queries']['max'] >= 3  # session, user, membership, projects
+    assert stats['response_bytes']['max'] > 0
+    for name in ('serializer_ms', 'permissions_ms', 'workspace_middleware_ms', 'db_ms'):
+        assert stats[name]['count'] == 1
+    assert 'GET AsyncProjectListView' in snapshot
+
+def test_serializer_time_recorded_without_changing_serializer_class(auth_client, workspace):
+    from core.instrumentation import metrics
+    from core.serializers import MembershipSerializer
+    metrics.clear()
+    auth_client.credentials(HTTP_X_WORKSPACE_ID=str(workspace.id))
+    resp = auth_client.get(reverse('membership-list'))
+    assert type(resp.data['results'].serializer.child) is MembershipSerializer
+    assert metrics.snapshot()['GET MembershipViewSet.list']['serializer_ms']['count'] == 1
+
+def test_metrics_endpoint_requires_staff(auth_client, user):
+    url = reverse('metrics')
+    assert auth_client.get(url).status_code == 403
+    user.is_staff = True
+    user.save()
+    auth_client.get(url)
+    resp = auth_client.get(url)
+    assert resp['Content-Type'].startswith('text/plain')
+    assert 'backendapps_request_wall_ms{view="GET MetricsView",quantile="0.5"}' in resp.content.decode()
+    assert 'GET MetricsView' in auth_client.get(url, {'format': 'json'}).json()['requests']
+
+def test_slow_requests_logged_with_sql(auth_client, workspace, monkeypatch, caplog):
+    monkeypatch.setattr('core.instrumentation.SLOW_REQUEST_MS', 0)
+    auth_client.credentials(HTTP_X_WORKSPACE_ID=str(workspace.id))
+    with caplog.at_level('WARNING', logger='core.instrumentation'):
+        auth_client.get(reverse('project-list'))
+    assert 'Slow request GET /api/projects/' in caplog.text
+    assert 'core_project' in caplog.text
+
+def test_histogram_percentiles():
+    from core.instrumentation import Histogram
+    histogram = Histogram()
+    for value in range(1, 1001):
+        histogram.record(value)
+    assert 450 <= histogram.percentile(0.5) <= 550
+    assert 940 <= histogram.percentile(0.99) <= 1000
+    assert histogram.summary()['max'] == 1000
+
+def test_api_benchmark_smoke(db):
+    from benchmarks.api import run
+    report = run(workspaces=2, members=3, projects=4, requests=2, use_http=False)
+    scenarios = {row['scenario']: row for row in report['results']}
+    assert set(scenarios) == {'client/login', 'client/project-list', 'client/project-create',
+                              'client/membership-list', 'client/invite'}
+    assert all(row['requests'] == 2 and row['queries_mean'] > 0 for row in scenarios.values())
+
+def test_workspace_counters_follow_writes(auth_client, workspace, user, user2):
+    def counts():
+        resp = auth_client.get(reverse('workspace-detail', kwargs={'pk': workspace.id}))
+        return resp.data['member_count'], resp.data['project_count']
+
+    assert counts() == (1, 0)
+    auth_client.credentials(HTTP_X_WORKSPACE_ID=str(workspace.id))
+    resp = auth_client.post(reverse('project-bulk'), [{'name': f'p{i}'} for i in range(3)], format='json')
+    project = Project.objects.create(workspace=workspace, name='single')
+    auth_client.post(reverse('workspace-invite-users', kwargs={'pk': workspace.id}), {'emails': [user2.email]}, format='json')
+    assert counts() == (2, 4)
+
+    membership = WorkspaceMembership.objects.get(user=user2, workspace=workspace)
+    membership.is_active = False
+    membership.save()
+    membership.save()  # not a flip
+    auth_client.delete(reverse('project-bulk'), {'ids': [p['id'] for p in resp.data]}, format='json')
+    project.delete()
+    assert counts() == (1, 0)
+    membership.delete()  # already inactive
+    workspace.name = 'Renamed'
+    workspace.save()  # a stale in-memory copy must not reset the counters
+    assert counts() == (1, 0)
+
+def test_reconcile_workspace_counts_repairs_drift(workspace, user):
+    from django.core.management import call_command
+    other = Workspace.objects.create(name='Other', slug='other', owner=user)
+    Project.objects.bulk_create([Project(workspace=workspace, name=f'p{i}') for i in range(3)])
+    Workspace.objects.filter(pk=other.pk).update(member_count=7)
+    call_command('reconcile_workspace_counts', '--batch-size', '1')
+    assert list(Workspace.objects.order_by('pk').values_list('member_count', 'project_count')) == [(1, 3), (0, 0)]
+
+    from core.counters import reconcile_counts
+    assert reconcile_counts() == 0
+
+def test_my_workspaces_single_query_cached_per_user(auth_client, workspace, user, user2, django_assert_num_queries):
+    from core.response_cache import response_cache
+    other = Workspace.objects.create(name='Beta', slug='beta', owner=user2)
+    WorkspaceMembership.objects.create(user=user2, workspace=other, role=WorkspaceMembership.ROLE_OWNER)
+    hidden = Workspace.objects.create(name='Gamma', slug='gamma', owner=user2)
+    WorkspaceMembership.objects.create(user=user, workspace=hidden, is_active=False)
+    url = reverse('workspace-mine')
+    auth_client.get(url)  # warm the session/auth caches
+
+    response_cache.clear()
+    with django_assert_num_queries(4):  # session, user, membership version and the joined listing
+        resp = auth_client.get(url)
+    assert [(w['slug'], w['role']) for w in resp.json()['results']] == [('acme', 'owner')]
+    with django_assert_num_queries(3):
+        assert auth_client.get(url)['X-Cache'] == 'HIT'
+
+    WorkspaceMembership.objects.create(user=user, workspace=other, role=WorkspaceMembership.ROLE_ADMIN)
+    resp = auth_client.get(url)
+    assert [(w['slug'], w['role']) for w in resp.json()['results']] == [('acme', 'owner'), ('beta', 'admin')]
+    other.name = 'Alpha'
+    other.save()
+    assert [w['name'] for w in auth_client.get(url).json()['results']] == ['Acme', 'Alpha']
+
+def test_membership_versions_are_stored_and_bumped(user, user2):
+    from core.versioning import bump_member_versions, get_member_version
+    assert get_member_version(user.pk) == 0
+    bump_member_versions([user.pk])
+    first = get_member_version(user.pk)
+    bump_member_versions([user.pk, user2.pk])
+    assert get_member_version(user.pk) == first + 1 and get_member_version(user2.pk) > 0
+
+def test_sparse_fieldsets_skip_unselected_columns(auth_client, workspace, user):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    Project.objects.create(workspace=workspace, name='p1', description='long text', created_by=user)
+    auth_client.credentials(HTTP_X_WORKSPACE_ID=str(workspace.id))
+    url = reverse('project-list')
+
+    def get(params):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = auth_client.get(url, params)
+        project_sql = [q['sql'] for q in ctx.captured_queries if 'FROM "core_project"' in q['sql']]
+        assert project_sql and not any('"description"' in sql for sql in project_sql)
+        return resp.json()['results']
+
+    assert get({'fields': 'id,name'}) == [{'id': Project.objects.get().pk, 'name': 'p1'}]
+    rows = get({'expand': 'created_by', 'omit': 'description,workspace'})
+    assert set(rows[0]) == {'id', 'name', 'created_by', 'created_at'}
+    assert rows[0]['created_by']['email'] == user.email
+
+    resp = auth_client.get(reverse('membership-list'), {'fields': 'user_email,role'})
+    assert resp.json()['results'] == [{'user_email': user.email, 'role': 'owner'}]
+    resp = auth_client.get(reverse('workspace-mine'), {'fields': 'slug'})
+    assert resp.json()['results'] == [{'slug': 'acme'}]
+
+    # Writes ignore the selection.
+    resp = auth_client.post(url + '?fields=id', {'name': 'p2', 'description': 'd'}, format='json')
+    assert resp.status_code == 201 and resp.data['description'] == 'd'
+
+def test_deletes_are_soft_and_hidden(auth_client, workspace, user, user2):
+    auth_client.credentials(HTTP_X_WORKSPACE_ID=str(workspace.id))
+    keep, gone = (Project.objects.create(workspace=workspace, name=name) for name in ('keep', 'gone'))
+    assert auth_client.delete(reverse('project-detail', kwargs={'pk': gone.pk})).status_code == 204
+    assert [p['name'] for p in auth_client.get(reverse('project-list')).json()['results']] == ['keep']
+    assert Project.all_objects.get(pk=gone.pk).deleted_at is not None
+    assert auth_client.delete(reverse('project-bulk'), {'ids': [keep.pk, gone.pk]}, format='json').data == {'deleted': 1}
+
+    membership = WorkspaceMembership.objects.create(user=user2, workspace=workspace)
+    assert auth_client.delete(reverse('membership-detail', kwargs={'pk': membership.pk})).status_code == 204
+    workspace.refresh_from_db()
+    assert (workspace.member_count, workspace.project_count) == (1, 0)
+    # A removed member can be invited again while the old row awaits the purge.
+    resp = auth_client.post(reverse('workspace-invite-user', kwargs={'pk': workspace.id}), {'email': user2.email}, format='json')
+    assert resp.status_code == 201
+    assert WorkspaceMembership.all_objects.filter(user=user2, workspace=workspace).count() == 2
+
+def test_deleted_workspace_unreachable_through_stale_workspace_cache(auth_client, workspace, user):
+    from django.utils import timezone
+    from core.resolvers import get_workspace
+    Project.objects.create(workspace=workspace, name='p', created_by=user)
+    get_workspace(workspace.id)
+    # Deleted by another worker: this process still has the workspace cached.
+    Workspace.objects.filter(pk=workspace.pk).update(deleted_at=timezone.now())
+    assert get_workspace(workspace.id) is not None
+    auth_client.credentials(HTTP_X_WORKSPACE_ID=str(workspace.id))
+    assert auth_client.get(reverse('project-list')).status_code == 403
+    assert auth_client.get(reverse('membership-list')).status_code == 403
+
+def test_racing_project_deletes_count_each_row_once(workspace, monkeypatch):
+    from django.utils import timezone
+    from core import deletion
+    projects = Project.objects.bulk_create([Project(workspace=workspace, name=f'p{i}') for i in range(3)])
+    Workspace.objects.filter(pk=workspace.pk).update(project_count=3)
+    mark_deleted = deletion._mark_deleted
+
+    def racing(model, rows_by_group):
+        # Another request deletes p0 between our read and our update.
+        Project.objects.filter(pk=projects[0].pk).update(deleted_at=timezone.now())
+        return mark_deleted(model, rows_by_group)
+
+    monkeypatch.setattr(deletion, '_mark_deleted', racing)
+    assert deletion.soft_delete_projects(Project.objects.filter(workspace=workspace)) == 2
+    assert Workspace.objects.get(pk=workspace.pk).project_count == 1
+
+def test_admin_workspace_delete_is_soft(client, workspace, user):
+    User.objects.filter(pk=user.pk).update(is_staff=True, is_superuser=True)
+    client.force_login(user)
+    Project.objects.create(workspace=workspace, name='p')
+    resp = client.post(reverse('admin:core_workspace_delete', args=[workspace.pk]), {'post': 'yes'})
+    assert resp.status_code == 302
+    assert Workspace.all_objects.get(pk=workspace.pk).deleted_at is not None
+    assert Project.all_objects.filter(workspace=workspace).exists()
+
+def test_workspace_delete_defers_cascade_to_purge(auth_client, workspace, user, django_assert_max_num_queries):
+    from datetime import timedelta
+    from django.core.management import call_command
+    from django.utils import timezone
+    from core.models import ArchivedRecord
+    Project.objects.bulk_create([Project(workspace=workspace, name=f'p{i}') for i in range(5)])
+    url = reverse('workspace-detail', kwargs={'pk': workspace.id})
+    with django_assert_max_num_queries(7):  # constant: no per-row cascade
+        assert auth_client.delete(url).status_code == 204
+    assert auth_client.get(url).status_code == 404
+    assert auth_client.get(reverse('workspace-mine')).json()['results'] == []
+    assert Project.all_objects.filter(workspace=workspace).count() == 5
+
+    call_command('purge_deleted')  # still inside the retention window
+    assert Workspace.all_objects.filter(pk=workspace.pk).exists()
+    Workspace.all_objects.filter(pk=workspace.pk).update(deleted_at=timezone.now() - timedelta(days=31))
+    call_command('purge_deleted', '--batch-size', '2', '--max-batches', '2', '--archive')
+    assert Project.all_objects.filter(workspace=workspace).count() == 1
+    call_command('purge_deleted', '--batch-size', '2', '--archive')
+    assert not Workspace.all_objects.filter(pk=workspace.pk).exists()
+    assert not Project.all_objects.exists() and not WorkspaceMembership.all_objects.exists()
+    labels = list(ArchivedRecord.objects.values_list('label', flat=True))
+    assert sorted(set(labels)) == ['core.project', 'core.workspace', 'core.workspacemembership']
+    assert len(labels) == 7
@@ -1,9 +1,18 @@
+from django.urls import path
 from rest_framework.routers import DefaultRouter
-from .views import WorkspaceViewSet, MembershipViewSet, ProjectViewSet
+from .views import WorkspaceViewSet, MembershipViewSet, ProjectViewSet, MetricsView
+from .async_views import AsyncProjectListView, AsyncProjectDetailView, AsyncWorkspaceListView, AsyncWorkspaceDetailView
 
 router = DefaultRouter()
 router.register(r'workspaces', WorkspaceViewSet, basename='workspace')
 router.register(r'memberships', MembershipViewSet, basename='membership')
 router.register(r'projects', ProjectViewSet, basename='project')
 
-urlpatterns = router.urls
+urlpatterns = router.urls + [
+    path('metrics/', MetricsView.as_view(), name='metrics'),
+    # Native async read paths, served without thread hand-offs under ASGI.
+    path('async/projects/', AsyncProjectListView.as_view(), name='async-project-list'),
+    path('async/projects/<int:pk>/', AsyncProjectDetailView.as_view(), name='async-project-detail'),
+    path('async/workspaces/', AsyncWorkspaceListView.as_view(), name='async-workspace-list'),
+    path('async/workspaces/<int:pk>/', AsyncWorkspaceDetailView.as_view(), name='async-workspace-detail'),
+]
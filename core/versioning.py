@@ -0,0 +1,68 @@
+"""
+Change versions that cached responses and ETags are keyed on.
+
+A workspace's version is the Workspace.version column and a user's membership
+version a MembershipVersion row. Both are bumped with
+`UPDATE ... SET version = version + 1` in the writer's transaction, so every
+worker sees a change as soon as it commits and no version is ever handed out
+twice.
+"""
+from django.db.models import F, Q
+
+from .models import MembershipVersion, Project, Workspace, WorkspaceMembership
+
+# User fields that workspace-scoped lists serialize (membership user_email,
+# a project's expanded created_by); changing one moves those workspaces' versions.
+USER_SUMMARY_FIELDS = frozenset({'email', 'username'})
+
+
+def get_workspace_version(workspace_id, request=None):
+    """
+    Change version for everything scoped to a workspace, or None if there is no
+    such workspace. Given the request, it is read at most once per request.
+    """
+    memo = None
+    if request is not None:
+        request = getattr(request, '_request', request)
+        memo = request.__dict__.setdefault('_workspace_versions', {})
+        if workspace_id in memo:
+            return memo[workspace_id]
+    version = Workspace.all_objects.filter(pk=workspace_id).values_list('version', flat=True).first()
+    if memo is not None:
+        memo[workspace_id] = version
+    return version
+
+
+def version_bump():
+    """Update expression that moves a workspace to its next version."""
+    return F('version') + 1
+
+
+def bump_workspace_version(*workspace_ids):
+    if workspace_ids:
+        Workspace.all_objects.filter(pk__in=workspace_ids).update(version=version_bump())
+
+
+def bump_user_workspace_versions(user_ids):
+    """Bump every workspace that lists one of `user_ids`, as a member or as a project's creator."""
+    user_ids = set(user_ids)
+    if user_ids:
+        Workspace.all_objects.filter(
+            Q(pk__in=WorkspaceMembership.objects.filter(user_id__in=user_ids).values('workspace_id'))
+            | Q(pk__in=Project.objects.filter(created_by_id__in=user_ids).values('workspace_id'))
+        ).update(version=version_bump())
+
+
+def get_member_version(user_id):
+    """Change version of a user's workspace memberships (and of those workspaces' names and slugs)."""
+    return MembershipVersion.objects.filter(user_id=user_id).values_list('version', flat=True).first() or 0
+
+
+def bump_member_versions(user_ids):
+    """Move every user in `user_ids` to a new membership version: one insert for missing rows, one update."""
+    user_ids = set(user_ids)
+    if user_ids:
+        MembershipVersion.objects.bulk_create(
+            [MembershipVersion(user_id=user_id) for user_id in user_ids], ignore_conflicts=True,
+        )
+        MembershipVersion.objects.filter(user_id__in=user_ids).update(version=version_bump())
@@ -1,25 +1,134 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F
+from django.http import Http404
 from .models import Workspace, WorkspaceMembership, Project
-from .serializers import WorkspaceSerializer, WorkspaceCreateSerializer, MembershipSerializer, ProjectSerializer
+from .serializers import WorkspaceSerializer, WorkspaceCreateSerializer, MyWorkspaceSerializer, MembershipSerializer, ProjectSerializer, BulkInviteSerializer
 from .permissions import IsWorkspaceMember, IsWorkspaceAdminOrOwner
+from .resolvers import get_view_workspace
+from .counters import adjust_counts
+from .deletion import soft_delete_memberships, soft_delete_projects, soft_delete_workspace
+from .versioning import bump_member_versions, get_member_version
+from .streaming import ndjson_response
 from .filter_backends import WorkspaceFilterBackend
-from rest_framework.permissions import IsAuthenticated
+from .mixins import StreamingExportMixin, QueryPlanMixin, ReplicaReadMixin, ConditionalListMixin, ConditionalObjectMixin, CachedResponseMixin, FastListMixin
+from .instrumentation import InstrumentedViewMixin, metrics, span
+from .renderers import PrometheusTextRenderer
+from .response_cache import response_cache
+from .pagination import ProjectCursorPagination, MembershipCursorPagination, MyWorkspacesPagination, SearchPagination
+from .search import search_projects
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.renderers import JSONRenderer
+from rest_framework.views import APIView
 
-class WorkspaceViewSet(viewsets.ModelViewSet):
+BULK_INVITE_CHUNK_SIZE = getattr(settings, 'BULK_INVITE_CHUNK_SIZE', 500)
+BULK_INVITE_STREAM_THRESHOLD = getattr(settings, 'BULK_INVITE_STREAM_THRESHOLD', 1000)
+BULK_PROJECT_MAX_ITEMS = getattr(settings, 'BULK_PROJECT_MAX_ITEMS', 5000)
+
+
+def _bulk_ids(items):
+    try:
+        return [int(item['id']) for item in items]
+    except (KeyError, TypeError, ValueError):
+        raise ValidationError({'detail': 'every item needs an integer "id"'})
+
+
+def _invite_chunk(workspace, emails, role):
+    """Invite a chunk of emails with three queries: users, existing memberships, insert."""
+    user_ids = dict(get_user_model().objects.filter(email__in=emails).values_list('email', 'id'))
+    existing = set(
+        WorkspaceMembership.objects
+        .filter(workspace=workspace, user_id__in=user_ids.values())
+        .values_list('user_id', flat=True)
+    )
+    new_user_ids = [uid for uid in user_ids.values() if uid not in existing]
+    WorkspaceMembership.objects.bulk_create(
+        [WorkspaceMembership(user_id=uid, workspace=workspace, role=role) for uid in new_user_ids],
+        ignore_conflicts=True,
+    )
+    # bulk_create skips post_save, so update the counters and versions ourselves.
+    if new_user_ids:
+        adjust_counts(workspace.pk, members=len(new_user_ids))
+        bump_member_versions(new_user_ids)
+
+    results = []
+    for email in emails:
+        uid = user_ids.get(email)
+        if uid is None:
+            results.append({'email': email, 'status': 'not_found'})
+        elif uid in existing:
+            results.append({'email': email, 'status': 'already_member', 'user': uid})
+        else:
+            results.append({'email': email, 'status': 'invited', 'user': uid})
+    return results
+
+
+def invite_emails(workspace, emails, role):
+    """Invite every email now, one transaction per chunk; returns the per-email results."""
+    emails = list(dict.fromkeys(emails))
+    results = []
+    for start in range(0, len(emails), BULK_INVITE_CHUNK_SIZE):
+        with transaction.atomic():
+            results.extend(_invite_chunk(workspace, emails[start:start + BULK_INVITE_CHUNK_SIZE], role))
+    return results
+
+class WorkspaceViewSet(InstrumentedViewMixin, ReplicaReadMixin, CachedResponseMixin, FastListMixin, viewsets.ModelViewSet):
     queryset = Workspace.objects.all()
     permission_classes = [IsAuthenticated]
-    
+    workspace_url_kwarg = 'pk'
+    response_cache_actions = ('retrieve', 'mine')
 
     def get_serializer_class(self):
         if self.action == 'create':
             return WorkspaceCreateSerializer
+        if self.action == 'mine':
+            return MyWorkspaceSerializer
         return WorkspaceSerializer
 
+    def get_response_cache_workspace_id(self, request):
+        pk = self.kwargs.get(self.workspace_url_kwarg, '')
+        return int(pk) if str(pk).isdigit() else None
+
+    def get_response_cache_scope(self, request):
+        if self.action == 'mine':
+            return f'user:{request.user.pk}', get_member_version(request.user.pk)
+        return super().get_response_cache_scope(request)
+
+    @action(detail=False, methods=['get'])
+    def mine(self, request):
+        """The caller's active workspaces with their role in each, in one joined query."""
+        return self._cached(self._list_mine, request)
+
+    def _list_mine(self, request):
+        # Both conditions in one filter() so they apply to the same joined membership row.
+        # Joins bypass the default manager, so the membership's own live filter is spelled out.
+        queryset = Workspace.objects.filter(
+            memberships__user=request.user, memberships__is_active=True, memberships__deleted_at__isnull=True,
+        ).annotate(role=F('memberships__role'))
+        serializer = self.get_values_serializer(MyWorkspaceSerializer)
+        paginator = MyWorkspacesPagination()
+        columns = self.get_values_columns(serializer, MyWorkspacesPagination)
+        page = paginator.paginate_queryset(queryset.values(*columns), request, view=self)
+        with span('serializer'):
+            data = serializer.serialize(page)
+        return paginator.get_paginated_response(data)
+
+    def perform_destroy(self, instance):
+        # Children are purged later in batches (core.deletion), not cascaded here.
+        soft_delete_workspace(instance)
+
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated, IsWorkspaceAdminOrOwner])
     def invite_user(self, request, pk=None):
-        workspace = self.get_object()
+        # Already resolved (and cached) by IsWorkspaceAdminOrOwner.
+        workspace = get_view_workspace(request, self)
+        if workspace is None:
+            raise Http404
+        self.check_object_permissions(request, workspace)
         email = request.data.get('email')
         try:
             user = __import__('django.contrib.auth').contrib.auth.get_user_model().objects.get(email=email)
@@ -29,20 +138,106 @@ class WorkspaceViewSet(viewsets.ModelViewSet):
         serializer = MembershipSerializer(membership, context={'request': request})
         return Response(serializer.data, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
 
-class MembershipViewSet(viewsets.ModelViewSet):
+    @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated, IsWorkspaceAdminOrOwner])
+    def invite_users(self, request, pk=None):
+        workspace = get_view_workspace(request, self)
+        if workspace is None:
+            raise Http404
+        self.check_object_permissions(request, workspace)
+        serializer = BulkInviteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        emails, role = serializer.validated_data['emails'], serializer.validated_data['role']
+        # All writes finish here, before the response; only the results are streamed.
+        results = invite_emails(workspace, emails, role)
+        if len(emails) > BULK_INVITE_STREAM_THRESHOLD:
+            return ndjson_response(results)
+        return Response({'results': results})
+
+class MembershipViewSet(InstrumentedViewMixin, ConditionalListMixin, QueryPlanMixin, StreamingExportMixin, viewsets.ModelViewSet):
     queryset = WorkspaceMembership.objects.all()
     serializer_class = MembershipSerializer
+    select_related_fields = ('user',)
     permission_classes = [IsAuthenticated, IsWorkspaceAdminOrOwner]
     filter_backends = [WorkspaceFilterBackend]
+    pagination_class = MembershipCursorPagination
+    export_fields = ('id', 'user', 'role', 'is_active', 'created_at')
+    export_annotations = {'user_email': F('user__email')}
+    export_filename = 'memberships'
 
     def perform_create(self, serializer):
         serializer.save(workspace=self.request.workspace)
 
-class ProjectViewSet(viewsets.ModelViewSet):
+    def perform_destroy(self, instance):
+        soft_delete_memberships(WorkspaceMembership.objects.filter(pk=instance.pk))
+
+class ProjectViewSet(InstrumentedViewMixin, ReplicaReadMixin, ConditionalListMixin, ConditionalObjectMixin, CachedResponseMixin, FastListMixin, QueryPlanMixin, StreamingExportMixin, viewsets.ModelViewSet):
     queryset = Project.objects.all()
     serializer_class = ProjectSerializer
     permission_classes = [IsAuthenticated, IsWorkspaceMember]
     filter_backends = [WorkspaceFilterBackend]
+    pagination_class = ProjectCursorPagination
+    export_fields = ('id', 'workspace', 'name', 'description', 'created_by', 'created_at')
+    export_filename = 'projects'
+    replica_actions = ('list', 'retrieve', 'search')
 
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
+
+    def perform_destroy(self, instance):
+        soft_delete_projects(Project.objects.filter(pk=instance.pk))
+
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            raise ValidationError({'q': 'a search query is required'})
+        # filter_queryset() applies WorkspaceFilterBackend, i.e. for_workspace().
+        queryset = search_projects(self.filter_queryset(self.get_queryset()), query)
+        paginator = SearchPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        return paginator.get_paginated_response(self.get_serializer(page, many=True).data)
+
+    def get_bulk_serializer(self, *args, **kwargs):
+        return self.get_serializer(*args, many=True, max_length=BULK_PROJECT_MAX_ITEMS, **kwargs)
+
+    @action(detail=False, methods=['post'], url_path='bulk', url_name='bulk')
+    def bulk_create(self, request):
+        serializer = self.get_bulk_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            serializer.save()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @bulk_create.mapping.patch
+    def bulk_partial_update(self, request):
+        if not isinstance(request.data, list):
+            raise ValidationError({'detail': 'expected a list of objects'})
+        ids = _bulk_ids(request.data)
+        # Workspace scoping is enforced once for the whole batch.
+        instances = list(self.filter_queryset(self.get_queryset()).filter(id__in=ids))
+        missing = sorted(set(ids) - {project.pk for project in instances})
+        if missing:
+            raise ValidationError({'detail': 'unknown project ids', 'ids': missing})
+        serializer = self.get_bulk_serializer(instances, data=request.data, partial=True)
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            serializer.save()
+        return Response(serializer.data)
+
+    @bulk_create.mapping.delete
+    def bulk_destroy(self, request):
+        ids = request.data.get('ids') if isinstance(request.data, dict) else None
+        if not isinstance(ids, list):
+            raise ValidationError({'ids': 'expected a list of project ids'})
+        ids = _bulk_ids({'id': pk} for pk in ids)
+        deleted = soft_delete_projects(self.filter_queryset(self.get_queryset()).filter(id__in=ids))
+        return Response({'deleted': deleted})
+
+
+class MetricsView(InstrumentedViewMixin, APIView):
+    """Per-view request histograms (core.instrumentation); Prometheus text by default, ?format=json for JSON."""
+    permission_classes = [IsAdminUser]
+    renderer_classes = [PrometheusTextRenderer, JSONRenderer]
+
+    def get(self, request):
+        return Response({'requests': metrics.snapshot(), 'response_cache': response_cache.stats()})
@@ -5,4 +5,5 @@ class CoreAuthConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core_auth'
 
-   
\ No newline at end of file
+    def ready(self):
+        from . import checks, signals  # noqa: F401
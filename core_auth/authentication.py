@@ -0,0 +1,82 @@
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework import exceptions
+from rest_framework.authentication import BaseAuthentication, get_authorization_header
+
+from .roles import RoleSnapshot
+from .tokens import ACCESS, InvalidToken, adecode_token, decode_token
+
+User = get_user_model()
+
+
+def user_from_claims(claims: dict):
+    """
+    Build a User from access-token claims without touching the database.
+
+    Only the fields carried in the token are loaded; any other field is deferred and
+    fetched on first access, and save() only writes the loaded fields. The role
+    snapshot comes from the claims too, so RolePermission runs without queries.
+    """
+    loaded = {
+        "id": int(claims["sub"]),
+        "email": claims.get("email", ""),
+        "plan": claims.get("plan", "free"),
+        "is_active": claims.get("active", False),
+        "is_staff": claims.get("staff", False),
+        "is_superuser": claims.get("superuser", False),
+    }
+    fields = [f.attname for f in User._meta.concrete_fields if f.attname in loaded]
+    user = User.from_db(DEFAULT_DB_ALIAS, fields, [loaded[name] for name in fields])
+    user.__dict__["_role_snapshot"] = RoleSnapshot(
+        frozenset(claims.get("roles", ())), frozenset(claims.get("perms", ()))
+    )
+    return user
+
+
+class SignedTokenAuthentication(BaseAuthentication):
+    """
+    Stateless `Authorization: Bearer <access token>` authentication.
+    No session or user row is read; see core_auth.tokens for issuing and revocation.
+    """
+    keyword = "Bearer"
+
+    def authenticate(self, request):
+        token = self._get_token(request)
+        if token is None:
+            return None
+        try:
+            claims = decode_token(token, ACCESS)
+        except InvalidToken as e:
+            raise exceptions.AuthenticationFailed(f"Invalid token: {e}")
+        return self._authenticate_claims(claims)
+
+    async def aauthenticate(self, request):
+        """Async counterpart of authenticate(), for views that run on the event loop."""
+        token = self._get_token(request)
+        if token is None:
+            return None
+        try:
+            claims = await adecode_token(token, ACCESS)
+        except InvalidToken as e:
+            raise exceptions.AuthenticationFailed(f"Invalid token: {e}")
+        return self._authenticate_claims(claims)
+
+    def _get_token(self, request):
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) != 2:
+            raise exceptions.AuthenticationFailed("Invalid bearer header.")
+        try:
+            return auth[1].decode()
+        except UnicodeError as e:
+            raise exceptions.AuthenticationFailed(f"Invalid token: {e}")
+
+    def _authenticate_claims(self, claims):
+        user = user_from_claims(claims)
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed("User inactive or deleted.")
+        return user, claims
+
+    def authenticate_header(self, request):
+        return self.keyword
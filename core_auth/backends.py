@@ -6,10 +6,15 @@ User = get_user_model()
 class EmailBackend(ModelBackend):
     def authenticate(self, request, username=None, password=None, **kwargs):
         email = username or kwargs.get("email")
+        if email is None or password is None:
+            return None
         try:
             user = User.objects.get(email=email)
         except User.DoesNotExist:
+            # Hash anyway so unknown emails take as long as wrong passwords.
+            User().set_password(password)
             return None
-        if user.check_password(password):
+        # check_password() also re-hashes with the preferred hasher when it is outdated.
+        if user.check_password(password) and self.user_can_authenticate(user):
             return user
         return None
@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+from core.cache import is_shared_cache
+
+
+@register(Tags.caches)
+def check_session_cache(app_configs, **kwargs):
+    """core_auth.sessions needs a cache every worker shares, or logouts only reach one worker."""
+    if settings.SESSION_ENGINE != "core_auth.sessions":
+        return []
+    alias = getattr(settings, "SESSION_CACHE_ALIAS", None)
+    if is_shared_cache(alias):
+        return []
+    return [
+        Error(
+            f"SESSION_CACHE_ALIAS {alias!r} is not a cache shared between processes.",
+            hint="Point it at a redis, memcached, database or file-based cache, "
+                 "or unset it to use the database session engine.",
+            id="core_auth.E001",
+        )
+    ]
+
+
+@register(Tags.caches)
+def check_rbac_cache(app_configs, **kwargs):
+    """Role snapshot versions must live in a shared cache, or a revoked role survives on other workers."""
+    alias = getattr(settings, "RBAC_CACHE_ALIAS", None)
+    if alias is None or is_shared_cache(alias):
+        return []
+    return [
+        Error(
+            f"RBAC_CACHE_ALIAS {alias!r} is not a cache shared between processes.",
+            hint="Point it at a redis, memcached, database or file-based cache, "
+                 "or unset it to compute role snapshots per request.",
+            id="core_auth.E002",
+        )
+    ]
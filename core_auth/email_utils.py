@@ -1,8 +1,14 @@
+import base64
+import logging
 from typing import Iterable, Optional
 from django.core.mail import EmailMultiAlternatives
 from django.template.loader import render_to_string
 from django.conf import settings
 
+from .models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
 
 def send_email(
     subject: str,
@@ -20,6 +26,9 @@ def send_email(
     """
     Universal email sender supporting both HTML and plain text.
 
+    The message is rendered here but only queued in the outbox; delivery happens
+    in the `send_queued_email` worker so requests never wait on SMTP.
+
     Args:
         subject: Email subject.
         to: List of recipient email addresses.
@@ -32,7 +41,7 @@ def send_email(
         reply_to, cc, bcc, attachments: Standard email parameters.
 
     Returns:
-        True if sent successfully, False otherwise.
+        True if queued successfully, False otherwise.
     """
 
     try:
@@ -55,29 +64,49 @@ def send_email(
         elif not body_text:
             raise ValueError("Either body_text, body_html, or template_name must be provided")
 
-        email = EmailMultiAlternatives(
+        OutboundEmail.objects.create(
             subject=subject.strip(),
-            body=body_text.strip(),
+            body_text=body_text.strip(),
+            body_html=body_html or "",
             from_email=from_email or settings.DEFAULT_FROM_EMAIL,
             to=list(to),
             cc=list(cc or []),
             bcc=list(bcc or []),
             reply_to=list(reply_to or []),
+            attachments=[_encode_attachment(*attachment) for attachment in attachments or []],
         )
+        return True
 
-        # Attach HTML alternative
-        if body_html:
-            email.attach_alternative(body_html, "text/html")
+    except Exception:
+        logger.exception("Email queueing failed")
+        return False
 
-        # Attach files (tuples of (filename, content, mimetype))
-        if attachments:
-            for attachment in attachments:
-                email.attach(*attachment)
 
-        email.send(fail_silently=False)
-        return True
+def _encode_attachment(filename: str, content, mimetype: Optional[str] = None) -> list:
+    if isinstance(content, str):
+        content = content.encode()
+    return [filename, base64.b64encode(content).decode("ascii"), mimetype]
 
-    except Exception as e:
-        # In production, you’d log this instead of printing
-        print(f"Email sending failed: {e}")
-        return False
+
+def build_email_message(outbound, connection=None) -> EmailMultiAlternatives:
+    """Turn a queued OutboundEmail row back into a sendable message."""
+    email = EmailMultiAlternatives(
+        subject=outbound.subject,
+        body=outbound.body_text,
+        from_email=outbound.from_email,
+        to=outbound.to,
+        cc=outbound.cc,
+        bcc=outbound.bcc,
+        reply_to=outbound.reply_to,
+        connection=connection,
+    )
+
+    # Attach HTML alternative
+    if outbound.body_html:
+        email.attach_alternative(outbound.body_html, "text/html")
+
+    # Attach files (tuples of (filename, content, mimetype))
+    for filename, content, mimetype in outbound.attachments:
+        email.attach(filename, base64.b64decode(content), mimetype)
+
+    return email
@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher, ScryptPasswordHasher
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """
+    Argon2 with costs taken from settings. The algorithm name is unchanged, so
+    existing hashes still verify and are re-hashed on login when the costs change.
+    """
+    time_cost = getattr(settings, "ARGON2_TIME_COST", Argon2PasswordHasher.time_cost)
+    memory_cost = getattr(settings, "ARGON2_MEMORY_COST", Argon2PasswordHasher.memory_cost)
+    parallelism = getattr(settings, "ARGON2_PARALLELISM", Argon2PasswordHasher.parallelism)
+
+
+class TunedScryptPasswordHasher(ScryptPasswordHasher):
+    """scrypt with costs taken from settings (see TunedArgon2PasswordHasher)."""
+    work_factor = getattr(settings, "SCRYPT_WORK_FACTOR", ScryptPasswordHasher.work_factor)
+    block_size = getattr(settings, "SCRYPT_BLOCK_SIZE", ScryptPasswordHasher.block_size)
+    parallelism = getattr(settings, "SCRYPT_PARALLELISM", ScryptPasswordHasher.parallelism)
+
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from core_auth.sessions import SESSION_EXPIRY_BATCH_SIZE, SessionStore
+
+
+class Command(BaseCommand):
+    help = "Delete expired sessions in batches instead of one unbounded DELETE."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=SESSION_EXPIRY_BATCH_SIZE)
+        parser.add_argument("--max-batches", type=int, default=None, help="Stop after this many batches.")
+
+    def handle(self, *args, **options):
+        deleted = SessionStore.clear_expired(batch_size=options["batch_size"], max_batches=options["max_batches"])
+        self.stdout.write(f"deleted={deleted}")
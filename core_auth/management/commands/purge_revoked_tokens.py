@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from core_auth.tokens import JWT_REVOCATION_PURGE_BATCH_SIZE, revocation_list
+
+
+class Command(BaseCommand):
+    help = "Delete revocations of tokens that have already expired, in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=JWT_REVOCATION_PURGE_BATCH_SIZE)
+        parser.add_argument("--max-batches", type=int, default=None, help="Stop after this many batches.")
+
+    def handle(self, *args, **options):
+        deleted = revocation_list.purge_expired(batch_size=options["batch_size"], max_batches=options["max_batches"])
+        self.stdout.write(f"deleted={deleted}")
@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core_auth.outbox import OUTBOX_BATCH_SIZE, drain_outbox, metrics
+
+
+class Command(BaseCommand):
+    help = "Deliver queued outbound email in batches over one reused mail connection."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=OUTBOX_BATCH_SIZE)
+        parser.add_argument("--loop", action="store_true", help="Keep polling instead of exiting once drained.")
+        parser.add_argument("--interval", type=float, default=5.0, help="Seconds to sleep between polls with --loop.")
+
+    def handle(self, *args, **options):
+        while True:
+            result = drain_outbox(batch_size=options["batch_size"])
+            if result.claimed:
+                self.stdout.write(
+                    f"claimed={result.claimed} sent={result.sent} retried={result.retried} dead={result.dead} "
+                    f"(totals: {dict(metrics)})"
+                )
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
@@ -0,0 +1,21 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    State-only: 0001 recorded Django's UserManager for User, but the model uses
+    CustomUserManager, which is not `use_in_migrations`, so the autodetector has
+    been reporting this drift. No SQL is emitted.
+    """
+
+    dependencies = [
+        ('core_auth', '0003_outboundemail'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='user',
+            managers=[
+            ],
+        ),
+    ]
@@ -6,6 +6,8 @@ from django.contrib.auth.models import Group, Permission
 
 from django.contrib.auth.models import BaseUserManager
 
+from .roles import get_role_snapshot
+
 class CustomUserManager(BaseUserManager):
     def create_user(self, email, password=None, **extra_fields):
         if not email:
@@ -74,11 +76,19 @@ class User(AbstractUser):
 
     objects = CustomUserManager()
 
+    @property
+    def role_snapshot(self):
+        return get_role_snapshot(self)
+
     def has_role(self, role_name: str) -> bool:
-        return self.roles.filter(name=role_name).exists()
+        return self.role_snapshot.has_role(role_name)
 
     def has_any_role(self, *role_names) -> bool:
-        return self.roles.filter(name__in=role_names).exists()
+        return self.role_snapshot.has_any_role(role_names)
+
+    def has_role_permission(self, perm: str) -> bool:
+        """Check an "app_label.codename" permission granted through the user's roles."""
+        return self.role_snapshot.has_permission(perm)
 
     class Meta:
         verbose_name = "user"
@@ -93,3 +103,59 @@ class User(AbstractUser):
         return f"{self.username} ({self.email})"
 
 
+class OutboundEmail(models.Model):
+    """
+    Durable outbox row. The request path only inserts these; the
+    `send_queued_email` management command delivers them.
+    """
+
+    STATUS_PENDING = "pending"
+    STATUS_SENDING = "sending"
+    STATUS_SENT = "sent"
+    STATUS_DEAD = "dead"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_SENDING, "Sending"),
+        (STATUS_SENT, "Sent"),
+        (STATUS_DEAD, "Dead"),
+    ]
+
+    subject = models.CharField(max_length=998)
+    body_text = models.TextField()
+    body_html = models.TextField(blank=True)
+    from_email = models.CharField(max_length=254)
+    to = models.JSONField(default=list)
+    cc = models.JSONField(default=list, blank=True)
+    bcc = models.JSONField(default=list, blank=True)
+    reply_to = models.JSONField(default=list, blank=True)
+    # [filename, base64 content, mimetype] triples
+    attachments = models.JSONField(default=list, blank=True)
+
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    # Earliest time of the next delivery attempt; doubles as the claim lease while sending.
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "next_attempt_at"])]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.to)} ({self.status})"
+
+
+class RevokedToken(models.Model):
+    """
+    A revoked access or refresh token id, shared by every process. The row is
+    kept until the token would have expired anyway and only then purged
+    (`purge_revoked_tokens`); it is never evicted early.
+    """
+
+    jti = models.CharField(max_length=64, primary_key=True)
+    expires_at = models.DateTimeField(db_index=True)
+    revoked_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.jti
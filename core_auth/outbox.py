@@ -0,0 +1,158 @@
+import logging
+from collections import Counter
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Optional
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.db import connection as db_connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .email_utils import build_email_message
+from .models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_BATCH_SIZE = getattr(settings, "EMAIL_OUTBOX_BATCH_SIZE", 50)
+OUTBOX_MAX_ATTEMPTS = getattr(settings, "EMAIL_OUTBOX_MAX_ATTEMPTS", 5)
+OUTBOX_RETRY_BASE_SECONDS = getattr(settings, "EMAIL_OUTBOX_RETRY_BASE_SECONDS", 30)
+OUTBOX_RETRY_MAX_SECONDS = getattr(settings, "EMAIL_OUTBOX_RETRY_MAX_SECONDS", 60 * 60)
+# How long a claimed message stays reserved before another worker may retake it.
+# The lease is renewed as each message comes up for delivery, so a slow batch
+# never lets another worker reclaim a message this one is about to send.
+OUTBOX_LEASE_SECONDS = getattr(settings, "EMAIL_OUTBOX_LEASE_SECONDS", 5 * 60)
+
+# Process-wide delivery counters (sent, retried, dead, batches).
+metrics = Counter()
+
+
+@dataclass
+class DrainResult:
+    claimed: int = 0
+    sent: int = 0
+    retried: int = 0
+    dead: int = 0
+
+    def __iadd__(self, other):
+        self.claimed += other.claimed
+        self.sent += other.sent
+        self.retried += other.retried
+        self.dead += other.dead
+        return self
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Exponential backoff: base, 2*base, 4*base ... capped at the max."""
+    seconds = OUTBOX_RETRY_BASE_SECONDS * (2 ** max(attempts - 1, 0))
+    return timedelta(seconds=min(seconds, OUTBOX_RETRY_MAX_SECONDS))
+
+
+def claim_batch(batch_size: int = OUTBOX_BATCH_SIZE) -> list:
+    """
+    Reserve up to `batch_size` due messages for this worker.
+    Rows left in "sending" by a crashed worker become claimable again once their lease runs out.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        due = (
+            OutboundEmail.objects
+            .filter(Q(status=OutboundEmail.STATUS_PENDING) | Q(status=OutboundEmail.STATUS_SENDING),
+                    next_attempt_at__lte=now)
+            .order_by("next_attempt_at")
+        )
+        if db_connection.features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True)
+        ids = list(due.values_list("id", flat=True)[:batch_size])
+        OutboundEmail.objects.filter(id__in=ids).update(
+            status=OutboundEmail.STATUS_SENDING,
+            next_attempt_at=now + timedelta(seconds=OUTBOX_LEASE_SECONDS),
+        )
+    return list(OutboundEmail.objects.filter(id__in=ids).order_by("id"))
+
+
+def renew_lease(outbound) -> bool:
+    """
+    Extend this worker's lease on `outbound` right before it is sent.
+    Returns False when the lease already ran out and another worker retook the
+    row (its `next_attempt_at` no longer matches ours), in which case it is theirs to send.
+    """
+    lease_until = timezone.now() + timedelta(seconds=OUTBOX_LEASE_SECONDS)
+    renewed = OutboundEmail.objects.filter(
+        pk=outbound.pk,
+        status=OutboundEmail.STATUS_SENDING,
+        next_attempt_at=outbound.next_attempt_at,
+    ).update(next_attempt_at=lease_until)
+    if renewed:
+        outbound.next_attempt_at = lease_until
+    return bool(renewed)
+
+
+def _record_failure(outbound, error, result: DrainResult) -> None:
+    outbound.attempts += 1
+    outbound.last_error = str(error)
+    if outbound.attempts >= OUTBOX_MAX_ATTEMPTS:
+        outbound.status = OutboundEmail.STATUS_DEAD
+        result.dead += 1
+        metrics["dead"] += 1
+        logger.error("Outbound email %s dead-lettered after %s attempts: %s", outbound.pk, outbound.attempts, error)
+    else:
+        outbound.status = OutboundEmail.STATUS_PENDING
+        outbound.next_attempt_at = timezone.now() + retry_delay(outbound.attempts)
+        result.retried += 1
+        metrics["retried"] += 1
+        logger.warning("Outbound email %s failed (attempt %s), retrying: %s", outbound.pk, outbound.attempts, error)
+    outbound.save(update_fields=["attempts", "last_error", "status", "next_attempt_at"])
+
+
+def drain_batch(batch_size: int = OUTBOX_BATCH_SIZE, connection=None) -> DrainResult:
+    """Claim one batch and deliver it over a single mail connection."""
+    batch = claim_batch(batch_size)
+    result = DrainResult(claimed=len(batch))
+    if not batch:
+        return result
+    metrics["batches"] += 1
+
+    connection = connection or get_connection(fail_silently=False)
+    try:
+        opened = connection.open()
+    except Exception as e:
+        for outbound in batch:
+            _record_failure(outbound, e, result)
+        return result
+
+    try:
+        for outbound in batch:
+            if not renew_lease(outbound):
+                logger.warning("Outbound email %s lease lost to another worker, skipping", outbound.pk)
+                continue
+            try:
+                build_email_message(outbound, connection=connection).send(fail_silently=False)
+            except Exception as e:
+                _record_failure(outbound, e, result)
+                continue
+            outbound.attempts += 1
+            outbound.status = OutboundEmail.STATUS_SENT
+            outbound.sent_at = timezone.now()
+            outbound.last_error = ""
+            outbound.save(update_fields=["attempts", "status", "sent_at", "last_error"])
+            result.sent += 1
+            metrics["sent"] += 1
+    finally:
+        if opened:
+            connection.close()
+    return result
+
+
+def drain_outbox(batch_size: int = OUTBOX_BATCH_SIZE, max_batches: Optional[int] = None, connection=None) -> DrainResult:
+    """Deliver due messages batch by batch until none are left (or `max_batches` is hit)."""
+    total = DrainResult()
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        result = drain_batch(batch_size, connection=connection)
+        total += result
+        batches += 1
+        if result.claimed < batch_size:
+            break
+    return total
@@ -3,6 +3,8 @@ from rest_framework.permissions import BasePermission
 from rest_framework.request import Request
 from rest_framework.views import APIView
 
+from .roles import get_role_snapshot
+
 
 class RolePermission(BasePermission):
     """
@@ -31,19 +33,18 @@ class RolePermission(BasePermission):
         roles = getattr(view, "required_roles")
         return list(roles) if roles is not None else None
 
-    def _user_roles_set(self, user) -> set:
+    def _user_roles_set(self, user) -> frozenset:
         """
         Return the user's roles as a set of role names.
-        Works for both queryset-based roles (ManyToMany)
-        and simple iterable attributes (e.g. ['admin', 'user']).
+        Model users are served from their cached RoleSnapshot (no queries);
+        simple iterable attributes (e.g. ['admin', 'user']) are used as-is.
         """
+        if hasattr(type(user), "role_snapshot"):
+            return get_role_snapshot(user).roles
         roles = getattr(user, "roles", None)
         if not roles:
-            return set()
-        try:
-            return set(roles.values_list("name", flat=True))
-        except Exception:
-            return set(roles)
+            return frozenset()
+        return frozenset(roles)
 
     def has_permission(self, request: Request, view: APIView) -> bool:  # type: ignore[override]
         """
@@ -67,7 +68,7 @@ class RolePermission(BasePermission):
             return False
 
         user_roles = self._user_roles_set(user)
-        required_set = set(required)
+        required_set = frozenset(required)
 
         # If view or class requires all roles, enforce that
         if getattr(view, "require_all_roles", self.require_all_roles):
@@ -84,9 +85,11 @@ def RolePermissionFactory(roles: Iterable[str], require_all: bool = False, allow
     Example:
         permission_classes = [RolePermissionFactory(["admin", "editor"])]
     """
+    required = frozenset(roles)
+
     class _RolePermission(RolePermission):
         def _get_required_roles(self, view):
-            return list(roles)
+            return required
 
     _RolePermission.require_all_roles = require_all
     _RolePermission.allow_staff = allow_staff
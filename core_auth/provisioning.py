@@ -0,0 +1,167 @@
+"""
+Batch user provisioning for IdP syncs (SCIM-style upserts).
+
+Each record is keyed by email and either creates the user or updates the one
+that exists; `"active": false` deactivates. `roles`, when present, replaces the
+user's role assignments. Records are processed in batches: one `email__in`
+lookup, one `username__in` check and one role lookup per batch, then
+bulk_create/bulk_update inside a transaction. New users get an unusable password
+(no hashing); they sign in through SSO or a password reset.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.db import transaction
+from rest_framework import serializers
+
+from core.versioning import USER_SUMMARY_FIELDS, bump_user_workspace_versions
+
+from .models import Role
+from .roles import bump_user_versions
+
+User = get_user_model()
+
+PROVISIONING_BATCH_SIZE = getattr(settings, "PROVISIONING_BATCH_SIZE", 500)
+PROVISIONING_MAX_RECORDS = getattr(settings, "PROVISIONING_MAX_RECORDS", 50_000)
+
+# Profile fields a record may set, in addition to email/active/roles.
+PROFILE_FIELDS = ("username", "first_name", "last_name", "company_name", "plan")
+
+CREATED = "created"
+UPDATED = "updated"
+DEACTIVATED = "deactivated"
+UNCHANGED = "unchanged"
+ERROR = "error"
+
+
+class ProvisionRecordSerializer(serializers.Serializer):
+    email = serializers.EmailField()
+    username = serializers.CharField(max_length=150, required=False, validators=[UnicodeUsernameValidator()])
+    first_name = serializers.CharField(max_length=150, required=False, allow_blank=True)
+    last_name = serializers.CharField(max_length=150, required=False, allow_blank=True)
+    company_name = serializers.CharField(max_length=255, required=False, allow_blank=True, allow_null=True)
+    plan = serializers.CharField(max_length=32, required=False)
+    active = serializers.BooleanField(required=False)
+    # Omitted or null: leave assignments alone. A list (even empty) replaces them.
+    roles = serializers.ListField(child=serializers.CharField(max_length=64), required=False, allow_null=True)
+
+
+def _status(index, email, status, user_id=None, errors=None):
+    result = {"index": index, "email": email, "status": status}
+    if user_id is not None:
+        result["id"] = user_id
+    if errors is not None:
+        result["errors"] = errors
+    return result
+
+
+def _validate(records, offset):
+    """Split a batch into per-record errors and validated data."""
+    child = ProvisionRecordSerializer()
+    errors, valid, seen = {}, [], set()
+    for i, item in enumerate(records):
+        try:
+            data = child.run_validation(item)
+        except serializers.ValidationError as exc:
+            email = item.get("email") if isinstance(item, dict) else None
+            errors[i] = _status(offset + i, email, ERROR, errors=exc.detail)
+            continue
+        data["email"] = User.objects.normalize_email(data["email"])
+        if data["email"] in seen:
+            errors[i] = _status(offset + i, data["email"], ERROR, errors={"email": ["duplicate email in this request"]})
+            continue
+        seen.add(data["email"])
+        valid.append((i, data))
+    return errors, valid
+
+
+def _provision_batch(records, offset):
+    errors, valid = _validate(records, offset)
+
+    existing = {user.email: user for user in User.objects.filter(email__in=[data["email"] for _, data in valid])}
+    role_names = {name for _, data in valid for name in data.get("roles") or ()}
+    role_ids = dict(Role.objects.filter(name__in=role_names).values_list("name", "id")) if role_names else {}
+
+    # Usernames are unique too; catch clashes before bulk_create would fail the whole batch.
+    wanted = {}
+    for i, data in valid:
+        user = existing.get(data["email"])
+        if "username" not in data and user is None:
+            data["username"] = data["email"][:150]
+        if "username" in data:
+            wanted.setdefault(data["username"], []).append((i, user))
+    taken = dict(User.objects.filter(username__in=wanted).values_list("username", "id")) if wanted else {}
+
+    creates, updates, role_sets, results = [], {}, {}, {}
+    for i, data in valid:
+        email = data["email"]
+        user = existing.get(email)
+        record_errors = {}
+        unknown = sorted(set(data.get("roles") or ()) - set(role_ids))
+        if unknown:
+            record_errors["roles"] = [f"unknown role: {name}" for name in unknown]
+        if "username" in data:
+            owner = taken.get(data["username"])
+            claimants = wanted[data["username"]]
+            if (owner is not None and (user is None or owner != user.pk)) or len(claimants) > 1:
+                record_errors["username"] = ["username already in use"]
+        if record_errors:
+            errors[i] = _status(offset + i, email, ERROR, errors=record_errors)
+            continue
+
+        if user is None:
+            user = User(email=email, password=make_password(None), is_active=data.get("active", True),
+                        **{field: data[field] for field in PROFILE_FIELDS if field in data})
+            creates.append((i, user))
+            status = CREATED
+        else:
+            changed = {field for field in PROFILE_FIELDS if field in data and getattr(user, field) != data[field]}
+            for field in changed:
+                setattr(user, field, data[field])
+            status = UPDATED if changed else UNCHANGED
+            if "active" in data and user.is_active != data["active"]:
+                user.is_active = data["active"]
+                changed.add("is_active")
+                status = UPDATED if data["active"] else DEACTIVATED
+            if changed:
+                updates[i] = (user, changed)
+        if data.get("roles") is not None:
+            role_sets[i] = {role_ids[name] for name in data["roles"]}
+        results[i] = (email, status, user)
+
+    if creates or updates or role_sets:
+        with transaction.atomic():
+            if creates:
+                User.objects.bulk_create([user for _, user in creates], batch_size=PROVISIONING_BATCH_SIZE)
+            if updates:
+                fields = sorted(set().union(*(changed for _, changed in updates.values())))
+                User.objects.bulk_update([user for user, _ in updates.values()], fields, batch_size=PROVISIONING_BATCH_SIZE)
+            if role_sets:
+                through = User.roles.through
+                user_ids = [results[i][2].pk for i in role_sets]
+                through.objects.filter(user_id__in=user_ids).delete()
+                through.objects.bulk_create(
+                    [through(user_id=results[i][2].pk, role_id=role_id) for i, ids in role_sets.items() for role_id in ids],
+                    batch_size=PROVISIONING_BATCH_SIZE,
+                )
+            # bulk writes skip the signals that normally invalidate role snapshots
+            # and the versions of the workspace lists that show the user.
+            affected = {user.pk for _, user in creates} | {results[i][2].pk for i in role_sets}
+            if affected:
+                transaction.on_commit(lambda: bump_user_versions(affected))
+            renamed = [user.pk for user, changed in updates.values() if not USER_SUMMARY_FIELDS.isdisjoint(changed)]
+            bump_user_workspace_versions(renamed)
+
+    return [
+        errors[i] if i in errors else _status(offset + i, results[i][0], results[i][1], user_id=results[i][2].pk)
+        for i in range(len(records))
+    ]
+
+
+def provision_users(records, batch_size=PROVISIONING_BATCH_SIZE):
+    """Provision every record now, batch by batch; returns one status dict per record in input order."""
+    results = []
+    for start in range(0, len(records), batch_size):
+        results.extend(_provision_batch(records[start:start + batch_size], start))
+    return results
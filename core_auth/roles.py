@@ -0,0 +1,142 @@
+import time
+from dataclasses import dataclass
+from typing import FrozenSet, Iterable, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+RBAC_CACHE_TIMEOUT = getattr(settings, "RBAC_CACHE_TIMEOUT", 60 * 60)
+
+GLOBAL_VERSION_KEY = "rbac:version"
+
+
+@dataclass(frozen=True)
+class RoleSnapshot:
+    """
+    Compiled view of a user's RBAC state.
+
+    `roles` holds role names and `permissions` holds "app_label.codename" strings
+    granted through `Role.permissions`. Checks against it never touch the database.
+    """
+
+    roles: FrozenSet[str] = frozenset()
+    permissions: FrozenSet[str] = frozenset()
+    version: Tuple[int, int] = (0, 0)
+
+    def has_role(self, role_name: str) -> bool:
+        return role_name in self.roles
+
+    def has_any_role(self, role_names: Iterable[str]) -> bool:
+        return not self.roles.isdisjoint(role_names)
+
+    def has_all_roles(self, role_names: Iterable[str]) -> bool:
+        return self.roles.issuperset(role_names)
+
+    def has_permission(self, perm: str) -> bool:
+        return perm in self.permissions
+
+
+def _cache():
+    """
+    The shared cache named by RBAC_CACHE_ALIAS, or None. Without one, snapshots
+    are computed once per user instance (one query per request) instead:
+    versions held in a per-process cache would let a revoked role outlive its
+    revocation on every other worker (check core_auth.E002).
+    """
+    alias = getattr(settings, "RBAC_CACHE_ALIAS", None)
+    return caches[alias] if alias else None
+
+
+def _user_version_key(user_id) -> str:
+    return f"rbac:version:user:{user_id}"
+
+
+def _snapshot_key(user_id) -> str:
+    return f"rbac:snapshot:{user_id}"
+
+
+def _new_version() -> int:
+    # Time-based so a version evicted from the cache is never handed out again.
+    return time.time_ns()
+
+
+def bump_global_version() -> None:
+    """Invalidate every user's snapshot (role definitions or permissions changed)."""
+    cache = _cache()
+    if cache is not None:
+        cache.set(GLOBAL_VERSION_KEY, _new_version(), None)
+
+
+def bump_user_version(user_id) -> None:
+    """Invalidate a single user's snapshot (their role assignments changed)."""
+    cache = _cache()
+    if cache is not None:
+        cache.set(_user_version_key(user_id), _new_version(), None)
+
+
+def bump_user_versions(user_ids: Iterable) -> None:
+    """bump_user_version() for many users in one cache round trip (bulk role writes)."""
+    cache = _cache()
+    if cache is not None:
+        version = _new_version()
+        cache.set_many({_user_version_key(user_id): version for user_id in user_ids}, None)
+
+
+def _current_versions(cache, values: dict, user_id) -> Tuple[int, int]:
+    versions = []
+    for key in (GLOBAL_VERSION_KEY, _user_version_key(user_id)):
+        version = values.get(key)
+        if version is None:
+            cache.add(key, _new_version(), None)
+            version = cache.get(key)
+        versions.append(version)
+    return tuple(versions)
+
+
+def compute_role_snapshot(user, version=(0, 0)) -> RoleSnapshot:
+    """Build a snapshot from the database in a single query."""
+    roles, permissions = set(), set()
+    rows = user.roles.values_list(
+        "name", "permissions__content_type__app_label", "permissions__codename"
+    )
+    for name, app_label, codename in rows:
+        roles.add(name)
+        if codename:
+            permissions.add(f"{app_label}.{codename}")
+    return RoleSnapshot(frozenset(roles), frozenset(permissions), version)
+
+
+def get_role_snapshot(user) -> RoleSnapshot:
+    """
+    Return the user's RoleSnapshot.
+
+    The snapshot is memoized on the user instance and, with RBAC_CACHE_ALIAS set,
+    cached under a version pair (global, per-user) that the m2m_changed receivers
+    in core_auth.signals bump.
+    """
+    if user is None or not getattr(user, "pk", None):
+        return RoleSnapshot()
+    snapshot = user.__dict__.get("_role_snapshot")
+    if snapshot is not None:
+        return snapshot
+
+    cache = _cache()
+    if cache is None:
+        snapshot = compute_role_snapshot(user)
+        user.__dict__["_role_snapshot"] = snapshot
+        return snapshot
+    snapshot_key = _snapshot_key(user.pk)
+    values = cache.get_many([GLOBAL_VERSION_KEY, _user_version_key(user.pk), snapshot_key])
+    version = _current_versions(cache, values, user.pk)
+    snapshot = values.get(snapshot_key)
+    if snapshot is None or snapshot.version != version:
+        snapshot = compute_role_snapshot(user, version)
+        cache.set(snapshot_key, snapshot, RBAC_CACHE_TIMEOUT)
+    user.__dict__["_role_snapshot"] = snapshot
+    return snapshot
+
+
+def clear_role_snapshot(user) -> None:
+    """Drop the snapshot memoized on a user instance."""
+    user.__dict__.pop("_role_snapshot", None)
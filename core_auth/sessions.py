@@ -0,0 +1,151 @@
+"""
+Session engine: Django's cached_db with an in-process tier in front of the
+shared cache. Settings select it (SESSION_ENGINE = "core_auth.sessions") only
+when SESSION_CACHE_ALIAS names a cache every worker shares (redis, memcached,
+database or file-based); without one they fall back to Django's database
+engine, and a per-process alias such as locmem fails the core_auth.E001 check.
+
+Reads go local tier -> SESSION_CACHE_ALIAS -> django_session. Logout and every
+save reach the shared cache and the database. The local tier only spares the
+shared cache: it holds a pickled copy for SESSION_LOCAL_CACHE_TTL seconds, so a
+worker other than the one that handled a logout can still accept that session
+for at most that long. Set it to 0 to turn the tier off.
+
+A save whose data is identical to what was loaded is skipped entirely (no DB
+or cache write), even if the session was marked modified. clear_expired()
+deletes expired rows in batches, so `clearsessions` and `clear_expired_sessions`
+never hold one huge DELETE.
+
+Every load records its latency under "SessionStore.load" in the request
+metrics (core.instrumentation), split by the tier that answered.
+"""
+import pickle
+import time
+
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+from django.utils import timezone
+
+from core.cache import LRUCache
+from core.instrumentation import metrics, span
+
+SESSION_LOCAL_CACHE_TTL = getattr(settings, "SESSION_LOCAL_CACHE_TTL", 5)
+SESSION_LOCAL_CACHE_MAXSIZE = getattr(settings, "SESSION_LOCAL_CACHE_MAXSIZE", 10_000)
+SESSION_EXPIRY_BATCH_SIZE = getattr(settings, "SESSION_EXPIRY_BATCH_SIZE", 1000)
+
+_local = LRUCache(maxsize=SESSION_LOCAL_CACHE_MAXSIZE, ttl=SESSION_LOCAL_CACHE_TTL)
+
+
+def clear_local_cache():
+    _local.clear()
+
+
+class SessionStore(CachedDBStore):
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        self._loaded_key = None
+        self._loaded_state = None
+
+    # --- loading -----------------------------------------------------------
+
+    def _local_get(self):
+        if not SESSION_LOCAL_CACHE_TTL or not self.session_key:
+            return None
+        state = _local.get(self.session_key)
+        return pickle.loads(state) if state is not None else None
+
+    def _local_set(self, data, state=None):
+        if SESSION_LOCAL_CACHE_TTL and self.session_key:
+            # Expiry comes from `data`: the session itself may not be loaded yet.
+            expiry_age = self.get_expiry_age(expiry=data.get("_session_expiry"))
+            _local.set(self.session_key, state if state is not None else pickle.dumps(data),
+                       min(SESSION_LOCAL_CACHE_TTL, expiry_age))
+
+    def _loaded(self, data, tier, started):
+        state = pickle.dumps(data)
+        self._loaded_key, self._loaded_state = self.session_key, state
+        if tier != "local":
+            self._local_set(data, state)
+        metrics.record("SessionStore.load", {f"{tier}_ms": (time.perf_counter() - started) * 1000})
+        return data
+
+    def load(self):
+        # cached_db.load(), unrolled so the answering tier is known.
+        started = time.perf_counter()
+        with span("session_load"):
+            data = self._local_get()
+            if data is not None:
+                return self._loaded(data, "local", started)
+            try:
+                data = self._cache.get(self.cache_key)
+            except Exception:
+                data = None
+            if data is not None:
+                return self._loaded(data, "cache", started)
+            s = self._get_session_from_db()
+            if s:
+                data = self.decode(s.session_data)
+                self._cache.set(self.cache_key, data, self.get_expiry_age(expiry=s.expire_date))
+            else:
+                data = {}
+            return self._loaded(data, "db", started)
+
+    async def aload(self):
+        started = time.perf_counter()
+        with span("session_load"):
+            data = self._local_get()
+            if data is not None:
+                return self._loaded(data, "local", started)
+            return self._loaded(await super().aload(), "cache_or_db", started)
+
+    # --- saving ------------------------------------------------------------
+
+    def _unchanged(self, must_create):
+        return (
+            not must_create
+            and self._loaded_key is not None
+            and self._loaded_key == self.session_key
+            and pickle.dumps(self._get_session(no_load=True)) == self._loaded_state
+        )
+
+    def save(self, must_create=False):
+        if self._unchanged(must_create):
+            return
+        super().save(must_create)
+        self._loaded_key, self._loaded_state = self.session_key, pickle.dumps(self._session)
+        self._local_set(self._session, self._loaded_state)
+
+    async def asave(self, must_create=False):
+        if self._unchanged(must_create):
+            return
+        await super().asave(must_create)
+        self._loaded_key, self._loaded_state = self.session_key, pickle.dumps(self._session)
+        self._local_set(self._session, self._loaded_state)
+
+    # --- deleting ----------------------------------------------------------
+
+    def delete(self, session_key=None):
+        _local.delete(session_key or self.session_key)
+        super().delete(session_key)
+
+    async def adelete(self, session_key=None):
+        _local.delete(session_key or self.session_key)
+        await super().adelete(session_key)
+
+    @classmethod
+    def clear_expired(cls, batch_size=SESSION_EXPIRY_BATCH_SIZE, max_batches=None):
+        """Delete expired sessions `batch_size` rows at a time; returns the number deleted."""
+        model = cls.get_model_class()
+        now = timezone.now()
+        deleted = batches = 0
+        while max_batches is None or batches < max_batches:
+            keys = list(
+                model.objects.filter(expire_date__lt=now).values_list("session_key", flat=True)[:batch_size]
+            )
+            if not keys:
+                break
+            deleted += model.objects.filter(session_key__in=keys).delete()[0]
+            batches += 1
+            if len(keys) < batch_size:
+                break
+        return deleted
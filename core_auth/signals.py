@@ -0,0 +1,41 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Role, User
+from .roles import bump_global_version, bump_user_version, clear_role_snapshot
+
+
+@receiver(m2m_changed, sender=User.roles.through)
+def user_roles_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        # user.roles.add(...) and friends: only this user is affected.
+        bump_user_version(instance.pk)
+        clear_role_snapshot(instance)
+    elif pk_set:
+        # role.users.add(...): bump each affected user.
+        for user_id in pk_set:
+            bump_user_version(user_id)
+    else:
+        # role.users.clear(): the affected users aren't known any more.
+        bump_global_version()
+
+
+@receiver(m2m_changed, sender=Role.permissions.through)
+def role_permissions_changed(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        bump_global_version()
+
+
+@receiver(post_save, sender=Role)
+@receiver(post_delete, sender=Role)
+def role_changed(sender, **kwargs):
+    bump_global_version()
+
+
+@receiver(post_save, sender=User)
+def user_created(sender, instance, created, **kwargs):
+    # Never let a new account inherit a snapshot cached under a recycled pk.
+    if created:
+        bump_user_version(instance.pk)
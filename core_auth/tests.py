@@ -1,3 +1,374 @@
-from django.test import TestCase
+import pytest
+from types import SimpleNamespace
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from core_auth.models import Role
+from core_auth.permissions import RolePermission, RolePermissionFactory
 
-# Create your tests here.
+User = get_user_model()
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from django.core.cache import cache
+    from core_auth.sessions import clear_local_cache
+    cache.clear()
+    clear_local_cache()
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(username='user1', email='user1@example.com', password='pass')
+
+@pytest.fixture
+def editor_role(db):
+    role = Role.objects.create(name='editor')
+    role.permissions.add(Permission.objects.get(codename='view_role'))
+    return role
+
+def test_role_snapshot_is_cached(user, editor_role, settings, django_assert_num_queries):
+    user.roles.add(editor_role)
+    # Without a shared cache every user instance computes its own snapshot, once.
+    fresh = User.objects.get(pk=user.pk)
+    with django_assert_num_queries(1):
+        assert fresh.has_any_role('admin', 'editor')
+        assert fresh.has_role_permission('core_auth.view_role')
+    settings.RBAC_CACHE_ALIAS = 'default'
+    assert User.objects.get(pk=user.pk).has_role('editor')
+    fresh = User.objects.get(pk=user.pk)
+    with django_assert_num_queries(0):
+        assert fresh.has_any_role('admin', 'editor')
+        assert not fresh.has_role('admin')
+
+@pytest.mark.parametrize('alias', [None, 'default'])
+def test_role_snapshot_invalidated_on_m2m_change(user, editor_role, settings, alias):
+    settings.RBAC_CACHE_ALIAS = alias
+    assert not User.objects.get(pk=user.pk).has_role('editor')
+    editor_role.users.add(user)
+    assert User.objects.get(pk=user.pk).has_role('editor')
+    editor_role.permissions.clear()
+    assert not User.objects.get(pk=user.pk).has_role_permission('core_auth.view_role')
+
+def test_role_permission_uses_snapshot(user, editor_role, django_assert_num_queries):
+    user.roles.add(editor_role)
+    user = User.objects.get(pk=user.pk)
+    request = SimpleNamespace(user=user)
+    view = SimpleNamespace(required_roles=['editor'])
+    user.role_snapshot
+    with django_assert_num_queries(0):
+        assert RolePermission().has_permission(request, view)
+        assert not RolePermissionFactory(['admin'])().has_permission(request, view)
+
+class FailingEmailBackend:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def open(self):
+        return False
+
+    def close(self):
+        pass
+
+    def send_messages(self, messages):
+        raise ConnectionError('smtp down')
+
+def test_send_email_only_enqueues(db, mailoutbox):
+    from core_auth.email_utils import send_email
+    from core_auth.models import OutboundEmail
+    assert send_email(subject='Hi', to=['a@example.com'], body_text='hello')
+    assert mailoutbox == []
+    assert OutboundEmail.objects.get().status == OutboundEmail.STATUS_PENDING
+
+def test_outbox_worker_delivers_batch(db, mailoutbox):
+    from core_auth.email_utils import send_email
+    from core_auth.models import OutboundEmail
+    from core_auth.outbox import drain_outbox
+    for i in range(3):
+        send_email(subject=f'Msg {i}', to=[f'u{i}@example.com'], body_html='<p>hi</p>',
+                   attachments=[('a.txt', 'data', 'text/plain')])
+    result = drain_outbox(batch_size=2)
+    assert (result.claimed, result.sent) == (3, 3)
+    assert len(mailoutbox) == 3
+    assert mailoutbox[0].attachments[0][0] == 'a.txt'
+    assert not OutboundEmail.objects.exclude(status=OutboundEmail.STATUS_SENT).exists()
+
+def test_outbox_worker_retries_then_dead_letters(db):
+    from core_auth import outbox
+    from core_auth.email_utils import send_email
+    from core_auth.models import OutboundEmail
+    send_email(subject='Hi', to=['a@example.com'], body_text='hello')
+    result = outbox.drain_outbox(connection=FailingEmailBackend())
+    msg = OutboundEmail.objects.get()
+    assert result.retried == 1
+    assert msg.status == OutboundEmail.STATUS_PENDING and msg.attempts == 1
+    for _ in range(outbox.OUTBOX_MAX_ATTEMPTS - 1):
+        OutboundEmail.objects.update(next_attempt_at=msg.created_at)
+        outbox.drain_outbox(connection=FailingEmailBackend())
+    msg.refresh_from_db()
+    assert msg.status == OutboundEmail.STATUS_DEAD
+    assert 'smtp down' in msg.last_error
+
+def test_outbox_worker_skips_message_retaken_by_another_worker(db, mailoutbox, monkeypatch):
+    from core_auth import outbox
+    from core_auth.email_utils import send_email
+    from core_auth.models import OutboundEmail
+    send_email(subject='Hi', to=['a@example.com'], body_text='hello')
+    claim_batch = outbox.claim_batch
+
+    def claim_then_expire(batch_size):
+        batch = claim_batch(batch_size)
+        # Our lease ran out mid-batch and a second worker claimed the row.
+        OutboundEmail.objects.update(next_attempt_at=batch[0].created_at)
+        return batch
+
+    monkeypatch.setattr(outbox, 'claim_batch', claim_then_expire)
+    result = outbox.drain_outbox()
+    assert (result.claimed, result.sent) == (1, 0)
+    assert mailoutbox == []
+    assert OutboundEmail.objects.get().status == OutboundEmail.STATUS_SENDING
+
+@pytest.fixture
+def login_url():
+    from django.urls import reverse
+    return reverse('core_auth:login')
+
+def test_login_rehashes_legacy_password(user, login_url):
+    from rest_framework.test import APIClient
+    from django.contrib.auth.hashers import make_password
+    User.objects.filter(pk=user.pk).update(password=make_password('pass', hasher='pbkdf2_sha256'))
+    resp = APIClient().post(login_url, {'email': user.email, 'password': 'pass'}, format='json')
+    assert resp.status_code == 200
+    user.refresh_from_db()
+    assert user.password.startswith('argon2$')
+
+def test_login_throttled_before_hashing(user, login_url, monkeypatch):
+    from rest_framework.test import APIClient
+    from core_auth.throttling import LoginEmailRateThrottle
+    monkeypatch.setattr(LoginEmailRateThrottle, 'rate', '2/min', raising=False)
+    client = APIClient()
+    for _ in range(2):
+        resp = client.post(login_url, {'email': user.email, 'password': 'wrong'}, format='json')
+        assert resp.status_code == 401
+    calls = []
+    monkeypatch.setattr(User, 'check_password', lambda self, raw: calls.append(raw))
+    resp = client.post(login_url, {'email': user.email.upper(), 'password': 'pass'}, format='json')
+    assert resp.status_code == 429
+    assert calls == []
+
+@pytest.mark.parametrize('num_proxies, expected', [(0, '10.0.0.9'), (1, '198.51.100.2'), (5, '203.0.113.1')])
+def test_client_ip_ignores_untrusted_forwarded_hops(rf, settings, num_proxies, expected):
+    from core_auth.utils import get_client_ip
+    settings.REST_FRAMEWORK = {**settings.REST_FRAMEWORK, 'NUM_PROXIES': num_proxies}
+    request = rf.get('/', HTTP_X_FORWARDED_FOR='203.0.113.1, 198.51.100.2', REMOTE_ADDR='10.0.0.9')
+    assert get_client_ip(request) == expected
+
+def test_token_auth_skips_session_and_user_queries(user, editor_role, django_assert_num_queries):
+    from rest_framework.test import APIClient
+    from django.urls import reverse
+    from core_auth.authentication import SignedTokenAuthentication
+    from core_auth.permissions import RolePermission
+    user.roles.add(editor_role)
+    client = APIClient()
+    tokens = client.post(reverse('core_auth:token-obtain'), {'email': user.email, 'password': 'pass'}, format='json').data
+    request = SimpleNamespace(META={'HTTP_AUTHORIZATION': f"Bearer {tokens['access']}"})
+    # Only the revocation lookup; no session or user row.
+    with django_assert_num_queries(1):
+        token_user, claims = SignedTokenAuthentication().authenticate(request)
+        assert token_user.pk == user.pk and token_user.plan == 'free'
+        assert RolePermission().has_permission(SimpleNamespace(user=token_user), SimpleNamespace(required_roles=['editor']))
+    assert token_user.username == 'user1'  # deferred field, loaded on demand
+
+def test_inactive_user_gets_no_token(user, login_url):
+    import jwt
+    from django.urls import reverse
+    from rest_framework import exceptions
+    from rest_framework.test import APIClient
+    from core_auth.authentication import SignedTokenAuthentication
+    from core_auth.tokens import _encode, _signing_key, ACCESS, JWT_ALGORITHM
+    User.objects.filter(pk=user.pk).update(is_active=False)
+    client = APIClient()
+    for url in (reverse('core_auth:token-obtain'), login_url):
+        assert client.post(url, {'email': user.email, 'password': 'pass'}, format='json').status_code == 401
+    user.refresh_from_db()
+    claims = jwt.decode(_encode(user, ACCESS, 60), _signing_key(), algorithms=[JWT_ALGORITHM])
+    assert claims['active'] is False
+    request = SimpleNamespace(META={'HTTP_AUTHORIZATION': f"Bearer {_encode(user, ACCESS, 60)}"})
+    with pytest.raises(exceptions.AuthenticationFailed):
+        SignedTokenAuthentication().authenticate(request)
+
+def test_token_refresh_rotates_and_revokes(user):
+    from rest_framework.test import APIClient
+    from django.urls import reverse
+    client = APIClient()
+    tokens = client.post(reverse('core_auth:token-obtain'), {'email': user.email, 'password': 'pass'}, format='json').data
+    refreshed = client.post(reverse('core_auth:token-refresh'), {'refresh': tokens['refresh']}, format='json')
+    assert refreshed.status_code == 200
+    reused = client.post(reverse('core_auth:token-refresh'), {'refresh': tokens['refresh']}, format='json')
+    assert reused.status_code == 401
+
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {refreshed.data['access']}")
+    assert client.post(reverse('core_auth:logout')).status_code == 200
+    resp = client.post(reverse('core_auth:token-revoke'), {'refresh': refreshed.data['refresh']}, format='json')
+    assert resp.status_code == 200
+    assert client.post(reverse('core_auth:logout')).status_code == 403
+
+def test_token_refresh_replay_loses_to_rotation(user, monkeypatch):
+    from rest_framework.test import APIClient
+    from django.urls import reverse
+    from core_auth.tokens import revocation_list
+    client = APIClient()
+    tokens = client.post(reverse('core_auth:token-obtain'), {'email': user.email, 'password': 'pass'}, format='json').data
+    assert client.post(reverse('core_auth:token-refresh'), {'refresh': tokens['refresh']}, format='json').status_code == 200
+    # A replay racing the rotation has passed the revocation check already.
+    monkeypatch.setattr(revocation_list, 'is_revoked', lambda jti: False)
+    replayed = client.post(reverse('core_auth:token-refresh'), {'refresh': tokens['refresh']}, format='json')
+    assert replayed.status_code == 401
+    assert 'access' not in replayed.data
+
+def test_revocations_outlive_nothing_but_the_token(db):
+    import time
+    from core_auth.models import RevokedToken
+    from core_auth.tokens import RevocationList
+    revoked = RevocationList()
+    now = time.time()
+    for jti in range(5):
+        revoked.revoke(f'live{jti}', now + 30)
+    revoked.revoke('expired', now - 1)
+    revoked.revoke('live0', now + 30)
+    assert RevokedToken.objects.count() == 5
+    assert all(revoked.is_revoked(f'live{jti}') for jti in range(5))
+    assert not revoked.is_revoked('expired')
+    RevokedToken.objects.filter(jti='live0').update(expires_at=RevokedToken.objects.get(jti='live0').revoked_at)
+    assert revoked.purge_expired(batch_size=1) == 1
+    assert set(RevokedToken.objects.values_list('jti', flat=True)) == {f'live{jti}' for jti in range(1, 5)}
+
+def _provision(client, records):
+    import json
+    from django.urls import reverse
+    resp = client.post(reverse('core_auth:user-bulk-provision'), records, format='json')
+    assert resp.status_code == 200, resp.content
+    return [json.loads(line) for line in b''.join(resp.streaming_content).splitlines()]
+
+def test_bulk_provisioning_creates_updates_and_deactivates(user, editor_role, django_assert_max_num_queries,
+                                                           django_capture_on_commit_callbacks):
+    from rest_framework.test import APIClient
+    admin = User.objects.create_user(username='admin', email='admin@example.com', password='pass', is_staff=True)
+    User.objects.create_user(username='taken', email='taken@example.com', password='pass')
+    client = APIClient()
+    client.force_authenticate(admin)
+    assert not User.objects.get(pk=user.pk).has_role('editor')
+
+    records = [
+        {'email': 'new1@example.com', 'first_name': 'New', 'roles': ['editor']},
+        {'email': 'new2@example.com', 'username': 'new-two'},
+        {'email': 'user1@example.com', 'last_name': 'Renamed', 'roles': ['editor']},
+        {'email': 'taken@example.com', 'active': False},
+        {'email': 'new3@example.com', 'roles': ['nope']},
+        {'email': 'new4@example.com', 'username': 'taken'},
+        {'email': 'not-an-email'},
+        {'email': 'new1@example.com'},
+    ]
+    # user lookup, username check, role lookup, savepoint, inserts/updates, role rows
+    with django_assert_max_num_queries(12), django_capture_on_commit_callbacks(execute=True):
+        results = _provision(client, records)
+    assert [r['status'] for r in results] == [
+        'created', 'created', 'updated', 'deactivated', 'error', 'error', 'error', 'error',
+    ]
+    assert [r['index'] for r in results] == list(range(len(records)))
+
+    new1 = User.objects.get(email='new1@example.com')
+    assert not new1.has_usable_password()
+    assert new1.username == 'new1@example.com' and new1.first_name == 'New'
+    assert new1.has_role('editor')
+    assert User.objects.get(pk=user.pk).has_role('editor')  # snapshot invalidated
+    assert User.objects.get(pk=user.pk).last_name == 'Renamed'
+    assert not User.objects.get(email='taken@example.com').is_active
+    assert not User.objects.filter(email__in=['new3@example.com', 'new4@example.com']).exists()
+
+    assert _provision(client, [{'email': 'new2@example.com', 'username': 'new-two'}])[0]['status'] == 'unchanged'
+
+def test_bulk_provisioning_commits_before_streaming(db):
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+    admin = User.objects.create_user(username='admin', email='admin@example.com', password='pass', is_staff=True)
+    client = APIClient()
+    client.force_authenticate(admin)
+    resp = client.post(reverse('core_auth:user-bulk-provision'), [{'email': 'new1@example.com'}], format='json')
+    # The stream is never read, as when the client goes away.
+    assert resp.status_code == 200
+    assert User.objects.filter(email='new1@example.com').exists()
+
+def test_bulk_provisioning_requires_staff(user):
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+    client = APIClient()
+    client.force_authenticate(user)
+    assert client.post(reverse('core_auth:user-bulk-provision'), [], format='json').status_code == 403
+
+
+def test_session_store_tiers_and_skipped_writes(db, settings, django_assert_num_queries):
+    from django.core.cache import cache
+    from core.instrumentation import metrics
+    from core_auth.sessions import SessionStore, clear_local_cache
+    settings.SESSION_CACHE_ALIAS = 'default'
+    metrics.clear()
+    session = SessionStore()
+    session['cart'] = [1, 2]
+    session.save()
+    key = session.session_key
+
+    with django_assert_num_queries(0):
+        assert SessionStore(key)['cart'] == [1, 2]  # local tier
+    clear_local_cache()
+    with django_assert_num_queries(0):
+        assert SessionStore(key)['cart'] == [1, 2]  # shared cache
+    clear_local_cache()
+    cache.clear()
+    with django_assert_num_queries(1):
+        assert SessionStore(key)['cart'] == [1, 2]  # django_session
+    assert set(metrics.snapshot()['SessionStore.load']) == {'local_ms', 'cache_ms', 'db_ms'}
+
+    # Rewriting identical data is a no-op; a real change is written.
+    session = SessionStore(key)
+    session['cart'] = [1, 2]
+    with django_assert_num_queries(0):
+        session.save()
+    session['cart'] = [3]
+    session.save()
+    clear_local_cache()
+    cache.clear()
+    assert SessionStore(key)['cart'] == [3]
+
+def test_session_engine_requires_shared_cache(settings, tmp_path):
+    from core_auth.checks import check_session_cache
+    settings.SESSION_ENGINE = 'core_auth.sessions'
+    settings.SESSION_CACHE_ALIAS = 'default'  # locmem: one worker only
+    assert [error.id for error in check_session_cache(None)] == ['core_auth.E001']
+    settings.CACHES = {**settings.CACHES, 'sessions': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': str(tmp_path),
+    }}
+    settings.SESSION_CACHE_ALIAS = 'sessions'
+    assert check_session_cache(None) == []
+
+def test_rbac_cache_must_be_shared(settings, tmp_path):
+    from core_auth.checks import check_rbac_cache
+    settings.RBAC_CACHE_ALIAS = None
+    assert check_rbac_cache(None) == []
+    settings.RBAC_CACHE_ALIAS = 'default'  # locmem: one worker only
+    assert [error.id for error in check_rbac_cache(None)] == ['core_auth.E002']
+    settings.CACHES = {**settings.CACHES, 'rbac': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': str(tmp_path),
+    }}
+    settings.RBAC_CACHE_ALIAS = 'rbac'
+    assert check_rbac_cache(None) == []
+
+def test_clear_expired_sessions_in_batches(db):
+    from datetime import timedelta
+    from django.contrib.sessions.models import Session
+    from django.core.management import call_command
+    from django.utils import timezone
+    now = timezone.now()
+    Session.objects.bulk_create(
+        [Session(session_key=f'expired{i}', session_data='', expire_date=now - timedelta(days=1)) for i in range(5)]
+        + [Session(session_key='live', session_data='', expire_date=now + timedelta(days=1))]
+    )
+    call_command('clear_expired_sessions', '--batch-size', '2')
+    assert list(Session.objects.values_list('session_key', flat=True)) == ['live']
@@ -0,0 +1,22 @@
+from rest_framework.throttling import SimpleRateThrottle
+
+from .utils import get_client_ip
+
+
+class LoginIPRateThrottle(SimpleRateThrottle):
+    """Sliding-window limit on login attempts per client IP."""
+    scope = "login_ip"
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {"scope": self.scope, "ident": get_client_ip(request)}
+
+
+class LoginEmailRateThrottle(SimpleRateThrottle):
+    """Sliding-window limit on login attempts per target account, whatever the source IP."""
+    scope = "login_email"
+
+    def get_cache_key(self, request, view):
+        email = request.data.get("email") if hasattr(request.data, "get") else None
+        if not email:
+            return None
+        return self.cache_format % {"scope": self.scope, "ident": str(email).strip().lower()}
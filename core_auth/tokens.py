@@ -1,3 +1,153 @@
+import time
+import uuid
+from datetime import datetime, timezone as dt_timezone
+
+import jwt
+from django.conf import settings
 from django.contrib.auth.tokens import PasswordResetTokenGenerator
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import RevokedToken
+from .roles import get_role_snapshot
 
 email_verification_token = PasswordResetTokenGenerator()
+
+JWT_ALGORITHM = getattr(settings, "JWT_ALGORITHM", "HS256")
+JWT_ACCESS_TTL = getattr(settings, "JWT_ACCESS_TTL", 5 * 60)
+JWT_REFRESH_TTL = getattr(settings, "JWT_REFRESH_TTL", 7 * 24 * 60 * 60)
+JWT_REVOCATION_PURGE_BATCH_SIZE = getattr(settings, "JWT_REVOCATION_PURGE_BATCH_SIZE", 1000)
+
+ACCESS = "access"
+REFRESH = "refresh"
+
+
+class InvalidToken(Exception):
+    pass
+
+
+def _signing_key() -> str:
+    return getattr(settings, "JWT_SIGNING_KEY", None) or settings.SECRET_KEY
+
+
+class RevocationList:
+    """
+    Revoked token ids, stored in the RevokedToken table so every process sees
+    them. A revocation lasts until the token would have expired anyway;
+    purge_expired() removes it after that and never sooner.
+    """
+
+    def revoke(self, jti: str, exp: float) -> None:
+        expires_at = datetime.fromtimestamp(exp, tz=dt_timezone.utc)
+        if expires_at <= timezone.now():
+            return
+        RevokedToken.objects.bulk_create([RevokedToken(jti=jti, expires_at=expires_at)], ignore_conflicts=True)
+
+    def revoke_once(self, jti: str, exp: float) -> bool:
+        """
+        Revoke `jti`; returns False when it was already revoked. The insert on
+        the primary key is the gate, so of two concurrent calls only one wins.
+        """
+        try:
+            with transaction.atomic():
+                RevokedToken.objects.create(jti=jti, expires_at=datetime.fromtimestamp(exp, tz=dt_timezone.utc))
+        except IntegrityError:
+            return False
+        return True
+
+    def is_revoked(self, jti: str) -> bool:
+        # Expired tokens never get this far (decode checks exp), so any row counts.
+        return RevokedToken.objects.filter(jti=jti).exists()
+
+    async def ais_revoked(self, jti: str) -> bool:
+        return await RevokedToken.objects.filter(jti=jti).aexists()
+
+    def purge_expired(self, batch_size: int = JWT_REVOCATION_PURGE_BATCH_SIZE, max_batches=None) -> int:
+        """Delete revocations of tokens that have expired, `batch_size` rows at a time."""
+        now = timezone.now()
+        deleted = batches = 0
+        while max_batches is None or batches < max_batches:
+            jtis = list(RevokedToken.objects.filter(expires_at__lt=now).values_list("jti", flat=True)[:batch_size])
+            if not jtis:
+                break
+            deleted += RevokedToken.objects.filter(jti__in=jtis).delete()[0]
+            batches += 1
+            if len(jtis) < batch_size:
+                break
+        return deleted
+
+
+revocation_list = RevocationList()
+
+
+def _encode(user, token_type: str, ttl: int) -> str:
+    now = int(time.time())
+    claims = {
+        "sub": str(user.pk),
+        "type": token_type,
+        "jti": uuid.uuid4().hex,
+        "iat": now,
+        "exp": now + ttl,
+    }
+    if token_type == ACCESS:
+        snapshot = get_role_snapshot(user)
+        claims.update(
+            email=user.email,
+            plan=user.plan,
+            active=user.is_active,
+            staff=user.is_staff,
+            superuser=user.is_superuser,
+            roles=sorted(snapshot.roles),
+            perms=sorted(snapshot.permissions),
+        )
+    return jwt.encode(claims, _signing_key(), algorithm=JWT_ALGORITHM)
+
+
+def issue_token_pair(user) -> dict:
+    return {
+        "access": _encode(user, ACCESS, JWT_ACCESS_TTL),
+        "refresh": _encode(user, REFRESH, JWT_REFRESH_TTL),
+        "expires_in": JWT_ACCESS_TTL,
+    }
+
+
+def _verify(token: str, token_type: str) -> dict:
+    """Signature, expiry and type; everything decode_token() checks short of the database."""
+    try:
+        claims = jwt.decode(
+            token,
+            _signing_key(),
+            algorithms=[JWT_ALGORITHM],
+            options={"require": ["sub", "exp", "iat", "jti"]},
+        )
+    except jwt.PyJWTError as e:
+        raise InvalidToken(str(e))
+    if claims.get("type") != token_type:
+        raise InvalidToken(f"expected a {token_type} token")
+    return claims
+
+
+def decode_token(token: str, token_type: str = ACCESS) -> dict:
+    """Verify signature, expiry, type and revocation; return the claims."""
+    claims = _verify(token, token_type)
+    if revocation_list.is_revoked(claims["jti"]):
+        raise InvalidToken("token has been revoked")
+    return claims
+
+
+async def adecode_token(token: str, token_type: str = ACCESS) -> dict:
+    """Async counterpart of decode_token()."""
+    claims = _verify(token, token_type)
+    if await revocation_list.ais_revoked(claims["jti"]):
+        raise InvalidToken("token has been revoked")
+    return claims
+
+
+def revoke_token(claims: dict) -> None:
+    revocation_list.revoke(claims["jti"], claims["exp"])
+
+
+def consume_token(claims: dict) -> None:
+    """Revoke a single-use token, raising InvalidToken if it has been used already."""
+    if not revocation_list.revoke_once(claims["jti"], claims["exp"]):
+        raise InvalidToken("token has been revoked")
@@ -1,5 +1,7 @@
 from django.urls import path
 from .views.auth import RegisterView, LoginView, LogoutView, get_csrf_token
+from .views.tokens import TokenObtainView, TokenRefreshView, TokenRevokeView
+from .views.provisioning import BulkProvisionView
 
 from .views.password import (
     SendVerificationEmailView,
@@ -17,6 +19,12 @@ urlpatterns = [
     path("logout/", LogoutView.as_view(), name="logout"),
     path("crsf/", get_csrf_token, name="crsf"),
 
+    path("token/", TokenObtainView.as_view(), name="token-obtain"),
+    path("token/refresh/", TokenRefreshView.as_view(), name="token-refresh"),
+    path("token/revoke/", TokenRevokeView.as_view(), name="token-revoke"),
+
+    path("users/bulk/", BulkProvisionView.as_view(), name="user-bulk-provision"),
+
     path("email/send/", SendVerificationEmailView.as_view(), name="send-verification"),
     path("email/verify/", VerifyEmailView.as_view(), name="verify-email"),
     path("password/reset/", RequestPasswordResetView.as_view(), name="password-reset"),
@@ -5,6 +5,7 @@ from django.utils.http import urlsafe_base64_encode
 from django.utils.encoding import force_bytes
 from django.contrib.auth.tokens import PasswordResetTokenGenerator
 from django.urls import reverse
+from rest_framework.settings import api_settings
 
 from django.contrib.auth import get_user_model
 
@@ -48,3 +49,17 @@ def send_password_reset_email(user: User, request):
         from_email=settings.DEFAULT_FROM_EMAIL,
         to=[user.email],
     )
+
+def get_client_ip(request):
+    """
+    REMOTE_ADDR, or with REST_FRAMEWORK["NUM_PROXIES"] trusted proxies in front,
+    the X-Forwarded-For hop the outermost of them saw. Anything left of that is
+    client-supplied and never trusted.
+    """
+    remote_addr = request.META.get("REMOTE_ADDR")
+    num_proxies = api_settings.NUM_PROXIES or 0
+    xff = request.META.get("HTTP_X_FORWARDED_FOR")
+    if num_proxies and xff:
+        hops = [hop.strip() for hop in xff.split(",")]
+        return hops[-min(num_proxies, len(hops))]
+    return remote_addr
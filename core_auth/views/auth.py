@@ -1,7 +1,10 @@
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from django.contrib.auth import login, logout, authenticate
+from core.instrumentation import InstrumentedViewMixin
 from core_auth.serializers import RegisterSerializer, LoginSerializer
+from core_auth.throttling import LoginEmailRateThrottle, LoginIPRateThrottle
+from core_auth.utils import get_client_ip  # noqa: F401  (kept importable from here)
 
 from rest_framework.views import APIView
 
@@ -12,23 +15,16 @@ from django.http import JsonResponse
 def get_csrf_token(request):
     return JsonResponse({"detail": "CSRF cookie set"})
 
-def get_client_ip(request):
-    xff = request.META.get("HTTP_X_FORWARDED_FOR")
-    if xff:
-        ip = xff.split(",")[0].strip()
-    else:
-        ip = request.META.get("REMOTE_ADDR")
-    return ip
 
-
-
-class RegisterView(generics.CreateAPIView):
+class RegisterView(InstrumentedViewMixin, generics.CreateAPIView):
     serializer_class = RegisterSerializer
     permission_classes = [permissions.AllowAny]
 
-class LoginView(generics.GenericAPIView):
+class LoginView(InstrumentedViewMixin, generics.GenericAPIView):
     serializer_class = LoginSerializer
     permission_classes = [permissions.AllowAny]
+    # Throttles run in initial(), so rejected attempts never reach password hashing.
+    throttle_classes = [LoginIPRateThrottle, LoginEmailRateThrottle]
 
     def post(self, request):
         serializer = self.get_serializer(data=request.data)
@@ -40,7 +36,7 @@ class LoginView(generics.GenericAPIView):
         login(request, user)
         return Response({"detail": "Logged in successfully"})
 
-class LogoutView(APIView):
+class LogoutView(InstrumentedViewMixin, APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request):
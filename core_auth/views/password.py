@@ -4,6 +4,7 @@ from django.contrib.auth.tokens import PasswordResetTokenGenerator
 from rest_framework import permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from core.instrumentation import InstrumentedViewMixin
 from core_auth.mixins import CSRFExemptMixin
 
 from django.contrib.auth import get_user_model
@@ -16,7 +17,7 @@ from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
 
 
-class SendVerificationEmailView( APIView):
+class SendVerificationEmailView(InstrumentedViewMixin, APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request):
@@ -27,7 +28,7 @@ class SendVerificationEmailView( APIView):
         return Response({"detail": "Verification email sent"})
 
 
-class VerifyEmailView(CSRFExemptMixin, APIView):
+class VerifyEmailView(InstrumentedViewMixin, CSRFExemptMixin, APIView):
     permission_classes = [permissions.AllowAny]
 
     def get(self, request):
@@ -40,7 +41,7 @@ class VerifyEmailView(CSRFExemptMixin, APIView):
         return Response({"detail": "Email verified"})
 
 
-class RequestPasswordResetView(CSRFExemptMixin, APIView):
+class RequestPasswordResetView(InstrumentedViewMixin, CSRFExemptMixin, APIView):
     permission_classes = [permissions.AllowAny]
 
     def post(self, request):
@@ -53,7 +54,7 @@ class RequestPasswordResetView(CSRFExemptMixin, APIView):
         return Response({"detail": "If that email exists, password reset link has been sent."})
 
 
-class PasswordResetConfirmView(CSRFExemptMixin, APIView):
+class PasswordResetConfirmView(InstrumentedViewMixin, CSRFExemptMixin, APIView):
     permission_classes = [permissions.AllowAny]
 
     def post(self, request):
@@ -0,0 +1,30 @@
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core.instrumentation import InstrumentedViewMixin
+from core.streaming import ndjson_response
+from core_auth.provisioning import PROVISIONING_MAX_RECORDS, provision_users
+
+
+class BulkProvisionView(InstrumentedViewMixin, APIView):
+    """
+    POST a list of user records (or {"records": [...]}) to create, update or
+    deactivate users. Every batch is committed before the response starts; it
+    then streams one NDJSON status line per record, in input order.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def post(self, request):
+        records = request.data.get("records") if isinstance(request.data, dict) else request.data
+        if not isinstance(records, list):
+            return Response({"detail": "expected a list of user records"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(records) > PROVISIONING_MAX_RECORDS:
+            return Response(
+                {"detail": f"at most {PROVISIONING_MAX_RECORDS} records per request"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        # All writes finish here, so a client that disconnects mid-stream cannot
+        # leave a partial import behind; only the results are streamed.
+        results = provision_users(records)
+        return ndjson_response(results)
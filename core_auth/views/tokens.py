@@ -0,0 +1,73 @@
+from django.contrib.auth import authenticate, get_user_model
+from rest_framework import generics, permissions, serializers, status
+from rest_framework.response import Response
+
+from core.instrumentation import InstrumentedViewMixin, TimedSerializerMixin
+from core_auth.serializers import LoginSerializer
+from core_auth.throttling import LoginEmailRateThrottle, LoginIPRateThrottle
+from core_auth.tokens import ACCESS, REFRESH, InvalidToken, consume_token, decode_token, issue_token_pair, revoke_token
+
+User = get_user_model()
+
+
+class RefreshSerializer(TimedSerializerMixin, serializers.Serializer):
+    refresh = serializers.CharField()
+
+
+class TokenObtainView(InstrumentedViewMixin, generics.GenericAPIView):
+    serializer_class = LoginSerializer
+    permission_classes = [permissions.AllowAny]
+    authentication_classes = []
+    throttle_classes = [LoginIPRateThrottle, LoginEmailRateThrottle]
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        user = authenticate(email=serializer.validated_data['email'],
+                            password=serializer.validated_data['password'])
+        if not user:
+            return Response({"detail": "Invalid credentials"}, status=status.HTTP_401_UNAUTHORIZED)
+        return Response(issue_token_pair(user))
+
+
+class TokenRefreshView(InstrumentedViewMixin, generics.GenericAPIView):
+    """Exchange a refresh token for a new pair; the old refresh token is revoked (rotation)."""
+    serializer_class = RefreshSerializer
+    permission_classes = [permissions.AllowAny]
+    authentication_classes = []
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            claims = decode_token(serializer.validated_data['refresh'], REFRESH)
+        except InvalidToken as e:
+            return Response({"detail": f"Invalid token: {e}"}, status=status.HTTP_401_UNAUTHORIZED)
+        # Reload the user so plan, roles and deactivation are picked up on refresh.
+        user = User.objects.filter(pk=claims['sub'], is_active=True).first()
+        if user is None:
+            return Response({"detail": "Invalid token: user inactive"}, status=status.HTTP_401_UNAUTHORIZED)
+        # decode_token() only saw that the token was not revoked yet; a concurrent
+        # replay may have passed the same check, so the revoking insert decides.
+        try:
+            consume_token(claims)
+        except InvalidToken as e:
+            return Response({"detail": f"Invalid token: {e}"}, status=status.HTTP_401_UNAUTHORIZED)
+        return Response(issue_token_pair(user))
+
+
+class TokenRevokeView(InstrumentedViewMixin, generics.GenericAPIView):
+    """Revoke a refresh token and, when sent as the bearer, the current access token."""
+    serializer_class = RefreshSerializer
+    permission_classes = [permissions.AllowAny]
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            revoke_token(decode_token(serializer.validated_data['refresh'], REFRESH))
+        except InvalidToken as e:
+            return Response({"detail": f"Invalid token: {e}"}, status=status.HTTP_400_BAD_REQUEST)
+        if isinstance(request.auth, dict) and request.auth.get('type') == ACCESS:
+            revoke_token(request.auth)
+        return Response({"detail": "Token revoked"})